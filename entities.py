@@ -1,20 +1,22 @@
 """
 Game entities for the Pong game.
-This module contains the Paddle and Ball classes.
+This module contains the Paddle and Ball classes. They only draw: the
+physics lives in game.simulation, and the game copies each simulated tick
+into them with sync_from().
 """
 
 import pygame
-import random
-import math
+from game.constants import SCREEN_WIDTH
+from game.text import get_font
+from game.sprites import LOAD_BAR_GAP, atlas
 
 class Paddle:
     """
     Paddle class for the Pong game.
-    Handles paddle movement and rendering.
+    Draws a paddle with its load bar and aiming arrow.
     """
-    def __init__(self, x, y, width=15, height=100, speed=7, color=(255, 255, 255)):
+    def __init__(self, x, y, width=15, height=100, color=(255, 255, 255), is_left=None):
         self.rect = pygame.Rect(x, y, width, height)
-        self.speed = speed
         self.color = color
         self.load_counter = 0  # Counter for the hit bar power-up
         self.max_load = 100    # Maximum load value
@@ -24,7 +26,8 @@ class Paddle:
         self.is_holding_ball = False
         self.arrow_angle = 0  # Angle in degrees
         self.arrow_length = 50  # Length of the arrow
-        self.is_left_paddle = x < 400  # Determine if this is the left paddle
+        # Which side the paddle plays on; guessed from x on the default playfield if not given
+        self.is_left_paddle = x < SCREEN_WIDTH / 2 if is_left is None else is_left
         
         # Set initial arrow angle based on paddle position
         if self.is_left_paddle:
@@ -32,150 +35,57 @@ class Paddle:
         else:
             self.arrow_angle = 180  # Point left for right paddle
         
-    def move(self, direction, screen_height):
-        """Move the paddle up or down within screen boundaries"""
-        if direction == "up" and self.rect.top > 0:
-            self.rect.y -= self.speed
-        if direction == "down" and self.rect.bottom < screen_height:
-            self.rect.y += self.speed
-    
-    def increase_load(self, amount=10):
-        """Increase the load counter when hitting the ball"""
-        self.load_counter = min(self.load_counter + amount, self.max_load)
+    def sprites(self):
+        """Return the (surface, position) pairs that draw the paddle, for Surface.blits"""
+        rect = self.rect
         
-    def activate_power_up(self):
-        """Activate power-up if load counter is at maximum"""
-        if self.load_counter >= self.max_load:
-            self.is_powered_up = True
-            self.load_counter = 0
-            return True
-        return False
-    
-    def hold_ball(self, ball):
-        """Hold the ball if power-up is active and ball is in contact"""
-        if self.is_powered_up and ball.rect.colliderect(self.rect):
-            self.is_holding_ball = True
-            self.is_powered_up = False
-            
-            # Set the ball's held flag
-            ball.is_held = True
-            
-            # Position the ball at the edge of the paddle
-            if self.is_left_paddle:
-                ball.x = self.rect.right + ball.radius
-            else:
-                ball.x = self.rect.left - ball.radius
-                
-            ball.y = self.rect.centery
-            
-            # Update ball's rect
-            ball.rect.x = ball.x - ball.radius
-            ball.rect.y = ball.y - ball.radius
-            
-            # Stop the ball's movement
-            ball.speed_x = 0
-            ball.speed_y = 0
-            
-            return True
-        return False
-    
-    def rotate_arrow(self, direction):
-        """Rotate the arrow indicator"""
-        rotation_speed = 5  # Degrees per frame
+        # The paddle, then the load bar below it
+        sprites = [
+            (atlas.paddle(rect.width, rect.height, self.color), rect.topleft),
+            (atlas.load_bar(rect.width, self.load_counter, self.max_load),
+             (rect.x, rect.bottom + LOAD_BAR_GAP)),
+        ]
         
-        if direction == "clockwise":
-            self.arrow_angle += rotation_speed
-        else:  # counterclockwise
-            self.arrow_angle -= rotation_speed
-            
-        # Constrain the angle to point forward (toward opponent's side)
-        if self.is_left_paddle:
-            # Left paddle: constrain to -90 to 90 degrees (pointing right hemisphere)
-            self.arrow_angle = max(-90, min(90, self.arrow_angle))
-        else:
-            # Right paddle: constrain to 90 to 270 degrees (pointing left hemisphere)
-            if self.arrow_angle < 90:
-                self.arrow_angle = 90
-            elif self.arrow_angle > 270:
-                self.arrow_angle = 270
-    
-    def throw_ball(self, ball):
-        """Throw the ball in the direction of the arrow"""
+        # The arrow indicator, starting at the center of the paddle's front edge
         if self.is_holding_ball:
-            self.is_holding_ball = False
-            
-            # Release the ball
-            ball.is_held = False
-            
-            # Calculate the ball's new velocity based on arrow angle
-            angle_radians = math.radians(self.arrow_angle)
-            speed = 10  # Base speed for the throw
-            
-            ball.speed_x = speed * math.cos(angle_radians)
-            ball.speed_y = speed * math.sin(angle_radians)
-            
-            return True
-        return False
+            arrow, (start_x, start_y) = atlas.arrow(self.arrow_angle, self.arrow_length)
+            edge_x = rect.right if self.is_left_paddle else rect.left
+            sprites.append((arrow, (edge_x - start_x, rect.centery - start_y)))
+        return sprites
             
     def draw(self, screen):
         """Draw the paddle on the screen"""
-        # Draw the main paddle
-        pygame.draw.rect(screen, self.color, self.rect)
-        
-        # Draw the load bar below the paddle
-        load_bar_height = 5
-        load_bar_width = self.rect.width
-        load_bar_x = self.rect.x
-        load_bar_y = self.rect.bottom + 5
-        
-        # Background of load bar (gray)
-        pygame.draw.rect(screen, (100, 100, 100), 
-                         (load_bar_x, load_bar_y, load_bar_width, load_bar_height))
-        
-        # Filled portion of load bar (blue to red gradient based on load)
-        if self.load_counter > 0:
-            load_percentage = self.load_counter / self.max_load
-            load_color = (int(255 * load_percentage), int(100 * (1 - load_percentage)), 255)
-            pygame.draw.rect(screen, load_color, 
-                            (load_bar_x, load_bar_y, 
-                             int(load_bar_width * load_percentage), load_bar_height))
-        
-        # Draw the arrow indicator if holding the ball
+        screen.blits(self.sprites(), doreturn=False)
+
+    def sync_from(self, state):
+        """Copy position and power-up state from a simulation PaddleState"""
+        self.rect.x = state.x
+        self.rect.y = state.y
+        self.load_counter = state.load_counter
+        self.is_powered_up = state.is_powered_up
+        self.is_holding_ball = state.is_holding_ball
+        self.arrow_angle = state.arrow_angle
+
+    def get_bounds(self):
+        """Return a rect covering everything draw() touches (paddle, load bar, arrow)"""
+        bounds = pygame.Rect(self.rect.x, self.rect.y, self.rect.width, self.rect.height + 10)
         if self.is_holding_ball:
-            # Calculate arrow start point (center of paddle edge)
-            if self.is_left_paddle:
-                start_x = self.rect.right
-            else:
-                start_x = self.rect.left
-            start_y = self.rect.centery
-            
-            # Calculate arrow end point based on angle
-            angle_radians = math.radians(self.arrow_angle)
-            end_x = start_x + self.arrow_length * math.cos(angle_radians)
-            end_y = start_y + self.arrow_length * math.sin(angle_radians)
-            
-            # Draw the arrow line
-            pygame.draw.line(screen, (255, 255, 0), (start_x, start_y), (end_x, end_y), 3)
-            
-            # Draw arrowhead
-            arrowhead_length = 10
-            arrowhead_angle1 = angle_radians + math.radians(150)
-            arrowhead_angle2 = angle_radians - math.radians(150)
-            
-            arrowhead_x1 = end_x + arrowhead_length * math.cos(arrowhead_angle1)
-            arrowhead_y1 = end_y + arrowhead_length * math.sin(arrowhead_angle1)
-            
-            arrowhead_x2 = end_x + arrowhead_length * math.cos(arrowhead_angle2)
-            arrowhead_y2 = end_y + arrowhead_length * math.sin(arrowhead_angle2)
-            
-            pygame.draw.line(screen, (255, 255, 0), (end_x, end_y), (arrowhead_x1, arrowhead_y1), 3)
-            pygame.draw.line(screen, (255, 255, 0), (end_x, end_y), (arrowhead_x2, arrowhead_y2), 3)
+            start_x = self.rect.right if self.is_left_paddle else self.rect.left
+            reach = self.arrow_length + 12  # Arrow plus arrowhead and line width
+            bounds.union_ip(pygame.Rect(start_x - reach, self.rect.centery - reach,
+                                        reach * 2, reach * 2))
+        return bounds
+
+    def render_key(self):
+        """Return a value that changes whenever the paddle's appearance changes"""
+        return (self.rect.x, self.rect.y, self.load_counter,
+                self.is_holding_ball, self.arrow_angle)
 
 
 class Ball:
     """
     Ball class for the Pong game.
-    Handles ball movement, collision detection, and rendering.
+    Draws the ball.
     """
     def __init__(self, x, y, radius=10, speed_x=5, speed_y=5, color=(255, 255, 255)):
         self.x = x
@@ -185,80 +95,36 @@ class Ball:
         self.speed_y = speed_y
         self.color = color
         self.rect = pygame.Rect(x - radius, y - radius, radius * 2, radius * 2)
-        self.max_speed = 15  # Maximum ball speed
         self.is_held = False  # Flag to indicate if the ball is being held
         
-    def update(self, screen_width, screen_height):
-        """Update ball position and handle wall collisions"""
-        # Only update if not being held
-        if not self.is_held:
-            self.x += self.speed_x
-            self.y += self.speed_y
-            
-            # Update the rect position
-            self.rect.x = self.x - self.radius
-            self.rect.y = self.y - self.radius
-            
-            # Top and bottom wall collisions
-            if self.y <= self.radius or self.y >= screen_height - self.radius:
-                self.speed_y *= -1
-                # Add a small random variation to make gameplay more interesting
-                self.speed_y += random.uniform(-0.5, 0.5)
-            
-    def check_paddle_collision(self, paddle, is_left_paddle):
-        """
-        Check for collision with a paddle and handle bounce physics
-        Returns True if collision occurred
-        """
-        if self.rect.colliderect(paddle.rect):
-            # Calculate where on the paddle the ball hit (0 to 1, from top to bottom)
-            relative_intersect_y = (paddle.rect.y + paddle.rect.height/2) - self.y
-            normalized_relative_intersect_y = relative_intersect_y / (paddle.rect.height/2)
-            
-            # Calculate bounce angle (-1 to 1) based on where the ball hit the paddle
-            bounce_angle = normalized_relative_intersect_y * 0.8  # 0.8 limits the max angle
-            
-            # Reverse x direction and apply the bounce angle
-            self.speed_x = -self.speed_x
-            
-            # Make the ball faster with each hit, up to max_speed
-            speed_increase = 0.2
-            if abs(self.speed_x) < self.max_speed:
-                self.speed_x = self.speed_x * (1 + speed_increase)
-            
-            # Apply the bounce angle
-            self.speed_y = -bounce_angle * abs(self.speed_x)
-            
-            # Move the ball outside the paddle to prevent multiple collisions
-            if is_left_paddle:
-                self.x = paddle.rect.right + self.radius
-            else:
-                self.x = paddle.rect.left - self.radius
-                
-            # Update the rect position
-            self.rect.x = self.x - self.radius
-            self.rect.y = self.y - self.radius
-            
-            return True
-        return False
+    def sprites(self):
+        """Return the (surface, position) pair that draws the ball, for Surface.blits"""
+        return [(atlas.ball(self.radius, self.color),
+                 (int(self.x) - self.radius, int(self.y) - self.radius))]
             
     def draw(self, screen):
         """Draw the ball on the screen"""
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
-        
-    def reset(self, x, y):
-        """Reset ball position and randomize direction"""
-        self.x = x
-        self.y = y
-        self.rect.x = x - self.radius
-        self.rect.y = y - self.radius
-        self.is_held = False
-        
-        # Reset speed but keep direction random
-        self.speed_x = random.choice([-1, 1]) * 5
-        self.speed_y = random.uniform(-3, 3)
+        screen.blit(*self.sprites()[0])
 
+    def get_bounds(self):
+        """Return a rect covering the drawn circle"""
+        return pygame.Rect(int(self.x) - self.radius - 1, int(self.y) - self.radius - 1,
+                           self.radius * 2 + 3, self.radius * 2 + 3)
 
+    def render_key(self):
+        """Return a value that changes whenever the ball's appearance changes"""
+        return (int(self.x), int(self.y))
+
+    def sync_from(self, state):
+        """Copy position and velocity from a simulation BallState"""
+        self.x = state.x
+        self.y = state.y
+        self.speed_x = state.speed_x
+        self.speed_y = state.speed_y
+        self.is_held = state.is_held
+        self.rect.x = state.rect_x
+        self.rect.y = state.rect_y
+        
 class ScoreSystem:
     """
     Score system for the Pong game.
@@ -267,7 +133,8 @@ class ScoreSystem:
     def __init__(self, font_size=36):
         self.player1_score = 0
         self.player2_score = 0
-        self.font = pygame.font.Font(None, font_size)
+        self.font = get_font(font_size)
+        self.score_surfaces = {}  # Rendered scores, invalidated by update_score
         
     def update_score(self, player, points=1):
         """Update the score for the specified player"""
@@ -275,19 +142,61 @@ class ScoreSystem:
             self.player1_score += points
         else:
             self.player2_score += points
+        self.score_surfaces.pop(player if player == 1 else 2, None)
+
+    def reset(self):
+        """Set both scores back to zero"""
+        self.player1_score = 0
+        self.player2_score = 0
+        self.score_surfaces.clear()
+
+    def sync_from(self, state):
+        """Apply any points scored in a simulation MatchState"""
+        if state.player1_score != self.player1_score:
+            self.update_score(1, state.player1_score - self.player1_score)
+        if state.player2_score != self.player2_score:
+            self.update_score(2, state.player2_score - self.player2_score)
+            
+    def get_score_surface(self, player):
+        """Return the rendered score for a player, rendering it only after a change"""
+        surface = self.score_surfaces.get(player)
+        if surface is None:
+            score = self.player1_score if player == 1 else self.player2_score
+            surface = self.font.render(str(score), True, (255, 255, 255))
+            self.score_surfaces[player] = surface
+        return surface
+            
+    def get_score_rects(self, screen_width):
+        """Return where the two scores are drawn"""
+        p1_rect = self.get_score_surface(1).get_rect(midtop=(screen_width/4, 20))
+        p2_rect = self.get_score_surface(2).get_rect(midtop=(screen_width*3/4, 20))
+        return p1_rect, p2_rect
+
+    def get_bounds(self, screen_width):
+        """Return a rect covering both scores"""
+        p1_rect, p2_rect = self.get_score_rects(screen_width)
+        return p1_rect.union(p2_rect)
+
+    def render_key(self):
+        """Return a value that changes whenever the displayed scores change"""
+        return (self.player1_score, self.player2_score)
             
     def draw(self, screen, screen_width, screen_height):
         """Draw the scores on the screen"""
+        self.draw_scores(screen, screen_width)
+        self.draw_center_line(screen, screen_width, screen_height)
+
+    def draw_scores(self, screen, screen_width):
+        """Draw only the two scores"""
+        p1_rect, p2_rect = self.get_score_rects(screen_width)
+        
         # Player 1 score (left side)
-        p1_text = self.font.render(str(self.player1_score), True, (255, 255, 255))
-        p1_rect = p1_text.get_rect(midtop=(screen_width/4, 20))
-        screen.blit(p1_text, p1_rect)
+        screen.blit(self.get_score_surface(1), p1_rect)
         
         # Player 2 score (right side)
-        p2_text = self.font.render(str(self.player2_score), True, (255, 255, 255))
-        p2_rect = p2_text.get_rect(midtop=(screen_width*3/4, 20))
-        screen.blit(p2_text, p2_rect)
-        
-        # Draw center line
+        screen.blit(self.get_score_surface(2), p2_rect)
+
+    def draw_center_line(self, screen, screen_width, screen_height):
+        """Draw the dashed center line"""
         for y in range(0, screen_height, 30):
             pygame.draw.rect(screen, (200, 200, 200), (screen_width/2 - 1, y, 2, 15)) 
\ No newline at end of file
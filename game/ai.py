@@ -0,0 +1,172 @@
+"""
+CPU opponent for the Pong game.
+The AI predicts where the ball will cross its paddle, including wall
+reflections, and only recomputes that prediction when the ball's trajectory
+changes. It produces simulation.PlayerInput values, so it works the same in
+the game loop and in headless matches.
+"""
+
+import random
+
+from game.simulation import PlayerInput
+
+
+class Difficulty:
+    """
+    Tuning values for one AI difficulty tier.
+    reaction_ticks: ticks before the AI reacts to a new trajectory
+    error: standard deviation in pixels added to each predicted intercept
+    dead_zone: how close the paddle center must be to the target to stop
+    power_up_chance: probability of using a full load bar to catch and throw
+    aim_ticks: extra ticks spent aiming before a throw
+    """
+    def __init__(self, reaction_ticks, error, dead_zone=10, power_up_chance=0.0,
+                 aim_ticks=10, return_to_center=True):
+        self.reaction_ticks = reaction_ticks
+        self.error = error
+        self.dead_zone = dead_zone
+        self.power_up_chance = power_up_chance
+        self.aim_ticks = aim_ticks
+        self.return_to_center = return_to_center
+
+
+DIFFICULTIES = {
+    "easy": Difficulty(reaction_ticks=18, error=45, dead_zone=15, return_to_center=False),
+    "normal": Difficulty(reaction_ticks=8, error=20, power_up_chance=0.5, aim_ticks=20),
+    "hard": Difficulty(reaction_ticks=2, error=5, dead_zone=6, power_up_chance=1.0, aim_ticks=5),
+}
+
+
+def predict_intercept(ball, target_x, height):
+    """
+    Return the y coordinate where the ball will reach target_x, reflecting off
+    the top and bottom walls, or None if the ball is not moving towards it.
+    Random wall jitter is ignored; callers recompute after each bounce.
+    """
+    if ball.speed_x == 0 or (target_x - ball.x) * ball.speed_x < 0:
+        return None
+    time = (target_x - ball.x) / ball.speed_x
+    y = ball.y + ball.speed_y * time
+
+    # Fold the straight-line position back into the playfield
+    low = ball.radius
+    span = height - 2 * ball.radius
+    if span <= 0:
+        return height / 2
+    offset = (y - low) % (2 * span)
+    if offset > span:
+        offset = 2 * span - offset
+    return low + offset
+
+
+class AIController:
+    """
+    Drives one paddle of a simulation.MatchState.
+    Call get_input(state) once per tick; it returns the PlayerInput to pass
+    to simulation.step for this paddle.
+    """
+    def __init__(self, is_left=False, difficulty="normal", seed=None):
+        self.is_left = is_left
+        if isinstance(difficulty, str):
+            difficulty = DIFFICULTIES[difficulty]
+        self.difficulty = difficulty
+        self.rng = random.Random(seed)
+        self.input = PlayerInput()
+        self.reset()
+
+    def reset(self):
+        """Forget the cached prediction, e.g. at the start of a match"""
+        self.trajectory = None   # (speed_x, speed_y, is_held) the target was computed for
+        self.target_y = None     # Where the paddle is heading now
+        self.pending_y = None    # New target waiting for the reaction delay
+        self.react_at = 0
+        self.recomputes = 0
+        self.aim_until = 0
+        self.aim_angle = None
+
+    def _paddles(self, state):
+        if self.is_left:
+            return state.left, state.right
+        return state.right, state.left
+
+    def _plan(self, state, paddle):
+        """Compute a new target for the current trajectory"""
+        ball = state.ball
+        self.recomputes += 1
+        if self.is_left:
+            face = paddle.right + ball.radius
+        else:
+            face = paddle.left - ball.radius
+        target = predict_intercept(ball, face, state.height)
+        if target is None:
+            if not self.difficulty.return_to_center:
+                return None
+            target = state.height / 2
+        elif self.difficulty.error:
+            target += self.rng.gauss(0, self.difficulty.error)
+        return target
+
+    def _choose_aim(self, state, opponent):
+        """Pick a throw angle that sends the ball away from the opponent"""
+        toward_top = opponent.centery > state.height / 2
+        angle = -45 if toward_top else 45
+        if not self.is_left:
+            angle = 180 - angle
+        return angle
+
+    def get_input(self, state):
+        """Return this tick's input for the controlled paddle"""
+        paddle, opponent = self._paddles(state)
+        ball = state.ball
+        difficulty = self.difficulty
+        player_input = self.input
+        player_input.up = player_input.down = False
+        player_input.rotate_ccw = player_input.rotate_cw = False
+        player_input.activate = player_input.hold = player_input.release = False
+
+        if paddle.is_holding_ball:
+            return self._aim(state, paddle, opponent)
+
+        # Power-ups: activate a full bar, then catch the ball on contact
+        if difficulty.power_up_chance:
+            if paddle.load_counter >= state.rules.max_load:
+                player_input.activate = self.rng.random() < difficulty.power_up_chance
+            elif paddle.is_powered_up and state.holder() is None:
+                margin = abs(ball.speed_x) if state.continuous else 0
+                player_input.hold = ball.overlaps(paddle, margin)
+
+        # Recompute only when the trajectory changes
+        trajectory = (ball.speed_x, ball.speed_y, ball.is_held)
+        if trajectory != self.trajectory:
+            self.trajectory = trajectory
+            self.pending_y = self._plan(state, paddle)
+            self.react_at = state.tick + difficulty.reaction_ticks
+        if self.pending_y is not None and state.tick >= self.react_at:
+            self.target_y = self.pending_y
+            self.pending_y = None
+
+        if self.target_y is not None:
+            centery = paddle.centery
+            if self.target_y < centery - difficulty.dead_zone:
+                player_input.up = True
+            elif self.target_y > centery + difficulty.dead_zone:
+                player_input.down = True
+        return player_input
+
+    def _aim(self, state, paddle, opponent):
+        """Rotate the arrow towards the chosen angle, then throw"""
+        player_input = self.input
+        if self.aim_angle is None:
+            self.aim_angle = self._choose_aim(state, opponent)
+            self.aim_until = state.tick + self.difficulty.aim_ticks
+
+        step = state.rules.arrow_step
+        difference = self.aim_angle - paddle.arrow_angle
+        if abs(difference) >= step:
+            player_input.rotate_cw = difference > 0
+            player_input.rotate_ccw = difference < 0
+        elif state.tick >= self.aim_until:
+            player_input.release = True
+            self.aim_angle = None
+        return player_input
+
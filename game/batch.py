@@ -0,0 +1,301 @@
+"""
+Vectorized batch simulator for the Pong game.
+This module advances N independent matches in lockstep using NumPy arrays
+(struct-of-arrays layout). It follows the same rules as game.simulation.step,
+but draws random numbers from one shared generator, so individual matches are
+not bit-identical to their scalar counterparts.
+Requires numpy.
+"""
+
+import numpy as np
+
+from game.constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from game.simulation import Rules, MatchState
+
+LEFT = 0
+RIGHT = 1
+
+PADDLE_WIDTH = 15
+PADDLE_HEIGHT = 100
+BALL_RADIUS = 10
+
+
+def _round_coord(values):
+    """Vectorized version of simulation._round_coord (round half away from zero)"""
+    return np.where(values >= 0, np.floor(values + 0.5), -np.floor(-values + 0.5))
+
+
+class BatchInput:
+    """
+    Inputs for every paddle in a batch during one tick.
+    Each field is a bool array of shape (n, 2): column 0 is the left paddle,
+    column 1 the right paddle. Field meanings match simulation.PlayerInput.
+    """
+    FIELDS = ("up", "down", "rotate_ccw", "rotate_cw", "activate", "hold", "release")
+
+    def __init__(self, n):
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros((n, 2), dtype=bool))
+
+
+class BatchSimulation:
+    """
+    N matches stored as parallel NumPy arrays.
+    Any Rules attribute can be passed as a keyword argument, either as a scalar
+    or as an array of length n for parameter sweeps. When target_score is set,
+    matches that reach it are counted in `wins` and reset in place.
+    """
+    def __init__(self, n, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, rules=None,
+                 seed=None, target_score=None, **overrides):
+        self.n = n
+        self.width = width
+        self.height = height
+        self.target_score = target_score
+        self.rng = np.random.default_rng(seed)
+
+        # Per-match rule arrays so each match can use different values
+        rules = rules or Rules()
+        for name, value in vars(rules).items():
+            value = overrides.pop(name, value)
+            setattr(self, name, np.broadcast_to(np.asarray(value, dtype=float), (n,)).copy())
+        if overrides:
+            raise TypeError("Unknown rule(s): " + ", ".join(sorted(overrides)))
+
+        # Paddles never move horizontally, so x is shared by every match
+        self.paddle_x = np.array([20, width - 35], dtype=float)
+
+        self.paddle_y = np.empty((n, 2))
+        self.load_counter = np.empty((n, 2))
+        self.is_powered_up = np.empty((n, 2), dtype=bool)
+        self.is_holding_ball = np.empty((n, 2), dtype=bool)
+        self.arrow_angle = np.empty((n, 2))
+        self.ball_x = np.empty(n)
+        self.ball_y = np.empty(n)
+        self.rect_x = np.empty(n)
+        self.rect_y = np.empty(n)
+        self.speed_x = np.empty(n)
+        self.speed_y = np.empty(n)
+        self.is_held = np.empty(n, dtype=bool)
+        self.scores = np.empty((n, 2), dtype=np.int64)
+        self.hits = np.empty((n, 2), dtype=np.int64)
+
+        # Results accumulated across resets
+        self.wins = np.zeros((n, 2), dtype=np.int64)
+        self.matches_finished = np.zeros(n, dtype=np.int64)
+        self.tick = 0
+
+        self.reset_matches(np.ones(n, dtype=bool))
+
+    def reset_matches(self, mask):
+        """Restore the matches selected by mask to their starting state"""
+        self.paddle_y[mask] = self.height // 2 - 50
+        self.load_counter[mask] = 0
+        self.is_powered_up[mask] = False
+        self.is_holding_ball[mask] = False
+        self.arrow_angle[mask] = (0, 180)
+        self.ball_x[mask] = self.width // 2
+        self.ball_y[mask] = self.height // 2
+        self.speed_x[mask] = self.serve_speed[mask]
+        self.speed_y[mask] = self.serve_speed[mask]
+        self.is_held[mask] = False
+        self.scores[mask] = 0
+        self.hits[mask] = 0
+        self._sync_rect()
+
+    def _sync_rect(self):
+        self.rect_x = _round_coord(self.ball_x - BALL_RADIUS)
+        self.rect_y = _round_coord(self.ball_y - BALL_RADIUS)
+
+    def _overlaps(self, side):
+        """Bool array: ball bounding box overlaps the given paddle (Rect.colliderect)"""
+        paddle_x = self.paddle_x[side]
+        paddle_y = self.paddle_y[:, side]
+        size = BALL_RADIUS * 2
+        return ((self.rect_x < paddle_x + PADDLE_WIDTH) & (paddle_x < self.rect_x + size) &
+                (self.rect_y < paddle_y + PADDLE_HEIGHT) & (paddle_y < self.rect_y + size))
+
+    def _attach(self, mask, side):
+        """Place the ball at the front edge of the holding paddle"""
+        if side == LEFT:
+            self.ball_x[mask] = self.paddle_x[LEFT] + PADDLE_WIDTH + BALL_RADIUS
+        else:
+            self.ball_x[mask] = self.paddle_x[RIGHT] - BALL_RADIUS
+        self.ball_y[mask] = self.paddle_y[mask, side] + PADDLE_HEIGHT // 2
+        self.rect_x[mask] = _round_coord(self.ball_x[mask] - BALL_RADIUS)
+        self.rect_y[mask] = _round_coord(self.ball_y[mask] - BALL_RADIUS)
+
+    def _rotate(self, mask, side, delta):
+        angles = self.arrow_angle[:, side]
+        if side == LEFT:
+            low, high = -90, 90
+        else:
+            low, high = 90, 270
+        angles[mask] = np.clip(angles[mask] + delta[mask], low, high)
+
+    def _bounce(self, side):
+        """Vectorized simulation.check_paddle_collision; returns the hit mask"""
+        hit = ~self.is_holding_ball.any(axis=1) & self._overlaps(side)
+        if not hit.any():
+            return hit
+
+        half_height = PADDLE_HEIGHT / 2
+        relative_intersect_y = (self.paddle_y[hit, side] + half_height) - self.ball_y[hit]
+        bounce_angle = relative_intersect_y / half_height * 0.8
+
+        speed_x = -self.speed_x[hit]
+        faster = np.abs(speed_x) < self.max_speed[hit]
+        speed_x = np.where(faster, speed_x * (1 + self.speed_increase[hit]), speed_x)
+        self.speed_x[hit] = speed_x
+        self.speed_y[hit] = -bounce_angle * np.abs(speed_x)
+
+        if side == LEFT:
+            self.ball_x[hit] = self.paddle_x[LEFT] + PADDLE_WIDTH + BALL_RADIUS
+        else:
+            self.ball_x[hit] = self.paddle_x[RIGHT] - BALL_RADIUS
+        self.rect_x[hit] = _round_coord(self.ball_x[hit] - BALL_RADIUS)
+        self.rect_y[hit] = _round_coord(self.ball_y[hit] - BALL_RADIUS)
+
+        self.load_counter[hit, side] = np.minimum(
+            self.load_counter[hit, side] + self.hit_load[hit], self.max_load[hit])
+        self.hits[hit, side] += 1
+        return hit
+
+    def _serve(self, mask):
+        """Vectorized simulation.reset_ball from the centre of the screen"""
+        count = int(mask.sum())
+        self.ball_x[mask] = self.width // 2
+        self.ball_y[mask] = self.height // 2
+        self.is_held[mask] = False
+        self.speed_x[mask] = self.rng.choice((-1.0, 1.0), size=count) * self.serve_speed[mask]
+        self.speed_y[mask] = self.rng.uniform(-1, 1, size=count) * self.serve_spread[mask]
+        self.rect_x[mask] = _round_coord(self.ball_x[mask] - BALL_RADIUS)
+        self.rect_y[mask] = _round_coord(self.ball_y[mask] - BALL_RADIUS)
+
+    def follow_ball_inputs(self, dead_zone=10):
+        """Inputs where both paddles track the ball like the VS_MACHINE AI"""
+        inputs = BatchInput(self.n)
+        centery = self.paddle_y + PADDLE_HEIGHT // 2
+        ball_y = self.ball_y[:, None]
+        inputs.up[:] = ball_y < centery - dead_zone
+        inputs.down[:] = ~inputs.up & (ball_y > centery + dead_zone)
+        return inputs
+
+    def step(self, inputs=None):
+        """Advance every match by one tick; returns the bool mask of finished matches"""
+        if inputs is None:
+            inputs = BatchInput(self.n)
+
+        # Power-up activation
+        activate = inputs.activate & (self.load_counter >= self.max_load[:, None])
+        self.is_powered_up |= activate
+        self.load_counter[activate] = 0
+
+        # Hold, left paddle first, then right, only while nobody holds the ball
+        for side in (LEFT, RIGHT):
+            free = ~self.is_holding_ball.any(axis=1)
+            catch = (free & (inputs.hold[:, LEFT] | inputs.hold[:, RIGHT]) & inputs.hold[:, side] &
+                     self.is_powered_up[:, side] & self._overlaps(side))
+            if catch.any():
+                self.is_holding_ball[catch, side] = True
+                self.is_powered_up[catch, side] = False
+                self.is_held[catch] = True
+                self._attach(catch, side)
+                self.speed_x[catch] = 0
+                self.speed_y[catch] = 0
+
+        # Throw, left paddle takes precedence
+        throw_left = inputs.release[:, LEFT] & self.is_holding_ball[:, LEFT]
+        throw_right = ~throw_left & inputs.release[:, RIGHT] & self.is_holding_ball[:, RIGHT]
+        for side, throw in ((LEFT, throw_left), (RIGHT, throw_right)):
+            if throw.any():
+                self.is_holding_ball[throw, side] = False
+                self.is_held[throw] = False
+                angle_radians = np.radians(self.arrow_angle[throw, side])
+                self.speed_x[throw] = self.throw_speed[throw] * np.cos(angle_radians)
+                self.speed_y[throw] = self.throw_speed[throw] * np.sin(angle_radians)
+
+        # Paddle movement
+        speed = self.paddle_speed[:, None]
+        move_up = inputs.up & (self.paddle_y > 0)
+        self.paddle_y -= np.where(move_up, speed, 0)
+        move_down = inputs.down & (self.paddle_y + PADDLE_HEIGHT < self.height)
+        self.paddle_y += np.where(move_down, speed, 0)
+
+        # Arrow rotation while holding
+        for side in (LEFT, RIGHT):
+            holding = self.is_holding_ball[:, side]
+            self._rotate(holding & inputs.rotate_ccw[:, side], side, -self.arrow_step)
+            self._rotate(holding & inputs.rotate_cw[:, side], side, self.arrow_step)
+
+        # Held balls follow their paddle
+        for side in (LEFT, RIGHT):
+            holding = self.is_holding_ball[:, side]
+            if holding.any():
+                self._attach(holding, side)
+
+        # Free balls move and bounce off the top and bottom walls
+        free = ~self.is_holding_ball.any(axis=1) & ~self.is_held
+        self.ball_x += np.where(free, self.speed_x, 0)
+        self.ball_y += np.where(free, self.speed_y, 0)
+        self.rect_x = np.where(free, _round_coord(self.ball_x - BALL_RADIUS), self.rect_x)
+        self.rect_y = np.where(free, _round_coord(self.ball_y - BALL_RADIUS), self.rect_y)
+        wall = free & ((self.ball_y <= BALL_RADIUS) | (self.ball_y >= self.height - BALL_RADIUS))
+        if wall.any():
+            jitter = self.rng.uniform(-1, 1, size=int(wall.sum())) * self.wall_jitter[wall]
+            self.speed_y[wall] = -self.speed_y[wall] + jitter
+
+        # Paddle collisions
+        self._bounce(LEFT)
+        self._bounce(RIGHT)
+
+        # Scoring
+        free = ~self.is_holding_ball.any(axis=1)
+        right_scores = free & (self.ball_x < 0)
+        left_scores = free & ~right_scores & (self.ball_x > self.width)
+        self.scores[right_scores, RIGHT] += 1
+        self.scores[left_scores, LEFT] += 1
+        scored = right_scores | left_scores
+        if scored.any():
+            self._serve(scored)
+
+        # Finished matches are tallied and reset in place
+        finished = np.zeros(self.n, dtype=bool)
+        if self.target_score is not None:
+            reached = self.scores >= self.target_score
+            finished = reached.any(axis=1)
+            if finished.any():
+                self.wins += reached & finished[:, None]
+                self.matches_finished += finished
+                self.reset_matches(finished)
+
+        self.tick += 1
+        return finished
+
+    def run(self, ticks, policy=None):
+        """Advance all matches by a number of ticks; policy(batch) returns BatchInput"""
+        for _ in range(ticks):
+            self.step(policy(self) if policy is not None else None)
+        return self
+
+    def match_state(self, i):
+        """Copy match i into a scalar simulation.MatchState"""
+        state = MatchState(self.width, self.height, rules=Rules(**{
+            name: getattr(self, name)[i].item() for name in vars(Rules())}))
+        for side, paddle in ((LEFT, state.left), (RIGHT, state.right)):
+            paddle.y = self.paddle_y[i, side].item()
+            paddle.load_counter = self.load_counter[i, side].item()
+            paddle.is_powered_up = bool(self.is_powered_up[i, side])
+            paddle.is_holding_ball = bool(self.is_holding_ball[i, side])
+            paddle.arrow_angle = self.arrow_angle[i, side].item()
+        ball = state.ball
+        ball.x = self.ball_x[i].item()
+        ball.y = self.ball_y[i].item()
+        ball.speed_x = self.speed_x[i].item()
+        ball.speed_y = self.speed_y[i].item()
+        ball.is_held = bool(self.is_held[i])
+        ball.rect_x = int(self.rect_x[i])
+        ball.rect_y = int(self.rect_y[i])
+        state.player1_score = int(self.scores[i, LEFT])
+        state.player2_score = int(self.scores[i, RIGHT])
+        state.tick = self.tick
+        return state
@@ -1,6 +1,6 @@
 # Game constants
 
-# Screen dimensions
+# Playfield dimensions: gameplay coordinates and the resolution the game draws at
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 
@@ -11,6 +11,71 @@ RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 
 # Game settings
-FPS = 60
+FPS = 60                     # Target frame rate (main.py --fps)
 PADDLE_SPEED = 7
-BALL_SPEED = 5 
\ No newline at end of file
+BALL_SPEED = 5
+# Fixed-timestep simulation
+TICK_RATE = 60      # Physics ticks per second, independent of FPS
+MAX_SUBSTEPS = 5    # Most ticks run in one frame when catching up
+CONTINUOUS_COLLISION = True  # Swept ball collisions (no tunneling at high speed)
+AI_DIFFICULTY = "normal"     # CPU opponent tier: "easy", "normal" or "hard"
+
+# Match
+WINNING_SCORE = 10            # Points that end a match
+MULTIBALL_WINNING_SCORE = 100 # Points that end a multiball party match
+
+# Rendering
+DIRTY_RECT_RENDERING = True  # Update only changed regions instead of flipping
+THROW_PREVIEW = True         # Dotted line showing where a held ball will be thrown
+
+# Display (see game/display.py; main.py --window, --fullscreen, --smooth and --render-scale override these)
+WINDOW_SIZE = None           # Window (width, height); None matches the playfield
+FULLSCREEN = False           # Without WINDOW_SIZE, uses the desktop resolution
+SMOOTH_SCALING = False       # smoothscale instead of the cheaper scale when the window differs
+RENDER_SCALE = 1.0           # Offscreen frame size as a fraction of the window; below 1 SDL scales it up
+
+# Replays
+RECORD_REPLAYS = False     # Save each match's inputs when the game exits (--record-replays)
+REPLAY_DIR = "replays"
+
+# Networked play
+NET_PORT = 7777            # Default UDP port for --host / --join
+NET_INPUT_DELAY = 2        # Ticks local input is delayed to hide latency
+NET_MAX_ROLLBACK = 8       # Ticks simulated on predicted input before stalling
+
+# Profiling
+PROFILE_FRAMES = False     # Record per-phase frame times from the start (F3 toggles)
+PROFILE_HISTORY = 600      # Frames kept per loop for the statistics
+PROFILE_DUMP = "frame_profile.json"  # Written on exit if frames were recorded; use .csv for CSV
+
+# Multiball
+MULTIBALL_BALLS = 50          # Balls in play in the multiball party mode (requires numpy)
+MULTIBALL_MAX_BALLS = 4096    # Preallocated ball slots
+MULTIBALL_BALL_COLLISIONS = True  # Balls bounce off each other
+
+# Startup
+STARTUP_REPORT = True      # Print the time to the first frame (to stderr) at startup
+
+# Frame pacing
+LOW_LATENCY_PACING = True  # Matches sleep first, then sample input, simulate and present
+PACING_SPIN = 0.001        # Seconds before a frame deadline spent spinning instead of sleeping
+LATENCY_REPORT = True      # Print input-to-present latency percentiles (to stderr) on exit
+
+# Telemetry
+TELEMETRY = False          # Stream gameplay events to TELEMETRY_DIR from a background thread (--telemetry)
+TELEMETRY_DIR = "telemetry"
+TELEMETRY_FORMAT = "jsonl" # "jsonl" or "binary"
+TELEMETRY_QUEUE = 8192     # Events queued before new ones are dropped (and counted)
+TELEMETRY_FILE_BYTES = 1 << 20  # Size at which a new file is started
+TELEMETRY_FILES = 10       # Newest files kept per session
+
+# Spectators
+SPECTATOR_SERVER = False   # Stream local matches to spectators (python -m game.spectator HOST)
+SPECTATOR_HOST = "0.0.0.0" # Interface the spectator server listens on
+SPECTATOR_PORT = 7778      # TCP port for spectators
+
+# Match host (python -m game.host)
+HOST_BUDGET = 0.8          # Fraction of each tick period spent simulating hosted matches
+HOST_MAX_LAG = 30          # Ticks a hosted match may fall behind before it is slowed down
+HOST_MAX_CATCHUP = 5       # Most ticks a lagging match runs in one host tick
+HOST_SHED_WINDOW = 60      # Host ticks per overload check; matches are shed when a tenth overran
@@ -0,0 +1,114 @@
+"""
+Window output for the Pong game.
+Gameplay and drawing use playfield coordinates (SCREEN_WIDTH x
+SCREEN_HEIGHT) whatever the window size. The game draws on a canvas of
+that size; when the window is another size, each presented frame is scaled
+to the largest area of the window with the playfield's aspect ratio, with
+black bars around it. Drawing stays at the playfield resolution, so a 4K
+window costs a single scale per frame, and mouse positions are mapped back
+to playfield coordinates. When the window matches the playfield the canvas
+is the window itself and nothing is scaled.
+
+A render_scale below 1 makes the offscreen frame smaller than the window:
+the canvas is scaled to render_scale times the window size, and SDL
+(pygame.SCALED, on the GPU where one is available) stretches that to the
+window, so the CPU writes a fraction of the pixels of a 4K window.
+"""
+
+import pygame
+
+# The Display created last; the module functions below present through it
+_active = None
+
+
+class Display:
+    """
+    The game window and the canvas the game draws on.
+    window_size defaults to the canvas size; (0, 0) with fullscreen uses the
+    desktop resolution. smooth selects pygame.transform.smoothscale, which
+    looks softer but costs several times as much as the default
+    nearest-neighbour pygame.transform.scale. With a render_scale other than
+    1, window is the offscreen frame, render_scale times the window size.
+    """
+    def __init__(self, size, window_size=None, fullscreen=False, smooth=False,
+                 render_scale=1.0, caption="Pong Game"):
+        global _active
+        flags = pygame.FULLSCREEN if fullscreen else 0
+        if window_size is None:
+            window_size = (0, 0) if fullscreen else size
+        self.render_scale = render_scale
+        if render_scale != 1:
+            if tuple(window_size) == (0, 0):
+                window_size = pygame.display.get_desktop_sizes()[0]
+            window_size = (max(1, round(window_size[0] * render_scale)),
+                           max(1, round(window_size[1] * render_scale)))
+            flags |= pygame.SCALED
+        self.window = pygame.display.set_mode(window_size, flags)
+        pygame.display.set_caption(caption)
+        self.size = tuple(size)
+        self.smooth = smooth
+        self.scale = pygame.transform.smoothscale if smooth else pygame.transform.scale
+
+        if self.window.get_size() == self.size:
+            self.canvas = self.window
+            self.viewport = self.window.get_rect()
+            self.target = None
+        else:
+            self.canvas = pygame.Surface(self.size).convert(self.window)
+            width, height = self.size
+            ratio = min(self.window.get_width() / width, self.window.get_height() / height)
+            self.viewport = pygame.Rect(0, 0, round(width * ratio), round(height * ratio))
+            self.viewport.center = self.window.get_rect().center
+            self.window.fill((0, 0, 0))
+            # Scaling straight into a subsurface of the window avoids a new surface per frame
+            self.target = self.window.subsurface(self.viewport)
+        _active = self
+
+    @property
+    def scaled(self):
+        return self.target is not None
+
+    def flip(self):
+        """Show the whole canvas"""
+        if self.target is not None:
+            self.scale(self.canvas, self.viewport.size, self.target)
+        pygame.display.flip()
+
+    def update(self, rects):
+        """Show the canvas regions in rects; a scaled canvas is shown whole"""
+        if self.target is not None:
+            # Scaling parts of the canvas separately would not line up
+            # exactly with the rest of the scaled frame
+            self.flip()
+        else:
+            pygame.display.update(rects)
+
+    def to_canvas(self, position):
+        """Map a window position to canvas coordinates"""
+        if self.target is None:
+            return position
+        x, y = position
+        return (int((x - self.viewport.x) * self.size[0] / self.viewport.width),
+                int((y - self.viewport.y) * self.size[1] / self.viewport.height))
+
+
+def flip():
+    """Show the whole frame on the active Display, or flip the plain pygame display"""
+    if _active is None:
+        pygame.display.flip()
+    else:
+        _active.flip()
+
+
+def update(rects):
+    """Show the changed regions of the frame, like pygame.display.update"""
+    if _active is None:
+        pygame.display.update(rects)
+    else:
+        _active.update(rects)
+
+
+def mouse_pos():
+    """The mouse position in canvas coordinates"""
+    position = pygame.mouse.get_pos()
+    return position if _active is None else _active.to_canvas(position)
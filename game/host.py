@@ -0,0 +1,398 @@
+"""
+Headless multi-match host for the Pong game.
+One process runs many independent matches at a fixed tick rate, for AI
+training and league play. Each host tick every match is owed one
+simulation tick; a scheduler hands them out in priority order until the
+tick's time budget is spent and lets matches that fell behind catch up with
+what is left. When there is not enough time, the lowest-priority matches
+are the ones that lag. A match that lags more than max_lag ticks is slowed
+down: the ticks beyond that are skipped, so it runs slower than real time
+rather than in bursts. If the host keeps overrunning its budget it sheds
+the lowest-priority matches, down to what the measured cost per tick says
+fits. Matches are game.simulation MatchState instances, so the host needs
+neither pygame nor a display.
+
+Usage:
+    python -m game.host --matches 1000 --seconds 30 --priorities 3
+"""
+
+import argparse
+import itertools
+import json
+import sys
+from array import array
+from collections import deque
+from time import perf_counter
+
+from game.ai import AIController
+from game.constants import (CONTINUOUS_COLLISION, HOST_BUDGET, HOST_MAX_CATCHUP, HOST_MAX_LAG,
+                            HOST_SHED_WINDOW, PACING_SPIN, SCREEN_WIDTH, SCREEN_HEIGHT, TICK_RATE,
+                            WINNING_SCORE)
+from game.pacing import FramePacer
+from game.profiler import percentile
+from game.simulation import PlayerInput, MatchState, Rules, step
+
+# Match status
+RUNNING = "running"
+FINISHED = "finished"
+SHED = "shed"
+
+_EMA = 1 / 64  # Weight of the newest sample in the per-match tick-time average
+
+
+class RemoteInput:
+    """
+    Input source for a paddle controlled from elsewhere, e.g. a networked
+    player. set() stores the newest input. Held keys repeat every tick until
+    the next set(), so a late packet keeps the paddle moving; the edges
+    (activate, hold, release) apply to the next tick only, and edges from
+    several packets that arrive between two ticks are all kept.
+    """
+    def __init__(self):
+        self.pending = PlayerInput()
+        self.input = PlayerInput()
+
+    def set(self, player_input):
+        pending = self.pending
+        pending.up = player_input.up
+        pending.down = player_input.down
+        pending.rotate_ccw = player_input.rotate_ccw
+        pending.rotate_cw = player_input.rotate_cw
+        pending.activate = pending.activate or player_input.activate
+        pending.hold = pending.hold or player_input.hold
+        pending.release = pending.release or player_input.release
+
+    def get_input(self, state):
+        pending, player_input = self.pending, self.input
+        player_input.up = pending.up
+        player_input.down = pending.down
+        player_input.rotate_ccw = pending.rotate_ccw
+        player_input.rotate_cw = pending.rotate_cw
+        player_input.activate, player_input.hold, player_input.release = \
+            pending.activate, pending.hold, pending.release
+        pending.activate = pending.hold = pending.release = False
+        return player_input
+
+
+class HostedMatch:
+    """
+    One match on a MatchHost: its state, an input source per paddle (any
+    object with get_input(state), such as an AIController or RemoteInput)
+    and its scheduling metrics. lag is measured in ticks.
+    """
+    def __init__(self, match_id, state, left, right, priority, joined, target_score):
+        self.id = match_id
+        self.state = state
+        self.left = left
+        self.right = right
+        self.priority = priority
+        self.target_score = target_score
+        self.status = RUNNING
+        self.joined = joined      # Host tick the match was added at
+        self.skipped = 0          # Ticks dropped by slowing the match down
+        self.tick_seconds = 0.0   # Moving average of one tick's duration
+        self.max_tick_seconds = 0.0
+
+    def owed(self, host_tick):
+        """Ticks the match is behind the host"""
+        return host_tick - self.joined - self.skipped - self.state.tick
+
+    def run(self, ticks):
+        """Simulate up to ticks ticks, stopping when the match is over; returns the ticks run"""
+        state = self.state
+        left, right = self.left, self.right
+        target = self.target_score
+        for run in range(1, ticks + 1):
+            step(state, (left.get_input(state), right.get_input(state)))
+            if state.player1_score >= target or state.player2_score >= target:
+                self.status = FINISHED
+                return run
+        return ticks
+
+    def stats(self, host_tick):
+        return {
+            "id": self.id,
+            "priority": self.priority,
+            "status": self.status,
+            "tick": self.state.tick,
+            "lag": max(0, self.owed(host_tick)) if self.status == RUNNING else 0,
+            "skipped": self.skipped,
+            "tick_us": self.tick_seconds * 1e6,
+            "max_tick_us": self.max_tick_seconds * 1e6,
+            "score": (self.state.player1_score, self.state.player2_score),
+        }
+
+
+class MatchHost:
+    """
+    Runs hosted matches at tick_rate within a time budget per tick.
+    budget is the fraction of each tick period spent simulating. Matches
+    with a higher priority are served first; matches with the same priority
+    take turns being first. Every shed_window ticks, if more than
+    overload_ratio of them could not reach every match, matches are removed,
+    lowest priority first, until the rest fit in the budget with headroom to
+    spare at the average cost of a match tick, unless shed is False.
+    on_finish and on_shed are called with each HostedMatch that ends or is
+    shed.
+    """
+    def __init__(self, tick_rate=TICK_RATE, budget=HOST_BUDGET, max_lag=HOST_MAX_LAG,
+                 max_catchup=HOST_MAX_CATCHUP, shed=True, shed_window=HOST_SHED_WINDOW,
+                 overload_ratio=0.1, headroom=0.1, on_finish=None, on_shed=None, history=600):
+        self.tick_rate = tick_rate
+        self.period = 1.0 / tick_rate
+        self.budget = budget * self.period
+        self.max_lag = max_lag
+        self.max_catchup = max_catchup
+        self.shed = shed
+        self.shed_window = shed_window
+        self.overload_ratio = overload_ratio
+        self.headroom = headroom
+        self.on_finish = on_finish
+        self.on_shed = on_shed
+
+        self.levels = {}       # priority -> deque of running matches, next to run first
+        self.priorities = []   # Keys of levels, highest first
+        self.count = 0
+        self.next_id = 0
+        self.host_tick = 0
+
+        # Metrics
+        self.finished = 0
+        self.shed_count = 0
+        self.overloaded_ticks = 0   # Host ticks that could not reach every match
+        self.match_ticks = 0        # Match ticks simulated
+        # Overload check over the current window of host ticks
+        self.window_ticks = 0
+        self.window_overloaded = 0
+        self.window_match_ticks = 0
+        self.window_seconds = 0.0
+        self.history = history
+        self.tick_times = array("d", bytes(8 * history))  # Ring of host tick durations
+        self.recorded = 0
+
+    def add(self, left=None, right=None, priority=0, seed=None, rules=None,
+            target_score=WINNING_SCORE, match_id=None):
+        """
+        Start a match and return its HostedMatch. Paddles without an input
+        source are played by the AI.
+        """
+        if match_id is None:
+            match_id = self.next_id
+            self.next_id += 1
+        rules = rules or Rules.for_tick_rate(self.tick_rate)
+        state = MatchState(SCREEN_WIDTH, SCREEN_HEIGHT, rules=rules, seed=seed,
+                           continuous=CONTINUOUS_COLLISION)
+        if left is None:
+            left = AIController(True, seed=state.seed ^ 1)
+        if right is None:
+            right = AIController(False, seed=state.seed ^ 2)
+        hosted = HostedMatch(match_id, state, left, right, priority, self.host_tick, target_score)
+        level = self.levels.get(priority)
+        if level is None:
+            level = self.levels[priority] = deque()
+            self.priorities = sorted(self.levels, reverse=True)
+        level.append(hosted)
+        self.count += 1
+        return hosted
+
+    def remove(self, hosted):
+        """Stop hosting a running match"""
+        level = self.levels[hosted.priority]
+        level.remove(hosted)
+        self.count -= 1
+        if not level:
+            del self.levels[hosted.priority]
+            self.priorities = sorted(self.levels, reverse=True)
+
+    def __len__(self):
+        return self.count
+
+    def _serve(self, limit, deadline):
+        """
+        Give each match up to limit of the ticks it is owed, highest priority
+        first, until the deadline. Returns how many matches were reached,
+        whether every match was, and how many are still owed ticks after it.
+        """
+        host_tick = self.host_tick
+        max_lag = self.max_lag
+        reached = behind = 0
+        done = []
+        now = perf_counter()
+        for priority in self.priorities:
+            level = self.levels[priority]
+            for index, hosted in enumerate(level):
+                if now >= deadline:
+                    # The ones not reached go first next time
+                    level.rotate(-index)
+                    self._retire(done)
+                    return reached, False, behind
+                reached += 1
+                owed = host_tick - hosted.joined - hosted.skipped - hosted.state.tick
+                if owed > max_lag:
+                    hosted.skipped += owed - max_lag
+                    owed = max_lag
+                if owed <= 0:
+                    continue
+                ticks = limit
+                if owed > limit:
+                    behind += 1
+                else:
+                    ticks = owed
+                ticks = hosted.run(ticks)
+                if hosted.status == FINISHED:
+                    done.append(hosted)
+                self.match_ticks += ticks
+                start, now = now, perf_counter()
+                seconds = (now - start) / ticks
+                hosted.tick_seconds += (seconds - hosted.tick_seconds) * _EMA
+                if seconds > hosted.max_tick_seconds:
+                    hosted.max_tick_seconds = seconds
+        self._retire(done)
+        return reached, True, behind
+
+    def _retire(self, done):
+        for hosted in done:
+            self.remove(hosted)
+            self.finished += 1
+            if self.on_finish:
+                self.on_finish(hosted)
+
+    def _shed(self, count):
+        """Remove count matches, lowest priority first"""
+        if count <= 0:
+            return
+        for priority in reversed(self.priorities):
+            level = self.levels[priority]
+            while count and level:
+                # The back of a level was served most recently, the front waited longest
+                hosted = level[-1]
+                self.remove(hosted)
+                hosted.status = SHED
+                self.shed_count += 1
+                count -= 1
+                if self.on_shed:
+                    self.on_shed(hosted)
+            if not count:
+                return
+
+    def tick(self):
+        """Advance the host by one tick and serve the matches within the budget"""
+        start = perf_counter()
+        deadline = start + self.budget
+        self.host_tick += 1
+        match_ticks = self.match_ticks
+        reached, complete, behind = self._serve(1, deadline)
+        if not complete:
+            self.overloaded_ticks += 1
+            self.window_overloaded += 1
+        else:
+            if behind and self.max_catchup > 1:
+                # Spare time goes to matches that fell behind
+                self._serve(self.max_catchup - 1, deadline)
+            # Matches of equal priority take turns being served first
+            for level in self.levels.values():
+                level.rotate(-1)
+        seconds = perf_counter() - start
+        self.tick_times[self.recorded % self.history] = seconds
+        self.recorded += 1
+
+        self.window_ticks += 1
+        self.window_match_ticks += self.match_ticks - match_ticks
+        self.window_seconds += seconds
+        if self.window_ticks >= self.shed_window:
+            if self.shed and self.window_overloaded > self.overload_ratio * self.window_ticks:
+                cost = self.window_seconds / max(1, self.window_match_ticks)
+                self._shed(self.count - int(self.budget / cost * (1 - self.headroom)))
+            self.window_ticks = self.window_overloaded = self.window_match_ticks = 0
+            self.window_seconds = 0.0
+
+    def run(self, seconds=None, on_report=None, report_interval=1.0):
+        """
+        Tick in real time until every match has ended or for seconds.
+        on_report, if given, is called with the host every report_interval seconds.
+        """
+        pacer = FramePacer(self.tick_rate, PACING_SPIN)
+        started = last_report = perf_counter()
+        while self.count:
+            pacer.wait()
+            self.tick()
+            now = perf_counter()
+            if on_report and now - last_report >= report_interval:
+                last_report = now
+                on_report(self)
+            if seconds is not None and now - started >= seconds:
+                break
+
+    def matches(self):
+        """Every running match, highest priority first"""
+        return [hosted for priority in self.priorities for hosted in self.levels[priority]]
+
+    def stats(self):
+        """Host metrics; tick times are in milliseconds over the recent ticks"""
+        times = sorted(self.tick_times[:min(self.recorded, self.history)])
+        lags = [max(0, hosted.owed(self.host_tick)) for hosted in self.matches()]
+        return {
+            "host_tick": self.host_tick,
+            "running": self.count,
+            "finished": self.finished,
+            "shed": self.shed_count,
+            "overloaded_ticks": self.overloaded_ticks,
+            "budget_ms": self.budget * 1000,
+            "tick_ms": {"p50": percentile(times, 0.5) * 1000,
+                        "p99": percentile(times, 0.99) * 1000,
+                        "max": times[-1] * 1000 if times else 0.0},
+            "lagging": sum(1 for lag in lags if lag),
+            "max_lag": max(lags, default=0),
+            "skipped": sum(hosted.skipped for hosted in self.matches()),
+        }
+
+    def match_stats(self):
+        """Per-match metrics of every running match"""
+        return [hosted.stats(self.host_tick) for hosted in self.matches()]
+
+
+def format_stats(stats):
+    return ("tick %6d  running %5d  finished %5d  shed %4d  lagging %4d (max %d)  "
+            "tick p50 %.2f ms p99 %.2f ms / %.2f ms budget  overloaded %d" % (
+                stats["host_tick"], stats["running"], stats["finished"], stats["shed"],
+                stats["lagging"], stats["max_lag"], stats["tick_ms"]["p50"],
+                stats["tick_ms"]["p99"], stats["budget_ms"], stats["overloaded_ticks"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many headless AI-vs-AI matches")
+    parser.add_argument("--matches", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=30, help="how long to run")
+    parser.add_argument("--priorities", type=int, default=1,
+                        help="spread matches evenly over this many priority levels")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE)
+    parser.add_argument("--budget", type=float, default=HOST_BUDGET,
+                        help="fraction of each tick spent simulating")
+    parser.add_argument("--no-shed", action="store_true",
+                        help="only slow matches down under overload, never remove them")
+    parser.add_argument("--replace", action="store_true",
+                        help="start a new match whenever one ends")
+    parser.add_argument("--seed", type=int, help="seeds the matches 0, 1, 2... from this")
+    parser.add_argument("--output", help="write the final host and per-match metrics as JSON")
+    args = parser.parse_args(argv)
+
+    seeds = itertools.count(args.seed) if args.seed is not None else None
+
+    def start(priority):
+        host.add(priority=priority, seed=next(seeds) if seeds else None)
+
+    host = MatchHost(args.tick_rate, args.budget, shed=not args.no_shed,
+                     on_finish=(lambda hosted: start(hosted.priority)) if args.replace else None)
+    for index in range(args.matches):
+        start(index % args.priorities)
+    host.run(args.seconds, lambda host: print(format_stats(host.stats())))
+    stats = host.stats()
+    print(format_stats(stats))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"host": stats, "matches": host.match_stats()}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""
+Multiball mode for the Pong game.
+One match with up to thousands of balls kept in contiguous NumPy arrays
+(struct-of-arrays layout). A uniform-grid spatial hash, rebuilt every tick,
+finds ball-paddle and ball-ball contacts so each tick costs O(N) instead of
+testing every ball against every paddle and every other ball.
+Paddles reuse game.simulation's PaddleState and paddle functions.
+Requires numpy.
+"""
+
+import numpy as np
+
+from game.constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from game.simulation import (PaddleState, Rules, activate_power_up, move_paddle,
+                             rotate_arrow)
+
+LEFT = 0
+RIGHT = 1
+
+# Neighbouring cells checked for ball-ball pairs. Only half of the
+# neighbourhood is needed; the other half is covered from the other cell.
+_NEIGHBOUR_OFFSETS = ((1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+def _expand_ranges(starts, counts):
+    """Return the concatenation of arange(start, start + count) for each pair"""
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.intp)
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(total) - offsets + np.repeat(starts, counts)
+
+
+class SpatialGrid:
+    """
+    Uniform-grid spatial hash over the playfield.
+    build() sorts the balls by cell; each cell's balls are then a contiguous
+    run of `order`, found through `cell_start`. Positions outside the field
+    are clamped into the border cells.
+    """
+    def __init__(self, width, height, cell_size):
+        self.cell_size = cell_size
+        self.columns = max(1, int(np.ceil(width / cell_size)))
+        self.rows = max(1, int(np.ceil(height / cell_size)))
+        self.order = np.empty(0, dtype=np.intp)
+        self.cell_x = self.cell_y = self.sorted_cells = self.order
+        self.cell_start = np.zeros(self.columns * self.rows + 1, dtype=np.intp)
+        self._cell_ids = np.arange(self.columns * self.rows + 1)
+
+    def build(self, x, y, indices):
+        """Bin the balls given by indices at positions x[indices], y[indices]"""
+        cell_x = np.clip((x[indices] // self.cell_size).astype(np.intp), 0, self.columns - 1)
+        cell_y = np.clip((y[indices] // self.cell_size).astype(np.intp), 0, self.rows - 1)
+        cells = cell_y * self.columns + cell_x
+        sort = np.argsort(cells, kind="stable")
+        self.order = indices[sort]
+        self.cell_x = cell_x[sort]
+        self.cell_y = cell_y[sort]
+        self.sorted_cells = cells[sort]
+        self.cell_start = np.searchsorted(self.sorted_cells, self._cell_ids)
+
+    def query_rect(self, left, top, right, bottom):
+        """Return the indices of balls in every cell touching the rectangle"""
+        size = self.cell_size
+        x0 = min(max(int(left // size), 0), self.columns - 1)
+        x1 = min(max(int(right // size), 0), self.columns - 1)
+        y0 = min(max(int(top // size), 0), self.rows - 1)
+        y1 = min(max(int(bottom // size), 0), self.rows - 1)
+        # Cells are numbered row by row, so each row's span is one run of order
+        rows = np.arange(y0, y1 + 1) * self.columns
+        starts = self.cell_start[rows + x0]
+        counts = self.cell_start[rows + x1 + 1] - starts
+        return self.order[_expand_ranges(starts, counts)]
+
+    def pairs(self):
+        """Return (first, second) index arrays of balls in the same or adjacent cells"""
+        position = np.arange(len(self.order))
+        cell_end = self.cell_start[self.sorted_cells + 1]
+
+        # Pairs within a cell: each ball with the balls after it in the run
+        firsts = [position]
+        starts = [position + 1]
+        counts = [cell_end - position - 1]
+        for dx, dy in _NEIGHBOUR_OFFSETS:
+            cell_x = self.cell_x + dx
+            cell_y = self.cell_y + dy
+            valid = (cell_x >= 0) & (cell_x < self.columns) & (cell_y < self.rows)
+            neighbour = np.where(valid, cell_y * self.columns + cell_x, 0)
+            begin = self.cell_start[neighbour]
+            firsts.append(position)
+            starts.append(begin)
+            counts.append(np.where(valid, self.cell_start[neighbour + 1] - begin, 0))
+
+        firsts = np.concatenate(firsts)
+        starts = np.concatenate(starts)
+        counts = np.concatenate(counts)
+        first = np.repeat(firsts, counts)
+        second = _expand_ranges(starts, counts)
+        return self.order[first], self.order[second]
+
+
+class MultiballState:
+    """
+    A match with many balls.
+    Balls occupy the first `count` slots of the x/y/speed_x/speed_y arrays,
+    which are allocated once for max_balls. held_by is -1 for a free ball or
+    the side (LEFT/RIGHT) holding it. Each ball scores, bounces and can be
+    caught and thrown on its own; every paddle hit adds to the load bar.
+    """
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, rules=None, seed=None,
+                 ball_count=1, max_balls=4096, ball_radius=10, ball_collisions=True):
+        self.width = width
+        self.height = height
+        self.rules = rules or Rules()
+        self.rng = np.random.default_rng(seed)
+        self.radius = ball_radius
+        self.ball_collisions = ball_collisions
+        self.max_balls = max_balls
+
+        self.left = PaddleState(20, height // 2 - 50, True)
+        self.right = PaddleState(width - 35, height // 2 - 50, False)
+        self.holding = [-1, -1]  # Index of the ball each paddle holds
+
+        self.count = 0
+        self.x = np.zeros(max_balls)
+        self.y = np.zeros(max_balls)
+        self.speed_x = np.zeros(max_balls)
+        self.speed_y = np.zeros(max_balls)
+        self.held_by = np.full(max_balls, -1, dtype=np.int8)
+
+        # Balls can only touch when they share or neighbour a cell
+        self.grid = SpatialGrid(width, height, 2 * ball_radius)
+
+        self.player1_score = 0
+        self.player2_score = 0
+        self.tick = 0
+        self.initial_balls = ball_count
+        self.add_balls(ball_count)
+
+    def reset(self, seed=None):
+        """Start a new match in place with the initial number of balls, reusing the arrays"""
+        self.rng = np.random.default_rng(seed)
+        self.left.reset(self.height // 2 - 50)
+        self.right.reset(self.height // 2 - 50)
+        self.holding = [-1, -1]
+        self.count = 0
+        self.held_by.fill(-1)
+        self.player1_score = 0
+        self.player2_score = 0
+        self.tick = 0
+        self.add_balls(self.initial_balls)
+        return self
+
+    def add_balls(self, count):
+        """Serve count new balls; returns how many were added"""
+        count = min(count, self.max_balls - self.count)
+        new = np.arange(self.count, self.count + count)
+        self.count += count
+        self._serve(new)
+        return count
+
+    def _serve(self, indices):
+        """Serve balls from random heights on the center line (simulation.reset_ball)"""
+        rules = self.rules
+        count = len(indices)
+        self.x[indices] = self.width // 2
+        self.y[indices] = self.rng.uniform(self.radius, self.height - self.radius, size=count)
+        self.speed_x[indices] = self.rng.choice((-1.0, 1.0), size=count) * rules.serve_speed
+        self.speed_y[indices] = self.rng.uniform(-1, 1, size=count) * rules.serve_spread
+        self.held_by[indices] = -1
+
+    def paddles(self):
+        return self.left, self.right
+
+    def _overlapping(self, paddle, indices):
+        """Return the subset of indices whose bounding box overlaps the paddle"""
+        x, y, radius = self.x[indices], self.y[indices], self.radius
+        touching = ((x - radius < paddle.right) & (x + radius > paddle.left) &
+                    (y - radius < paddle.bottom) & (y + radius > paddle.top))
+        return indices[touching]
+
+    def _paddle_candidates(self, paddle):
+        radius = self.radius
+        return self.grid.query_rect(paddle.left - radius, paddle.top - radius,
+                                    paddle.right + radius, paddle.bottom + radius)
+
+    def _attach(self, side):
+        """Place the ball held by a paddle at its front edge"""
+        paddle = self.paddles()[side]
+        index = self.holding[side]
+        self.x[index] = paddle.right + self.radius if paddle.is_left else paddle.left - self.radius
+        self.y[index] = paddle.centery
+
+    def _hold(self, side):
+        """Catch the free ball nearest the paddle's center, if powered up and touching"""
+        paddle = self.paddles()[side]
+        if not paddle.is_powered_up or self.holding[side] >= 0:
+            return False
+        # Hold presses are rare and come before this tick's grid is built,
+        # so test every free ball directly
+        free = np.flatnonzero(self.held_by[:self.count] < 0)
+        touching = self._overlapping(paddle, free)
+        if len(touching) == 0:
+            return False
+        index = int(touching[np.argmin(np.abs(self.y[touching] - paddle.centery))])
+        paddle.is_holding_ball = True
+        paddle.is_powered_up = False
+        self.holding[side] = index
+        self.held_by[index] = side
+        self.speed_x[index] = 0
+        self.speed_y[index] = 0
+        self._attach(side)
+        return True
+
+    def _throw(self, side):
+        """Release the held ball along the arrow (simulation.throw_ball)"""
+        paddle = self.paddles()[side]
+        index = self.holding[side]
+        if index < 0:
+            return False
+        angle_radians = np.radians(paddle.arrow_angle)
+        self.speed_x[index] = self.rules.throw_speed * np.cos(angle_radians)
+        self.speed_y[index] = self.rules.throw_speed * np.sin(angle_radians)
+        self.held_by[index] = -1
+        self.holding[side] = -1
+        paddle.is_holding_ball = False
+        return True
+
+    def _bounce_off_paddle(self, side):
+        """Bounce every free ball touching a paddle; returns the number of hits"""
+        paddle = self.paddles()[side]
+        rules = self.rules
+        hit = self._overlapping(paddle, self._paddle_candidates(paddle))
+        hit = hit[self.held_by[hit] < 0]
+        if len(hit) == 0:
+            return 0
+
+        half_height = paddle.height / 2
+        bounce_angle = ((paddle.y + half_height) - self.y[hit]) / half_height * 0.8
+        speed_x = -self.speed_x[hit]
+        speed_x = np.where(np.abs(speed_x) < rules.max_speed,
+                           speed_x * (1 + rules.speed_increase), speed_x)
+        self.speed_x[hit] = speed_x
+        self.speed_y[hit] = -bounce_angle * np.abs(speed_x)
+        self.x[hit] = paddle.right + self.radius if paddle.is_left else paddle.left - self.radius
+
+        paddle.load_counter = min(paddle.load_counter + rules.hit_load * len(hit),
+                                  rules.max_load)
+        return len(hit)
+
+    def _collide_balls(self):
+        """Separate overlapping ball pairs and exchange their velocity along the contact normal"""
+        first, second = self.grid.pairs()
+        if len(first) == 0:
+            return 0
+        dx = self.x[second] - self.x[first]
+        dy = self.y[second] - self.y[first]
+        distance_sq = dx * dx + dy * dy
+        diameter = 2 * self.radius
+        touching = (distance_sq < diameter * diameter) & (distance_sq > 0)
+        if not touching.any():
+            return 0
+        first, second = first[touching], second[touching]
+        distance = np.sqrt(distance_sq[touching])
+        normal_x = dx[touching] / distance
+        normal_y = dy[touching] / distance
+
+        # Equal masses: swap the velocity components along the normal when approaching
+        approach = ((self.speed_x[first] - self.speed_x[second]) * normal_x +
+                    (self.speed_y[first] - self.speed_y[second]) * normal_y)
+        approach = np.maximum(approach, 0)
+        np.add.at(self.speed_x, first, -approach * normal_x)
+        np.add.at(self.speed_y, first, -approach * normal_y)
+        np.add.at(self.speed_x, second, approach * normal_x)
+        np.add.at(self.speed_y, second, approach * normal_y)
+
+        # Push each ball half the overlap apart
+        push = (diameter - distance) / 2
+        np.add.at(self.x, first, -push * normal_x)
+        np.add.at(self.y, first, -push * normal_y)
+        np.add.at(self.x, second, push * normal_x)
+        np.add.at(self.y, second, push * normal_y)
+
+        # A ball in several contacts at once sums their impulses; cap the
+        # result at the fastest speed a paddle hit can produce
+        touched = np.unique(np.concatenate((first, second)))
+        speed = np.hypot(self.speed_x[touched], self.speed_y[touched])
+        limit = self.rules.max_speed * (1 + self.rules.speed_increase)
+        scale = np.minimum(1.0, limit / np.maximum(speed, 1e-9))
+        self.speed_x[touched] *= scale
+        self.speed_y[touched] *= scale
+        return len(first)
+
+    def step(self, inputs):
+        """
+        Advance the match by one tick.
+        inputs is a (left, right) pair of simulation.PlayerInput, with the
+        same meaning as in simulation.step.
+        """
+        rules, height = self.rules, self.height
+        paddles = self.paddles()
+
+        # Edge-triggered actions, left paddle first
+        for side, paddle_input in enumerate(inputs):
+            if paddle_input.activate:
+                activate_power_up(paddles[side], rules)
+        for side, paddle_input in enumerate(inputs):
+            if paddle_input.hold:
+                self._hold(side)
+        for side, paddle_input in enumerate(inputs):
+            if paddle_input.release:
+                self._throw(side)
+
+        # Paddle movement and arrow rotation
+        for paddle, paddle_input in zip(paddles, inputs):
+            if paddle_input.up:
+                move_paddle(paddle, "up", rules, height)
+            if paddle_input.down:
+                move_paddle(paddle, "down", rules, height)
+            if paddle.is_holding_ball:
+                if paddle_input.rotate_ccw:
+                    rotate_arrow(paddle, "counterclockwise", rules)
+                if paddle_input.rotate_cw:
+                    rotate_arrow(paddle, "clockwise", rules)
+
+        # Free balls move and bounce off the top and bottom walls
+        count = self.count
+        free = np.flatnonzero(self.held_by[:count] < 0)
+        self.x[free] += self.speed_x[free]
+        self.y[free] += self.speed_y[free]
+        y = self.y[free]
+        wall = free[(y <= self.radius) | (y >= height - self.radius)]
+        if len(wall):
+            jitter = self.rng.uniform(-rules.wall_jitter, rules.wall_jitter, size=len(wall))
+            self.speed_y[wall] = -self.speed_y[wall] + jitter
+
+        # Contacts from the spatial hash
+        self.grid.build(self.x, self.y, free)
+        self._bounce_off_paddle(LEFT)
+        self._bounce_off_paddle(RIGHT)
+        if self.ball_collisions:
+            self._collide_balls()
+
+        # Held balls follow their paddles
+        for side in (LEFT, RIGHT):
+            if self.holding[side] >= 0:
+                self._attach(side)
+
+        # Each ball that leaves the field scores and is served again
+        x = self.x[free]
+        right_scores = free[x < 0]
+        left_scores = free[x > self.width]
+        self.player2_score += len(right_scores)
+        self.player1_score += len(left_scores)
+        if len(right_scores) or len(left_scores):
+            self._serve(np.concatenate((right_scores, left_scores)))
+
+        self.tick += 1
+        return self
+
+    def positions(self):
+        """Return views of the active balls' x and y coordinates"""
+        return self.x[:self.count], self.y[:self.count]
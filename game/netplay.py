@@ -0,0 +1,344 @@
+"""
+Rollback netcode for networked VS_FRIEND play.
+Each peer runs the full simulation locally and sends only its own paddle's
+inputs over UDP. Missing remote inputs are predicted; when the real input
+arrives and differs, the match is rolled back to that tick from a snapshot
+and re-simulated, so local input is never delayed by network latency.
+"""
+
+import heapq
+import random
+import socket
+import struct
+import sys
+import time
+import zlib
+
+from game.replay import PLAYER_MASK, decode_player, encode_player
+from game.simulation import SNAPSHOT_SIZE, step
+
+MAGIC = b"PN"
+INPUT_PACKET = 0
+HELLO_PACKET = 1
+HELLO_ACK_PACKET = 2
+
+# Input packet: header, then `count` input bytes starting at start_tick.
+# ack is the newest tick the sender has received every remote input for;
+# checksum_tick/checksum let peers detect a desync (checksum_tick 0 = none).
+_INPUT_HEADER = struct.Struct("<2sBiIIIB")
+_HELLO = struct.Struct("<2sBQ")
+
+# Movement and rotation keys are held; SHIFT/SPACE edges are not repeated
+# when predicting the remote player's next input
+HELD_MASK = 0b1111
+
+MAX_INPUTS_PER_PACKET = 64
+CHECKSUM_INTERVAL = 60
+
+
+class UdpTransport:
+    """
+    Non-blocking UDP socket connected to one remote peer.
+    With remote_address None (hosting), the peer is whoever sends first.
+    A host name in remote_address is resolved once here, since datagrams
+    are matched against the numeric address recvfrom() reports.
+    """
+    def __init__(self, local_port, remote_address=None, bind_host="0.0.0.0"):
+        if remote_address is not None:
+            host, port = remote_address
+            remote_address = (socket.gethostbyname(host), port)
+        self.remote_address = remote_address
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((bind_host, local_port))
+        self.socket.setblocking(False)
+
+    def send(self, data):
+        if self.remote_address is None:
+            return
+        try:
+            self.socket.sendto(data, self.remote_address)
+        except OSError:
+            pass  # e.g. ICMP port unreachable before the peer starts
+
+    def receive(self):
+        """Return every datagram waiting on the socket"""
+        packets = []
+        while True:
+            try:
+                data, address = self.socket.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return packets
+            except OSError:
+                continue
+            if self.remote_address is None:
+                self.remote_address = address
+            elif address != self.remote_address:
+                continue
+            packets.append(data)
+
+    def close(self):
+        self.socket.close()
+
+
+class LossyTransport:
+    """
+    Wraps a transport to simulate one-way latency, jitter and packet loss on
+    outgoing datagrams, for testing on loopback. clock can be replaced by a
+    virtual clock to make tests independent of wall time.
+    """
+    def __init__(self, transport, latency=0.0, jitter=0.0, loss=0.0, seed=None,
+                 clock=time.monotonic):
+        self.transport = transport
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.queue = []  # (deliver_at, sequence, data)
+        self.sequence = 0
+        self.dropped = 0
+
+    def _flush(self):
+        now = self.clock()
+        while self.queue and self.queue[0][0] <= now:
+            self.transport.send(heapq.heappop(self.queue)[2])
+
+    def send(self, data):
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+        else:
+            deliver_at = self.clock() + self.latency + self.rng.uniform(0, self.jitter)
+            heapq.heappush(self.queue, (deliver_at, self.sequence, data))
+            self.sequence += 1
+        self._flush()
+
+    def receive(self):
+        self._flush()
+        return self.transport.receive()
+
+    def close(self):
+        self.transport.close()
+
+
+def handshake(transport, is_host, seed=None, timeout=10.0, interval=0.1):
+    """
+    Agree on the match seed before play. The joining peer sends HELLO until
+    the host answers with HELLO_ACK carrying its seed; returns the shared seed.
+    Raises TimeoutError if the peer does not answer in time.
+    """
+    if is_host and seed is None:
+        seed = random.getrandbits(64)
+    deadline = time.monotonic() + timeout
+    next_send = 0.0
+    while time.monotonic() < deadline:
+        if not is_host and time.monotonic() >= next_send:
+            transport.send(_HELLO.pack(MAGIC, HELLO_PACKET, 0))
+            next_send = time.monotonic() + interval
+        for data in transport.receive():
+            if len(data) != _HELLO.size:
+                continue
+            magic, kind, value = _HELLO.unpack(data)
+            if magic != MAGIC:
+                continue
+            if is_host and kind == HELLO_PACKET:
+                transport.send(_HELLO.pack(MAGIC, HELLO_ACK_PACKET, seed))
+                return seed
+            if not is_host and kind == HELLO_ACK_PACKET:
+                return value
+        time.sleep(0.001)
+    raise TimeoutError("No answer from the other player")
+
+
+class RollbackSession:
+    """
+    Runs one peer of a networked match.
+    Both peers must start from identical MatchStates (same seed and rules).
+    Call advance(local_input) once per tick. Local input takes effect
+    input_delay ticks later; at most max_rollback ticks are simulated on
+    predicted remote input before the session stalls to wait for the peer.
+    """
+    def __init__(self, state, local_side, transport, input_delay=2, max_rollback=8):
+        self.state = state
+        self.local_side = local_side  # 0 = left paddle, 1 = right paddle
+        self.transport = transport
+        self.input_delay = input_delay
+        self.max_rollback = max_rollback
+
+        start = state.tick
+        self.tick = start
+        # Ticks inside the initial input delay have no input from either side
+        self.local_inputs = {start + t: 0 for t in range(input_delay)}
+        self.remote_inputs = dict(self.local_inputs)
+        self.remote_confirmed = start + input_delay - 1  # All remote inputs up to here known
+        self.local_acked = start + input_delay - 1       # Peer has all our inputs up to here
+        self.newest_local = start + input_delay - 1      # Latest tick with queued local input
+        self.last_remote_bits = 0
+        self.predicted = {}      # tick -> remote bits guessed when it was simulated
+        self.rollback_to = None  # Earliest mispredicted tick, if any
+
+        # Ring buffer of snapshots taken before each tick
+        self.ring_size = max_rollback + 2
+        self.snapshots = bytearray(SNAPSHOT_SIZE * self.ring_size)
+
+        self.local_checksums = {}
+        self.remote_checksum = None
+        self.next_checksum_tick = start + CHECKSUM_INTERVAL
+        self._decoded = {}
+
+        # Statistics
+        self.rollbacks = 0
+        self.resimulated_ticks = 0
+        self.stalls = 0
+        self.desyncs = 0
+
+    def _inputs_for(self, local_bits, remote_bits):
+        """Return the (left, right) PlayerInput pair for a tick"""
+        key = (local_bits, remote_bits)
+        pair = self._decoded.get(key)
+        if pair is None:
+            local, remote = decode_player(local_bits), decode_player(remote_bits)
+            pair = (local, remote) if self.local_side == 0 else (remote, local)
+            self._decoded[key] = pair
+        return pair
+
+    def _simulate_tick(self):
+        tick = self.tick
+        self.state.snapshot_into(self.snapshots, (tick % self.ring_size) * SNAPSHOT_SIZE)
+        remote_bits = self.remote_inputs.get(tick)
+        if remote_bits is None:
+            remote_bits = self.last_remote_bits & HELD_MASK
+            self.predicted[tick] = remote_bits
+        step(self.state, self._inputs_for(self.local_inputs.get(tick, 0), remote_bits))
+        self.tick += 1
+
+    def _rollback(self):
+        """Rewind to the earliest mispredicted tick and simulate back to the present"""
+        target = self.rollback_to
+        self.rollback_to = None
+        end = self.tick
+        self.state.restore(self.snapshots, (target % self.ring_size) * SNAPSHOT_SIZE)
+        self.tick = target
+        while self.tick < end:
+            self._simulate_tick()
+        self.rollbacks += 1
+        self.resimulated_ticks += end - target
+
+    def _send(self):
+        first = self.local_acked + 1
+        last = min(self.newest_local, first + MAX_INPUTS_PER_PACKET - 1)
+        inputs = bytes(self.local_inputs[tick] for tick in range(first, last + 1))
+        checksum_tick, checksum = 0, 0
+        if self.local_checksums:
+            checksum_tick = max(self.local_checksums)
+            checksum = self.local_checksums[checksum_tick]
+        header = _INPUT_HEADER.pack(MAGIC, INPUT_PACKET, self.remote_confirmed,
+                                    checksum_tick, checksum, first, len(inputs))
+        self.transport.send(header + inputs)
+
+    def poll(self):
+        """Process every packet received from the peer"""
+        for data in self.transport.receive():
+            if len(data) == _HELLO.size:
+                magic, kind, value = _HELLO.unpack(data)
+                if magic == MAGIC and kind == HELLO_PACKET:
+                    # The joining peer missed our answer; repeat it
+                    self.transport.send(_HELLO.pack(MAGIC, HELLO_ACK_PACKET, self.state.seed))
+                continue
+            if len(data) < _INPUT_HEADER.size:
+                continue
+            magic, kind, ack, checksum_tick, checksum, first, count = \
+                _INPUT_HEADER.unpack_from(data)
+            if magic != MAGIC or kind != INPUT_PACKET:
+                continue
+
+            self.local_acked = max(self.local_acked, ack)
+            if checksum_tick:
+                self.remote_checksum = (checksum_tick, checksum)
+
+            for offset in range(count):
+                tick = first + offset
+                if tick <= self.remote_confirmed or tick in self.remote_inputs:
+                    continue
+                bits = data[_INPUT_HEADER.size + offset] & PLAYER_MASK
+                self.remote_inputs[tick] = bits
+                guess = self.predicted.pop(tick, None)
+                if guess is not None and guess != bits:
+                    if self.rollback_to is None or tick < self.rollback_to:
+                        self.rollback_to = tick
+
+            while self.remote_confirmed + 1 in self.remote_inputs:
+                self.remote_confirmed += 1
+            self.last_remote_bits = self.remote_inputs.get(self.remote_confirmed,
+                                                           self.last_remote_bits)
+        self._forget_old_inputs()
+
+    def _forget_old_inputs(self):
+        oldest = min(self.remote_confirmed, self.local_acked, self.tick) - self.ring_size
+        for inputs in (self.local_inputs, self.remote_inputs):
+            for tick in [tick for tick in inputs if tick < oldest]:
+                del inputs[tick]
+
+    def _update_checksums(self):
+        """Checksum periodic states that no rollback can change any more"""
+        tick = self.next_checksum_tick
+        while tick <= self.tick and tick - 1 <= self.remote_confirmed:
+            if tick == self.tick:
+                data = self.state.snapshot()
+            elif self.tick - tick < self.ring_size:
+                offset = (tick % self.ring_size) * SNAPSHOT_SIZE
+                data = self.snapshots[offset:offset + SNAPSHOT_SIZE]
+            else:
+                data = None
+            if data is not None:
+                self.local_checksums[tick] = zlib.crc32(data)
+            tick += CHECKSUM_INTERVAL
+        self.next_checksum_tick = tick
+
+        if self.remote_checksum is not None:
+            remote_tick, remote_value = self.remote_checksum
+            local_value = self.local_checksums.get(remote_tick)
+            if local_value is not None:
+                if local_value != remote_value:
+                    self.desyncs += 1
+                    print("Netplay desync detected at tick %d" % remote_tick, file=sys.stderr)
+                self.remote_checksum = None
+        for old in [old for old in self.local_checksums if old < tick - 10 * CHECKSUM_INTERVAL]:
+            del self.local_checksums[old]
+
+    def advance(self, local_input):
+        """
+        Queue local_input and simulate one tick.
+        Returns False without advancing if the peer is too far behind.
+        """
+        self.poll()
+        if self.tick - self.remote_confirmed > self.max_rollback:
+            self.stalls += 1
+            self._send()
+            return False
+
+        self.newest_local = self.tick + self.input_delay
+        self.local_inputs[self.newest_local] = encode_player(local_input)
+        self._send()
+        if self.rollback_to is not None:
+            self._rollback()
+        self._simulate_tick()
+        self._update_checksums()
+        return True
+
+    def settle(self):
+        """
+        Exchange inputs and apply late corrections without advancing, e.g.
+        once a match has ended. Returns True when every remote input up to
+        the current tick is known, so the state is final.
+        """
+        self.poll()
+        self._send()
+        if self.rollback_to is not None:
+            self._rollback()
+        self._update_checksums()
+        return self.remote_confirmed >= self.tick - 1
+
+    @property
+    def rollback_frames(self):
+        """How many ticks are currently simulated on predicted input"""
+        return self.tick - 1 - self.remote_confirmed
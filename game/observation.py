@@ -0,0 +1,152 @@
+"""
+Pixel observations for training agents on rendered frames.
+A MatchState is drawn with the regular Paddle, Ball and ScoreSystem draw
+methods onto an offscreen surface, restoring only the regions that changed
+(see game.render). Its pixels are read through a pygame.surfarray view
+instead of being copied out; downsampling is a strided view of them, and
+only the kept pixels are gathered, converted to grayscale and written into
+a preallocated frame-stack ring buffer.
+Requires numpy.
+"""
+
+from contextlib import contextmanager
+
+import numpy as np
+import pygame
+
+from entities import Ball, Paddle, ScoreSystem
+from game.constants import BLACK, SCREEN_WIDTH, SCREEN_HEIGHT
+from game.render import DirtyRectRenderer
+
+# ITU-R BT.601 luma weights scaled to sum to 256
+_LUMA = (77, 150, 29)
+
+
+class ObservationRenderer:
+    """
+    Renders MatchStates into stacked pixel observations.
+    Observations have shape (stack, height // downsample, width // downsample)
+    in grayscale or (stack, height // downsample, width // downsample, 3) in
+    RGB, oldest frame first. The array returned by observe() is a view into
+    the ring buffer and is only valid until the next call.
+    """
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, grayscale=True,
+                 downsample=1, stack=4, draw_scores=True):
+        if not pygame.font.get_init():
+            pygame.font.init()
+        self.width = width
+        self.height = height
+        self.grayscale = grayscale
+        self.downsample = downsample
+        self.stack = stack
+        self.draw_scores = draw_scores
+
+        # Offscreen target; needs no display
+        self.surface = pygame.Surface((width, height), depth=32)
+
+        # The center line never changes, so it is drawn once and only the
+        # regions under moving elements are restored from it
+        self.score_system = ScoreSystem()
+        background = pygame.Surface((width, height), depth=32)
+        background.fill(BLACK)
+        self.score_system.draw_center_line(background, width, height)
+        self.renderer = DirtyRectRenderer(self.surface, background)
+
+        self.left_paddle = Paddle(20, height // 2 - 50, is_left=True)
+        self.right_paddle = Paddle(width - 35, height // 2 - 50, is_left=False)
+        self.ball = Ball(width // 2, height // 2)
+
+        # Frames are written twice, `stack` slots apart, so the latest
+        # `stack` frames are always one contiguous slice of the buffer
+        obs_width = len(range(0, width, downsample))
+        obs_height = len(range(0, height, downsample))
+        shape = (obs_height, obs_width) if grayscale else (obs_height, obs_width, 3)
+        self.frames = np.zeros((2 * stack,) + shape, dtype=np.uint8)
+        self.index = 0
+
+        # Scratch arrays for the grayscale conversion, reused every frame
+        self._packed = np.empty((obs_height, obs_width), dtype=np.uint32)
+        self._luma = np.empty_like(self._packed)
+        self._channel = np.empty_like(self._packed)
+        self._shifts = self.surface.get_shifts()[:3]
+
+    @property
+    def shape(self):
+        """Shape of the arrays returned by observe()"""
+        return (self.stack,) + self.frames.shape[1:]
+
+    def reset(self):
+        """Clear the frame stack, e.g. at the start of an episode"""
+        self.frames[:] = 0
+        self.index = 0
+        self.renderer.invalidate()
+
+    def render(self, state):
+        """Draw a MatchState onto the offscreen surface"""
+        left_paddle, right_paddle, ball = self.left_paddle, self.right_paddle, self.ball
+        left_paddle.sync_from(state.left)
+        right_paddle.sync_from(state.right)
+        ball.sync_from(state.ball)
+        renderer = self.renderer
+        if self.draw_scores:
+            score_system = self.score_system
+            score_system.sync_from(state)
+            renderer.add("scores", score_system.get_bounds(self.width), score_system.render_key(),
+                         score_system.draw_scores, self.width)
+        renderer.add_sprites("left_paddle", left_paddle.get_bounds(), left_paddle.render_key(),
+                             left_paddle.sprites())
+        renderer.add_sprites("right_paddle", right_paddle.get_bounds(),
+                             right_paddle.render_key(), right_paddle.sprites())
+        renderer.add_sprites("ball", ball.get_bounds(), ball.render_key(), ball.sprites())
+        renderer.render()
+
+    @contextmanager
+    def pixels2d(self):
+        """Like pixels(), but yields the packed 32-bit pixels as a (width, height) array"""
+        view = pygame.surfarray.pixels2d(self.surface)
+        try:
+            yield view
+        finally:
+            del view
+
+    @contextmanager
+    def pixels(self):
+        """
+        Yield the surface's RGB pixels as a (width, height, 3) array without
+        copying. The surface is locked until the block ends, so the view
+        must not be kept or used after it.
+        """
+        view = pygame.surfarray.pixels3d(self.surface)
+        try:
+            yield view
+        finally:
+            del view
+
+    def _write_frame(self, out):
+        """Downsample and convert the surface's pixels into out (height, width[, 3])"""
+        step = self.downsample
+        if not self.grayscale:
+            with self.pixels() as view:
+                out[...] = view[::step, ::step].transpose(1, 0, 2)
+            return
+
+        # Gather the kept pixels in row order, then weight each packed channel
+        packed, luma, channel = self._packed, self._luma, self._channel
+        with self.pixels2d() as view:
+            np.copyto(packed, view.T[::step, ::step])
+        for shift, weight, target in zip(self._shifts, _LUMA, (luma, channel, channel)):
+            np.right_shift(packed, shift, out=target)
+            np.bitwise_and(target, 0xFF, out=target)
+            np.multiply(target, weight, out=target)
+            if target is channel:
+                np.add(luma, channel, out=luma)
+        np.right_shift(luma, 8, out=out, casting="unsafe")
+
+    def observe(self, state):
+        """Render state, push it onto the frame stack and return the stack"""
+        self.render(state)
+        index = self.index
+        self._write_frame(self.frames[index])
+        self.frames[index + self.stack] = self.frames[index]
+        self.index = (index + 1) % self.stack
+        return self.frames[index + 1:index + 1 + self.stack]
@@ -0,0 +1,53 @@
+"""
+Low-latency frame pacing for the Pong game.
+The default loop samples input at the top of a frame and sleeps in
+Clock.tick() at the bottom, so input can be nearly a frame old when the
+frame is presented. With a FramePacer the loop sleeps first, then samples
+input, simulates and presents straight away. The wait sleeps for most of
+the time and spins on the high-resolution timer for the rest, since a
+sleep alone can wake up a millisecond or more late.
+"""
+
+from time import perf_counter, sleep
+
+
+class FramePacer:
+    """
+    Waits for evenly spaced frame deadlines with a hybrid sleep/spin wait.
+    Each deadline is one period after the previous one, so a late wake-up
+    does not push back the frames after it; when a frame runs more than a
+    period late the schedule restarts from the current time instead of
+    rushing to catch up.
+    """
+    def __init__(self, fps, spin_seconds=0.001):
+        self.period = 1.0 / fps
+        self.spin_seconds = spin_seconds
+        self.deadline = None
+        self.last = None
+        self.lateness = 0.0  # How far past its deadline the last wait returned
+
+    def reset(self):
+        """Restart the schedule, e.g. after leaving a menu"""
+        self.deadline = None
+        self.last = None
+
+    def wait(self):
+        """Wait for the next frame's deadline and return the seconds since the previous wait"""
+        now = perf_counter()
+        if self.deadline is None:
+            self.deadline = self.last = now
+        deadline = self.deadline
+        remaining = deadline - now
+        if remaining > self.spin_seconds:
+            sleep(remaining - self.spin_seconds)
+        now = perf_counter()
+        while now < deadline:
+            now = perf_counter()
+        self.lateness = now - deadline
+
+        self.deadline = deadline + self.period
+        if self.deadline < now:
+            self.deadline = now + self.period
+        elapsed = now - self.last
+        self.last = now
+        return elapsed
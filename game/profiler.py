@@ -0,0 +1,206 @@
+"""
+Per-phase frame-time instrumentation for the Pong game.
+Each loop (match, start screen) owns a FrameProfiler that times the phases
+of every frame into fixed-size ring buffers. Statistics are only computed
+when the overlay refreshes or the profile is dumped, and a disabled profiler
+swaps its methods for no-ops so instrumented loops run at full speed.
+pygame is only imported to draw the overlay, so headless code can use the
+profiler and percentile() without it.
+"""
+
+import math
+from array import array
+from time import perf_counter
+
+
+def _no_op(*args):
+    pass
+
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    """
+    Times named phases of a loop's frames.
+    Call begin_frame() at the top of each frame, mark(phase) after each
+    phase (time since the previous mark is added to that phase, so a phase
+    may be marked several times per frame) and end_frame() at the bottom.
+    The last `history` frames are kept; older ones are overwritten.
+    """
+    OVERLAY_REFRESH = 30  # Frames between overlay text updates
+
+    def __init__(self, name, phases, history=600, enabled=False):
+        self.name = name
+        self.phases = tuple(phases)
+        self.history = history
+        self.buffers = {phase: array("d", bytes(8 * history)) for phase in self.phases}
+        self.totals = array("d", bytes(8 * history))
+        self.index = 0          # Ring slot of the current frame
+        self.frames = 0         # Frames recorded since the last reset
+        self.worst_total = 0.0
+        self.worst_frame = {}   # Phase times of the slowest frame seen
+        self.frame_start = self.last = 0.0
+        self.overlay = None
+        self.overlay_age = 0
+        self.overlay_version = 0
+        self.set_enabled(enabled)
+
+    def set_enabled(self, enabled):
+        """Start or stop recording; a disabled profiler's hooks do nothing"""
+        self.enabled = enabled
+        if enabled:
+            # Drop the instance overrides so the real methods are found again
+            for hook in ("begin_frame", "mark", "end_frame"):
+                self.__dict__.pop(hook, None)
+            # Turned on mid-frame: time the rest of it from here
+            for buffer in self.buffers.values():
+                buffer[self.index] = 0.0
+            self.frame_start = self.last = perf_counter()
+        else:
+            self.begin_frame = self.mark = self.end_frame = _no_op
+        self.overlay = None
+
+    def toggle(self):
+        self.set_enabled(not self.enabled)
+
+    def reset(self):
+        """Forget every recorded frame"""
+        for buffer in list(self.buffers.values()) + [self.totals]:
+            buffer[:] = array("d", bytes(8 * self.history))
+        self.index = 0
+        self.frames = 0
+        self.worst_total = 0.0
+        self.worst_frame = {}
+
+    def begin_frame(self):
+        slot = self.index
+        for buffer in self.buffers.values():
+            buffer[slot] = 0.0
+        self.frame_start = self.last = perf_counter()
+
+    def mark(self, phase):
+        now = perf_counter()
+        self.buffers[phase][self.index] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        slot = self.index
+        total = perf_counter() - self.frame_start
+        self.totals[slot] = total
+        if total > self.worst_total:
+            self.worst_total = total
+            self.worst_frame = {phase: buffer[slot] for phase, buffer in self.buffers.items()}
+        self.index = (slot + 1) % self.history
+        self.frames += 1
+
+    def _recorded(self, buffer):
+        """Return the buffer's recorded values, oldest first"""
+        if self.frames < self.history:
+            return buffer[:self.frames]
+        # The current slot may hold a frame still in progress
+        return buffer[self.index + 1:] + buffer[:self.index]
+
+    def stats(self):
+        """Return {phase: {mean, p50, p95, p99, max}} in milliseconds, plus "frame" for totals"""
+        result = {}
+        for phase, buffer in list(self.buffers.items()) + [("frame", self.totals)]:
+            values = sorted(self._recorded(buffer))
+            result[phase] = {
+                "mean": sum(values) / len(values) * 1000 if values else 0.0,
+                "p50": percentile(values, 0.50) * 1000,
+                "p95": percentile(values, 0.95) * 1000,
+                "p99": percentile(values, 0.99) * 1000,
+                "max": values[-1] * 1000 if values else 0.0,
+            }
+        return result
+
+    def report(self):
+        """Return a JSON-serializable summary of this loop"""
+        return {
+            "frames": self.frames,
+            "history": min(self.frames, self.history),
+            "stats_ms": self.stats(),
+            "worst_frame_ms": dict({phase: value * 1000 for phase, value
+                                    in self.worst_frame.items()},
+                                   frame=self.worst_total * 1000),
+        }
+
+    def update_overlay(self):
+        """Re-render the overlay text if it is missing or OVERLAY_REFRESH frames old"""
+        if self.overlay is None or self.overlay_age >= self.OVERLAY_REFRESH:
+            self.overlay = self._render_overlay()
+            self.overlay_age = 0
+            self.overlay_version += 1
+        self.overlay_age += 1
+
+    def overlay_bounds(self, position=(10, 10)):
+        """Return the screen area draw_overlay covers"""
+        return self.overlay.get_rect(topleft=position)
+
+    def overlay_key(self):
+        """Return a value that changes whenever the overlay text is refreshed"""
+        return self.overlay_version
+
+    def draw_overlay(self, screen, position=(10, 10)):
+        """Draw the p50/p95/p99 table prepared by update_overlay"""
+        screen.blit(self.overlay, position)
+
+    def _render_overlay(self):
+        import pygame
+        from game.text import get_font
+        font = get_font(20)
+        stats = self.stats()
+        lines = ["%s  %d frames   p50 / p95 / p99 / max ms" % (self.name, self.frames)]
+        for phase in self.phases + ("frame",):
+            entry = stats[phase]
+            lines.append("%-10s %6.2f %6.2f %6.2f %6.2f" % (
+                phase, entry["p50"], entry["p95"], entry["p99"], entry["max"]))
+        surfaces = [font.render(line, True, (255, 255, 0)) for line in lines]
+        width = max(surface.get_width() for surface in surfaces) + 8
+        height = sum(surface.get_height() for surface in surfaces) + 8
+        overlay = pygame.Surface((width, height))
+        overlay.fill((0, 0, 0))
+        y = 4
+        for surface in surfaces:
+            overlay.blit(surface, (4, y))
+            y += surface.get_height()
+        return overlay
+
+
+def dump_profiles(profilers, path):
+    """
+    Write the recorded frames of several profilers to path.
+    A .csv path gets one row per frame and phase; anything else gets JSON
+    with statistics, the worst frame and every recorded frame.
+    """
+    profilers = [profiler for profiler in profilers if profiler.frames]
+    if path.endswith(".csv"):
+        import csv  # Only needed on exit; kept off the startup path
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["loop", "frame", "phase", "ms"])
+            for profiler in profilers:
+                first = profiler.frames - len(profiler._recorded(profiler.totals))
+                columns = [(phase, profiler._recorded(buffer))
+                           for phase, buffer in profiler.buffers.items()]
+                columns.append(("frame", profiler._recorded(profiler.totals)))
+                for phase, values in columns:
+                    for offset, value in enumerate(values):
+                        writer.writerow([profiler.name, first + offset, phase,
+                                         "%.4f" % (value * 1000)])
+        return
+    import json
+    data = {}
+    for profiler in profilers:
+        data[profiler.name] = dict(profiler.report(), frames_ms={
+            phase: [round(value * 1000, 4) for value in profiler._recorded(buffer)]
+            for phase, buffer in list(profiler.buffers.items()) + [("frame", profiler.totals)]
+        })
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
@@ -0,0 +1,127 @@
+"""
+Dirty-rectangle renderer for the Pong game.
+The static background (center line, instructions) is drawn once into its own
+surface. Each frame only the regions covered by elements that moved or
+changed are restored from it and pushed with game.display.update(rects).
+"""
+
+import pygame
+
+from game import display
+
+
+class DirtyRectRenderer:
+    """
+    Draws a list of elements over a cached background.
+    Call add() or add_sprites() for each element every frame, in draw order,
+    then present(). Consecutive sprite elements are drawn with one
+    Surface.blits() call.
+    When the changed regions cover more than max_area_ratio of the screen, or
+    there are more than max_rects of them, the whole screen is flipped instead.
+    """
+    def __init__(self, screen, background, max_rects=16, max_area_ratio=0.5):
+        self.screen = screen
+        self.background = background
+        self.max_rects = max_rects
+        self.max_area = screen.get_width() * screen.get_height() * max_area_ratio
+        self.screen_rect = screen.get_rect()
+        self.elements = []
+        self.previous = {}       # key -> (bounds, render_key) from the last frame
+        self.full_redraw = True  # First frame must cover whatever was on screen
+        self.pending = (False, [])  # (full, rects) drawn but not yet displayed
+
+        # Frame statistics
+        self.partial_frames = 0
+        self.full_frames = 0
+
+    def invalidate(self):
+        """Force the next frame to redraw and flip the whole screen"""
+        self.full_redraw = True
+
+    def add(self, key, bounds, render_key, draw, *args):
+        """Queue an element: draw(screen, *args) paints inside bounds"""
+        self.elements.append((key, bounds, render_key, draw, args))
+
+    def add_sprites(self, key, bounds, render_key, sprites):
+        """Queue an element drawn by blitting (surface, position) pairs inside bounds"""
+        self.elements.append((key, bounds, render_key, None, sprites))
+
+    def _draw(self, elements):
+        """Draw elements in order, batching runs of sprite elements into one blits() call"""
+        batch = []
+        for key, bounds, render_key, draw, args in elements:
+            if draw is None:
+                batch.extend(args)
+                continue
+            if batch:
+                self.screen.blits(batch, doreturn=False)
+                batch = []
+            draw(self.screen, *args)
+        if batch:
+            self.screen.blits(batch, doreturn=False)
+
+    def _changed_rects(self):
+        """Collect regions of elements whose bounds or appearance changed"""
+        rects = []
+        current = {}
+        for key, bounds, render_key, draw, args in self.elements:
+            current[key] = (bounds, render_key)
+            before = self.previous.get(key)
+            if before is None:
+                rects.append(bounds)
+            elif before != (bounds, render_key):
+                # Cover the old and new positions; one rect when they overlap
+                if before[0].colliderect(bounds):
+                    rects.append(before[0].union(bounds))
+                else:
+                    rects.append(before[0])
+                    rects.append(bounds)
+        # Elements that disappeared leave their last region behind
+        for key, (bounds, render_key) in self.previous.items():
+            if key not in current:
+                rects.append(bounds)
+        self.previous = current
+        return [rect.clip(self.screen_rect) for rect in rects]
+
+    def render(self):
+        """
+        Draw the queued elements; update_display() then shows the result.
+        On its own this keeps an offscreen surface up to date.
+        """
+        rects = self._changed_rects()
+        area = sum(rect.width * rect.height for rect in rects)
+        full = self.full_redraw or len(rects) > self.max_rects or area > self.max_area
+
+        if full:
+            self.full_redraw = False
+            self.screen.blit(self.background, (0, 0))
+            self._draw(self.elements)
+        else:
+            # Restore each region and repaint, clipped to it, every element
+            # that touches it; repainting outside the region would blend
+            # antialiased edges twice
+            for rect in rects:
+                self.screen.set_clip(rect)
+                self.screen.blit(self.background, rect, rect)
+                self._draw([element for element in self.elements
+                            if element[1].colliderect(rect)])
+            self.screen.set_clip(None)
+        self.elements = []
+        self.pending = (full, rects)
+        return rects
+
+    def update_display(self):
+        """Push the regions drawn by the last render() to the display"""
+        full, rects = self.pending
+        if full:
+            display.flip()
+            self.full_frames += 1
+        elif rects:
+            display.update(rects)
+            self.partial_frames += 1
+        return rects
+
+    def present(self):
+        """Draw the queued elements and update the changed parts of the display"""
+        self.render()
+        return self.update_display()
@@ -0,0 +1,304 @@
+"""
+Deterministic match recording and replay for the Pong game.
+A recording holds the match seed, rules (stored by name, so recordings
+survive changes to the Rules fields) and a run-length (delta) encoded
+stream of per-tick inputs. Replays re-simulate headlessly and keep periodic
+keyframes, so seeking to any tick only simulates from the nearest keyframe.
+
+To check that physics changes keep old matches reproducible, verify every
+recording in a folder:
+    python -m game.replay replays/
+"""
+
+import bisect
+import os
+import struct
+import sys
+
+from game.simulation import MatchState, PlayerInput, Rules, step
+
+MAGIC = b"PONGREC"
+VERSION = 3
+
+# Bit order of one player's input; the right player uses the next 7 bits
+INPUT_FIELDS = ("up", "down", "rotate_ccw", "rotate_cw", "activate", "hold", "release")
+RIGHT_SHIFT = len(INPUT_FIELDS)
+PLAYER_MASK = (1 << RIGHT_SHIFT) - 1
+
+RULE_NAMES = tuple(vars(Rules()))
+
+_HEADER = struct.Struct("<7sBQHH?B")
+_RULE_VALUE = struct.Struct("<d")
+_SUMMARY = struct.Struct("<IIdd")
+
+
+def encode_player(player_input):
+    """Pack one PlayerInput into INPUT_FIELDS bit order"""
+    bits = 0
+    for index, name in enumerate(INPUT_FIELDS):
+        if getattr(player_input, name):
+            bits |= 1 << index
+    return bits
+
+
+def decode_player(bits):
+    """Unpack bits from encode_player into a new PlayerInput"""
+    return PlayerInput(*(bool(bits >> index & 1) for index in range(len(INPUT_FIELDS))))
+
+
+def encode_inputs(inputs):
+    """Pack a (left, right) pair of PlayerInput into one integer"""
+    left, right = inputs
+    return encode_player(left) | encode_player(right) << RIGHT_SHIFT
+
+
+def decode_inputs(bits):
+    """Unpack an integer from encode_inputs into a (left, right) pair"""
+    return decode_player(bits & PLAYER_MASK), decode_player(bits >> RIGHT_SHIFT)
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class Recording:
+    """
+    A recorded match: everything needed to rebuild it tick by tick.
+    runs is a list of [tick_count, input_bits] pairs; consecutive ticks with
+    identical input share one run.
+    """
+    def __init__(self, seed, width, height, rules, continuous, runs=None,
+                 final_scores=(0, 0), final_ball=(0.0, 0.0)):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.rules = rules
+        self.continuous = continuous
+        self.runs = runs if runs is not None else []
+        self.final_scores = final_scores
+        self.final_ball = final_ball
+
+    @property
+    def ticks(self):
+        return sum(count for count, bits in self.runs)
+
+    def new_state(self):
+        """Return a fresh MatchState matching the recorded one at tick 0"""
+        return MatchState(self.width, self.height, rules=self.rules, seed=self.seed,
+                          continuous=self.continuous)
+
+    def iter_inputs(self):
+        """Yield the input bits of every tick in order"""
+        for count, bits in self.runs:
+            for _ in range(count):
+                yield bits
+
+    def to_bytes(self):
+        """Serialize to the compact binary format"""
+        out = bytearray(_HEADER.pack(MAGIC, VERSION, self.seed, self.width, self.height,
+                                     self.continuous, len(RULE_NAMES)))
+        for name in RULE_NAMES:
+            encoded = name.encode("ascii")
+            out.append(len(encoded))
+            out += encoded
+            out += _RULE_VALUE.pack(getattr(self.rules, name))
+        out += _SUMMARY.pack(self.final_scores[0], self.final_scores[1], *self.final_ball)
+        _write_varint(out, len(self.runs))
+        for count, bits in self.runs:
+            _write_varint(out, count)
+            _write_varint(out, bits)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Parse data produced by to_bytes. Rules missing from the recording
+        keep their defaults; a rule this version does not know raises
+        ValueError, since the match could not be reproduced.
+        """
+        magic, version, seed, width, height, continuous, rule_count = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a version %d Pong recording" % VERSION)
+        offset = _HEADER.size
+        values = {}
+        for _ in range(rule_count):
+            length = data[offset]
+            name = bytes(data[offset + 1:offset + 1 + length]).decode("ascii")
+            offset += 1 + length
+            value, = _RULE_VALUE.unpack_from(data, offset)
+            offset += _RULE_VALUE.size
+            if name not in RULE_NAMES:
+                raise ValueError("Recording uses an unknown rule: %s" % name)
+            values[name] = int(value) if value.is_integer() else value
+        rules = Rules(**values)
+        score1, score2, ball_x, ball_y = _SUMMARY.unpack_from(data, offset)
+        offset += _SUMMARY.size
+
+        run_count, offset = _read_varint(data, offset)
+        runs = []
+        for _ in range(run_count):
+            count, offset = _read_varint(data, offset)
+            bits, offset = _read_varint(data, offset)
+            runs.append([count, bits])
+        return cls(seed, width, height, rules, continuous, runs,
+                   (score1, score2), (ball_x, ball_y))
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class InputRecorder:
+    """
+    Records the inputs passed to simulation.step for one match.
+    Recording must start before the first tick.
+    """
+    def __init__(self, state):
+        if state.tick != 0:
+            raise ValueError("Recording must start at tick 0")
+        self.state = state
+        self.recording = Recording(state.seed, state.width, state.height, state.rules,
+                                   state.continuous)
+
+    def record(self, inputs):
+        """Append the (left, right) inputs used for one tick"""
+        bits = encode_inputs(inputs)
+        runs = self.recording.runs
+        if runs and runs[-1][1] == bits:
+            runs[-1][0] += 1
+        else:
+            runs.append([1, bits])
+
+    def finish(self):
+        """Store the final result for later verification and return the recording"""
+        state = self.state
+        self.recording.final_scores = (state.player1_score, state.player2_score)
+        self.recording.final_ball = (state.ball.x, state.ball.y)
+        return self.recording
+
+
+class ReplayEngine:
+    """
+    Re-simulates a Recording headlessly.
+    A keyframe is kept every keyframe_interval ticks on the first pass, so
+    seek(tick) costs at most keyframe_interval steps afterwards.
+    """
+    def __init__(self, recording, keyframe_interval=600):
+        self.recording = recording
+        self.keyframe_interval = keyframe_interval
+        self.keyframes = {}  # tick -> MatchState.snapshot() bytes
+        self.end_state = None
+
+        # Input bits decoded once per distinct value
+        self._decoded = {}
+        # First tick of each run, so seeking can find its run by bisection
+        self._run_starts = []
+        start = 0
+        for count, bits in recording.runs:
+            self._run_starts.append(start)
+            start += count
+            if bits not in self._decoded:
+                self._decoded[bits] = decode_inputs(bits)
+
+    def _simulate(self, state, start_tick, end_tick, keep_keyframes):
+        """Step state from start_tick to end_tick using the recorded inputs"""
+        runs = self.recording.runs
+        interval = self.keyframe_interval
+        decoded = self._decoded
+
+        # Find the run containing start_tick
+        index = max(bisect.bisect_right(self._run_starts, start_tick) - 1, 0)
+
+        tick = start_tick
+        while tick < end_tick and index < len(runs):
+            count, bits = runs[index]
+            run_end = min(self._run_starts[index] + count, end_tick)
+            inputs = decoded[bits]
+            while tick < run_end:
+                if keep_keyframes and tick % interval == 0 and tick not in self.keyframes:
+                    self.keyframes[tick] = state.snapshot()
+                step(state, inputs)
+                tick += 1
+            index += 1
+        return state
+
+    def run(self):
+        """Replay the whole match at full speed, recording keyframes; returns the final state"""
+        if self.end_state is None:
+            state = self.recording.new_state()
+            self.end_state = self._simulate(state, 0, self.recording.ticks, True)
+        return self.end_state
+
+    def seek(self, tick):
+        """Return a new MatchState as it was after `tick` ticks"""
+        tick = max(0, min(tick, self.recording.ticks))
+        if not self.keyframes:
+            self.run()
+        if not self.keyframes:
+            # An empty recording never leaves its initial state
+            return self.recording.new_state()
+        start = tick - tick % self.keyframe_interval
+        while start > 0 and start not in self.keyframes:
+            start -= self.keyframe_interval
+        start = max(start, 0)
+        state = self.recording.new_state().restore(self.keyframes[start])
+        return self._simulate(state, start, tick, False)
+
+    def verify(self):
+        """Return True if the replay ends with the recorded scores and ball position"""
+        state = self.run()
+        return ((state.player1_score, state.player2_score) == tuple(self.recording.final_scores)
+                and (state.ball.x, state.ball.y) == tuple(self.recording.final_ball))
+
+
+def verify_directory(directory):
+    """Replay every .pongrec file in directory; returns (passed, [(name, error)]) for the rest"""
+    passed = 0
+    failures = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".pongrec"):
+            continue
+        try:
+            if ReplayEngine(Recording.load(os.path.join(directory, name))).verify():
+                passed += 1
+            else:
+                failures.append((name, "final state differs"))
+        except (ValueError, IndexError, struct.error) as error:
+            failures.append((name, str(error) or type(error).__name__))
+    return passed, failures
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Verify a folder of Pong recordings")
+    parser.add_argument("directory")
+    args = parser.parse_args(argv)
+    passed, failures = verify_directory(args.directory)
+    for name, reason in failures:
+        print("FAIL %s: %s" % (name, reason))
+    print("%d of %d recordings reproduced" % (passed, passed + len(failures)))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
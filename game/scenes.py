@@ -0,0 +1,198 @@
+"""
+Scene manager for the Pong game.
+The start screen, the match and the pause and game-over overlays are
+scenes. Each is built once, ahead of time or the first time it is shown,
+and then kept, so going back to a scene resumes it instead of rebuilding
+its fonts, surfaces and entities. One loop and one clock drive whichever
+scene is on top of the stack; transitions are applied between frames and
+restart the frame timing, so the time spent switching is never simulated
+as a burst of ticks.
+"""
+
+import pygame
+
+from game import display, startup
+from game.constants import PROFILE_FRAMES, STARTUP_REPORT
+
+# Scene names
+MENU = "menu"
+MATCH = "match"
+PAUSE = "pause"
+GAME_OVER = "game_over"
+
+
+class Scene:
+    """
+    Base class for a screen of the game.
+    A scene is entered when it becomes the current scene, suspended while
+    another scene is pushed over it, resumed when that one is popped, and
+    exited when the manager switches away. Its profiler must have "events"
+    and "wait" phases; the manager marks those, the scene marks the rest.
+    """
+    manager = None   # Set by the SceneManager that built the scene
+    profiler = None
+
+    def preload(self):
+        """Build expensive resources ahead of the first enter()"""
+        pass
+
+    def enter(self, **options):
+        pass
+
+    def exit(self):
+        pass
+
+    def suspend(self):
+        pass
+
+    def resume(self):
+        pass
+
+    def handle_events(self, events):
+        """Handle this frame's events (QUIT and F3 are handled by the manager)"""
+        pass
+
+    def update(self, frame_seconds):
+        pass
+
+    def render(self):
+        """Draw the frame and push it to the display"""
+        display.flip()
+
+
+class SceneManager:
+    """
+    Runs the game loop for a stack of persistent scenes.
+    Scenes are registered as factories and built on first use. switch(),
+    push(), pop() and quit() may be called from inside a scene; they take
+    effect once the current frame is done. With a game.pacing.FramePacer
+    each frame waits first, then samples input, updates and renders;
+    otherwise the clock caps the frame rate at the end of the frame.
+    """
+    def __init__(self, screen, clock, fps, pacer=None):
+        self.screen = screen
+        self.clock = clock
+        self.fps = fps
+        self.pacer = pacer
+        self.factories = {}
+        self.scenes = {}       # Scenes built so far, by name
+        self.stack = []
+        self.pending = []      # Transitions requested during this frame
+        self.preloading = []   # Scenes still to be preloaded, one per frame
+        self.running = False
+        self.profiling = PROFILE_FRAMES
+        self.transitions = 0
+
+    def register(self, name, factory):
+        """Register a callable that builds the scene called name"""
+        self.factories[name] = factory
+
+    def get(self, name):
+        """Return the scene called name, building it on first use"""
+        scene = self.scenes.get(name)
+        if scene is None:
+            scene = self.scenes[name] = self.factories[name]()
+            scene.manager = self
+            scene.profiler.set_enabled(self.profiling)
+        return scene
+
+    def preload(self, *names):
+        """
+        Build these scenes and their resources ahead of time, one per frame
+        once the first frame is on screen, so entering them later is instant
+        """
+        self.preloading.extend(names)
+
+    @property
+    def current(self):
+        return self.stack[-1] if self.stack else None
+
+    def switch(self, name, **options):
+        """Exit every scene on the stack and enter the named one"""
+        self.pending.append(("switch", name, options))
+
+    def push(self, name, **options):
+        """Suspend the current scene and enter the named one over it"""
+        self.pending.append(("push", name, options))
+
+    def pop(self):
+        """Exit the current scene and resume the one below it"""
+        self.pending.append(("pop", None, None))
+
+    def quit(self):
+        self.running = False
+
+    def toggle_profiling(self):
+        """Turn frame-time recording and the overlay on or off for every scene"""
+        self.profiling = not self.profiling
+        for scene in self.scenes.values():
+            scene.profiler.set_enabled(self.profiling)
+
+    def _apply_transitions(self):
+        for action, name, options in self.pending:
+            if action == "switch":
+                while self.stack:
+                    self.stack.pop().exit()
+                self.stack.append(self.get(name))
+                self.current.enter(**options)
+            elif action == "push":
+                self.current.suspend()
+                self.stack.append(self.get(name))
+                self.current.enter(**options)
+            else:
+                self.stack.pop().exit()
+                self.current.resume()
+            self.transitions += 1
+        self.pending = []
+
+    def _restart_timing(self):
+        """Start frame timing afresh so a transition is not simulated as elapsed time"""
+        self.clock.tick()
+        if self.pacer:
+            self.pacer.reset()
+
+    def run(self, name, **options):
+        """Enter the named scene and run frames until quit() is called"""
+        self.switch(name, **options)
+        self._apply_transitions()
+        self._restart_timing()
+        frame_seconds = 0.0
+        self.running = True
+        while self.running:
+            scene = self.current
+            profiler = scene.profiler
+            profiler.begin_frame()
+            if self.pacer:
+                # Wait first so the input sampled below is as fresh as possible
+                frame_seconds = self.pacer.wait()
+                profiler.mark("wait")
+
+            events = pygame.event.get()
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.quit()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.toggle_profiling()
+            scene.handle_events(events)
+            profiler.mark("events")
+
+            scene.update(frame_seconds)
+            scene.render()
+            startup.mark_first_frame(STARTUP_REPORT)
+            if self.preloading:
+                self.get(self.preloading.pop(0)).preload()
+
+            if not self.pacer:
+                # Cap the frame rate and measure how long this frame took
+                frame_seconds = self.clock.tick(self.fps) / 1000.0
+                profiler.mark("wait")
+            profiler.end_frame()
+
+            if self.pending:
+                self._apply_transitions()
+                self._restart_timing()
+                frame_seconds = 0.0
+
+        # Leave every scene, e.g. so a match can save its replay
+        while self.stack:
+            self.stack.pop().exit()
@@ -2,6 +2,12 @@ import pygame
 import random
 import math
 from game.constants import *
+from game import display
+from game.text import render_text
+from game.profiler import FrameProfiler
+from game.scenes import Scene, MATCH, MENU
+
+MENU_PHASES = ("events", "update", "draw", "present", "wait")
 
 class Button:
     def __init__(self, x, y, width, height, text, color, hover_color):
@@ -10,7 +16,7 @@ class Button:
         self.color = color
         self.hover_color = hover_color
         self.is_hovered = False
-        self.font = pygame.font.Font(None, 36)
+        self.font_size = 36
         
     def draw(self, screen):
         # Draw the button with the appropriate color
@@ -19,7 +25,7 @@ class Button:
         pygame.draw.rect(screen, WHITE, self.rect, 2, border_radius=10)  # Button border
         
         # Render the text
-        text_surface = self.font.render(self.text, True, WHITE)
+        text_surface = render_text(self.text, self.font_size, WHITE)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
         
@@ -53,16 +59,15 @@ class AnimatedBall:
     def draw(self, screen):
         pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
 
-class StartScreen:
-    def __init__(self, screen):
+class StartScreen(Scene):
+    def __init__(self, screen, profiler=None):
         self.screen = screen
-        self.running = True
         self.selected_mode = None
-        self.clock = pygame.time.Clock()
         
-        # Create title font
-        self.title_font = pygame.font.Font(None, 72)
-        self.subtitle_font = pygame.font.Font(None, 28)
+        # Frame-time instrumentation, shared across visits to the menu
+        if profiler is None:
+            profiler = FrameProfiler("menu", MENU_PHASES, PROFILE_HISTORY, PROFILE_FRAMES)
+        self.profiler = profiler
         
         # Create buttons
         button_width = 250
@@ -89,7 +94,27 @@ class StartScreen:
             (230, 130, 130)   # Light red (hover)
         )
         
-        # Create animated balls for the background
+        self.multiball_button = Button(
+            button_x, 
+            SCREEN_HEIGHT // 2 + 2 * (button_height + 20), 
+            button_width, 
+            button_height, 
+            "Multiball Party", 
+            (100, 180, 100),  # Green
+            (130, 210, 130)   # Light green (hover)
+        )
+        
+        # The background balls are created on the first update, see create_balls
+        self.balls = None
+        
+        # Animation variables
+        self.title_bounce = 0
+        self.title_bounce_dir = 1
+        self.title_bounce_speed = 0.5
+        self.title_bounce_max = 10
+    
+    def create_balls(self):
+        """Create the animated balls for the background"""
         self.balls = []
         for _ in range(20):
             radius = random.randint(5, 15)
@@ -111,46 +136,51 @@ class StartScreen:
             )
             
             self.balls.append(AnimatedBall(x, y, radius, speed_x, speed_y, color))
-        
-        # Animation variables
-        self.title_bounce = 0
-        self.title_bounce_dir = 1
-        self.title_bounce_speed = 0.5
-        self.title_bounce_max = 10
     
-    def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-                return "QUIT"
-            
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    self.running = False
-                    return "QUIT"
+    def enter(self):
+        self.selected_mode = None
+    
+    def choose(self, result):
+        """Act on a menu choice: QUIT or a game mode (VS_MACHINE, VS_FRIEND, MULTIBALL)"""
+        self.selected_mode = result
+        if result == "QUIT":
+            self.manager.quit()
+        else:
+            self.manager.switch(MATCH, mode=result)
+    
+    def handle_events(self, events):
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                self.choose("QUIT")
+                return
             
             # Mouse events
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = display.mouse_pos()
             mouse_clicked = event.type == pygame.MOUSEBUTTONDOWN and event.button == 1
             
             # Check button hover states
             self.vs_machine_button.check_hover(mouse_pos)
             self.vs_friend_button.check_hover(mouse_pos)
+            self.multiball_button.check_hover(mouse_pos)
             
             # Check button clicks
             if mouse_clicked:
                 if self.vs_machine_button.is_clicked(mouse_pos, True):
-                    self.running = False
-                    return "VS_MACHINE"
+                    self.choose("VS_MACHINE")
+                    return
                 
                 if self.vs_friend_button.is_clicked(mouse_pos, True):
-                    self.running = False
-                    return "VS_FRIEND"
-        
-        return None
+                    self.choose("VS_FRIEND")
+                    return
+                
+                if self.multiball_button.is_clicked(mouse_pos, True):
+                    self.choose("MULTIBALL")
+                    return
     
-    def update(self):
+    def update(self, frame_seconds=None):
         # Update animated balls
+        if self.balls is None:
+            self.create_balls()
         for ball in self.balls:
             ball.update()
             
@@ -158,19 +188,20 @@ class StartScreen:
         self.title_bounce += self.title_bounce_speed * self.title_bounce_dir
         if abs(self.title_bounce) >= self.title_bounce_max:
             self.title_bounce_dir *= -1
+        self.profiler.mark("update")
     
     def draw(self):
         # Fill the background
         self.screen.fill(BLACK)
         
         # Draw animated balls
-        for ball in self.balls:
+        for ball in self.balls or ():
             ball.draw(self.screen)
         
         # Draw paddles (decorative) make paddles move up and down with the mouse
         paddle_height = 80
         paddle_width = 10
-        mouse_y = pygame.mouse.get_pos()[1]
+        mouse_y = display.mouse_pos()[1]
         
         # Left paddle
         pygame.draw.rect(self.screen, WHITE, 
@@ -186,41 +217,165 @@ class StartScreen:
         
         # Draw title with bounce effect
         title_y_offset = math.sin(self.title_bounce * 0.1) * 5
-        title_surface = self.title_font.render("PONG GAME", True, WHITE)
+        title_surface = render_text("PONG GAME", 72, WHITE)
         title_rect = title_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4 + title_y_offset))
         self.screen.blit(title_surface, title_rect)
         
         # Draw subtitle
-        subtitle_surface = self.subtitle_font.render("Select Game Mode", True, WHITE)
+        subtitle_surface = render_text("Select Game Mode", 28, WHITE)
         subtitle_rect = subtitle_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3))
         self.screen.blit(subtitle_surface, subtitle_rect)
         
         # Draw buttons
         self.vs_machine_button.draw(self.screen)
         self.vs_friend_button.draw(self.screen)
+        self.multiball_button.draw(self.screen)
         
         # Draw instructions at the bottom
-        instructions = self.subtitle_font.render("Press ESC to quit", True, WHITE)
+        instructions = render_text("Press ESC to quit", 28, WHITE)
         instructions_rect = instructions.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 50))
         self.screen.blit(instructions, instructions_rect)
         
-    def run(self):
-        while self.running:
-            # Handle events
-            result = self.handle_events()
-            if result:
-                return result
-            
-            # Update animations
-            self.update()
-                
-            # Draw everything
-            self.draw()
-            
-            # Update the display
-            pygame.display.flip()
-            
-            # Cap the frame rate
-            self.clock.tick(FPS)
+        # Frame-time overlay (F3)
+        if self.profiler.enabled:
+            self.profiler.update_overlay()
+            self.profiler.draw_overlay(self.screen)
+        
+    def render(self):
+        self.draw()
+        self.profiler.mark("draw")
+        display.flip()
+        self.profiler.mark("present")
+
+class OverlayScreen(Scene):
+    """
+    A menu drawn over a frozen, dimmed copy of the frame below it.
+    entries are (text, color, hover_color, keys, action) tuples; each
+    becomes a button that runs action() when clicked or when one of its
+    keys is pressed. The surfaces and buttons are created once and reused
+    every time the overlay is shown.
+    """
+    def __init__(self, screen, profiler, title, entries):
+        self.screen = screen
+        self.profiler = profiler
+        self.title = title
+        self.subtitle = ""
+        
+        # Copy of the frame below, dimmed once when the overlay is entered
+        self.backdrop = pygame.Surface(screen.get_size()).convert()
+        self.shade = pygame.Surface(screen.get_size()).convert()
+        self.shade.fill(BLACK)
+        self.shade.set_alpha(170)
+        
+        # Create buttons, stacked below the title
+        button_width = 250
+        button_height = 50
+        button_x = SCREEN_WIDTH // 2 - button_width // 2
+        self.entries = []
+        for text, color, hover_color, keys, action in entries:
+            button = Button(button_x, 0, button_width, button_height,
+                            text, color, hover_color)
+            self.entries.append((button, keys, action))
+        self.show(self.entries)
+    
+    def show(self, entries):
+        """Show only the given entries, stacked from the top"""
+        self.visible = list(entries)
+        button_y = int(SCREEN_HEIGHT * 0.4)
+        for button, keys, action in self.visible:
+            button.rect.y = button_y
+            button_y += button.rect.height + 15
+    
+    def enter(self, **options):
+        # Freeze whatever was on screen behind the overlay
+        self.backdrop.blit(self.screen, (0, 0))
+        self.backdrop.blit(self.shade, (0, 0))
+    
+    def resume_match(self):
+        self.manager.pop()
+    
+    def rematch(self):
+        self.manager.switch(MATCH)
+    
+    def main_menu(self):
+        self.manager.switch(MENU)
+    
+    def quit_game(self):
+        self.manager.quit()
+    
+    def handle_events(self, events):
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                for button, keys, action in self.visible:
+                    if event.key in keys:
+                        action()
+                        return
             
-        return self.selected_mode 
\ No newline at end of file
+            # Mouse events
+            mouse_pos = display.mouse_pos()
+            mouse_clicked = event.type == pygame.MOUSEBUTTONDOWN and event.button == 1
+            for button, keys, action in self.visible:
+                button.check_hover(mouse_pos)
+                if mouse_clicked and button.is_clicked(mouse_pos, True):
+                    action()
+                    return
+    
+    def update(self, frame_seconds=None):
+        self.profiler.mark("update")
+    
+    def draw(self):
+        self.screen.blit(self.backdrop, (0, 0))
+        
+        # Draw title and subtitle
+        title_surface = render_text(self.title, 72, WHITE)
+        title_rect = title_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4))
+        self.screen.blit(title_surface, title_rect)
+        if self.subtitle:
+            subtitle_surface = render_text(self.subtitle, 36, WHITE)
+            subtitle_rect = subtitle_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3))
+            self.screen.blit(subtitle_surface, subtitle_rect)
+        
+        # Draw buttons
+        for button, keys, action in self.visible:
+            button.draw(self.screen)
+        
+        # Frame-time overlay (F3)
+        if self.profiler.enabled:
+            self.profiler.update_overlay()
+            self.profiler.draw_overlay(self.screen)
+    
+    def render(self):
+        self.draw()
+        self.profiler.mark("draw")
+        display.flip()
+        self.profiler.mark("present")
+
+class PauseScreen(OverlayScreen):
+    """Pause menu shown over a suspended match"""
+    def __init__(self, screen, profiler):
+        super().__init__(screen, profiler, "PAUSED", [
+            ("Resume (ESC)", (100, 100, 200), (130, 130, 230),
+             (pygame.K_ESCAPE, pygame.K_p), self.resume_match),
+            ("Restart (R)", (100, 180, 100), (130, 210, 130), (pygame.K_r,), self.rematch),
+            ("Main Menu (M)", (200, 100, 100), (230, 130, 130), (pygame.K_m,), self.main_menu),
+            ("Quit (Q)", (90, 90, 90), (120, 120, 120), (pygame.K_q,), self.quit_game),
+        ])
+
+class GameOverScreen(OverlayScreen):
+    """Result screen shown over the final frame of a match"""
+    def __init__(self, screen, profiler):
+        super().__init__(screen, profiler, "GAME OVER", [
+            ("Rematch (R)", (100, 180, 100), (130, 210, 130),
+             (pygame.K_r, pygame.K_RETURN), self.rematch),
+            ("Main Menu (M)", (200, 100, 100), (230, 130, 130),
+             (pygame.K_m, pygame.K_ESCAPE), self.main_menu),
+            ("Quit (Q)", (90, 90, 90), (120, 120, 120), (pygame.K_q,), self.quit_game),
+        ])
+        self.rematch_entry = self.entries[0]
+    
+    def enter(self, title="GAME OVER", scores=(0, 0), can_rematch=True):
+        super().enter()
+        self.title = title
+        self.subtitle = "%d - %d" % scores
+        self.show([entry for entry in self.entries
+                   if can_rematch or entry is not self.rematch_entry])
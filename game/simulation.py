@@ -0,0 +1,674 @@
+"""
+Headless simulation core for the Pong game.
+This module contains the match state and the step function that advances it
+by one tick. It does not import pygame, so it runs without a display, fonts
+or a clock.
+"""
+
+import math
+import random
+import struct
+
+from game.constants import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Tick rate the default Rules values were tuned for (one tick per frame at 60 FPS)
+BASE_TICK_RATE = 60
+
+# Snapshot layout: tick, rng state, both scores, then for each paddle
+# y/load/arrow and its two flags, then the ball position, speed, rect and flag
+_SNAPSHOT = struct.Struct("<QQII" + "ddd??" * 2 + "ddddii?")
+SNAPSHOT_SIZE = _SNAPSHOT.size
+
+
+def _round_coord(value):
+    """Round a float coordinate the way pygame.Rect attribute assignment does"""
+    if value >= 0:
+        return int(value + 0.5)
+    return -int(-value + 0.5)
+
+
+class Rules:
+    """
+    Tunable gameplay values for a match.
+    The defaults are the game's original tuning.
+    """
+    def __init__(self, paddle_speed=7, max_load=100, hit_load=10,
+                 throw_speed=10, speed_increase=0.2, max_speed=15,
+                 arrow_step=5, serve_speed=5, serve_spread=3, wall_jitter=0.5):
+        self.paddle_speed = paddle_speed
+        self.max_load = max_load
+        self.hit_load = hit_load          # Load gained per paddle hit
+        self.throw_speed = throw_speed
+        self.speed_increase = speed_increase
+        self.max_speed = max_speed
+        self.arrow_step = arrow_step      # Degrees per tick
+        self.serve_speed = serve_speed
+        self.serve_spread = serve_spread  # Max vertical serve speed
+        self.wall_jitter = wall_jitter    # Max random change on a wall bounce
+
+    @classmethod
+    def for_tick_rate(cls, tick_rate, **values):
+        """
+        Build rules whose per-tick speeds give the same real-time speeds at
+        tick_rate as the defaults do at BASE_TICK_RATE.
+        """
+        rules = cls(**values)
+        if tick_rate == BASE_TICK_RATE:
+            return rules
+        scale = BASE_TICK_RATE / tick_rate
+        for name in ("paddle_speed", "throw_speed", "max_speed", "arrow_step",
+                     "serve_speed", "serve_spread", "wall_jitter"):
+            setattr(rules, name, getattr(rules, name) * scale)
+        return rules
+
+
+class PaddleState:
+    """
+    Plain-data paddle used by the simulation.
+    entities.Paddle draws it, see Paddle.sync_from.
+    """
+    __slots__ = ("x", "y", "width", "height", "is_left", "load_counter",
+                 "is_powered_up", "is_holding_ball", "arrow_angle")
+
+    def __init__(self, x, y, is_left, width=15, height=100):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.is_left = is_left
+        self.load_counter = 0
+        self.is_powered_up = False
+        self.is_holding_ball = False
+        self.arrow_angle = 0 if is_left else 180
+
+    def reset(self, y):
+        """Move back to y with an empty load bar and the arrow pointing forward"""
+        self.y = y
+        self.load_counter = 0
+        self.is_powered_up = False
+        self.is_holding_ball = False
+        self.arrow_angle = 0 if self.is_left else 180
+
+    def copy(self):
+        """Return an independent copy of this paddle"""
+        clone = PaddleState.__new__(PaddleState)
+        clone.x = self.x
+        clone.y = self.y
+        clone.width = self.width
+        clone.height = self.height
+        clone.is_left = self.is_left
+        clone.load_counter = self.load_counter
+        clone.is_powered_up = self.is_powered_up
+        clone.is_holding_ball = self.is_holding_ball
+        clone.arrow_angle = self.arrow_angle
+        return clone
+
+    @property
+    def top(self):
+        return self.y
+
+    @property
+    def bottom(self):
+        return self.y + self.height
+
+    @property
+    def left(self):
+        return self.x
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @property
+    def centery(self):
+        return self.y + self.height // 2
+
+
+class BallState:
+    """
+    Plain-data ball used by the simulation.
+    rect_x/rect_y hold the integer bounding box the same way Ball.rect does.
+    """
+    __slots__ = ("x", "y", "radius", "speed_x", "speed_y", "is_held", "rect_x", "rect_y")
+
+    def __init__(self, x, y, radius=10, speed_x=5, speed_y=5):
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.speed_x = speed_x
+        self.speed_y = speed_y
+        self.is_held = False
+        self.rect_x = x - radius
+        self.rect_y = y - radius
+
+    def copy(self):
+        """Return an independent copy of this ball"""
+        clone = BallState.__new__(BallState)
+        clone.x = self.x
+        clone.y = self.y
+        clone.radius = self.radius
+        clone.speed_x = self.speed_x
+        clone.speed_y = self.speed_y
+        clone.is_held = self.is_held
+        clone.rect_x = self.rect_x
+        clone.rect_y = self.rect_y
+        return clone
+
+    def sync_rect(self):
+        """Update the integer bounding box from the ball position"""
+        self.rect_x = _round_coord(self.x - self.radius)
+        self.rect_y = _round_coord(self.y - self.radius)
+
+    def overlaps(self, paddle, margin=0):
+        """
+        Return True if the ball's bounding box overlaps the paddle (Rect.colliderect).
+        margin widens the paddle horizontally on both sides.
+        """
+        size = self.radius * 2
+        return (self.rect_x < paddle.x + paddle.width + margin and
+                paddle.x - margin < self.rect_x + size and
+                self.rect_y < paddle.y + paddle.height and paddle.y < self.rect_y + size)
+
+
+class SimRandom:
+    """
+    Small deterministic random generator (SplitMix64).
+    Its whole state is one 64-bit integer, so it fits in a fixed-size match
+    snapshot; it provides the subset of random.Random the simulation uses.
+    """
+    __slots__ = ("state",)
+
+    def __init__(self, seed=0):
+        self.state = seed & _MASK64
+
+    def random(self):
+        """Return a float in [0, 1)"""
+        self.state = state = (self.state + 0x9E3779B97F4A7C15) & _MASK64
+        state = ((state ^ (state >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        state = ((state ^ (state >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return ((state ^ (state >> 31)) >> 11) * _INV_2_53
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+
+_MASK64 = (1 << 64) - 1
+_INV_2_53 = 1.0 / (1 << 53)
+
+
+class PlayerInput:
+    """
+    Input for one paddle during one tick.
+    up/down/rotate_* are held keys; activate, hold and release are edges.
+    """
+    def __init__(self, up=False, down=False, rotate_ccw=False, rotate_cw=False,
+                 activate=False, hold=False, release=False):
+        self.up = up
+        self.down = down
+        self.rotate_ccw = rotate_ccw
+        self.rotate_cw = rotate_cw
+        self.activate = activate  # SHIFT pressed this tick
+        self.hold = hold          # SPACE pressed this tick
+        self.release = release    # SPACE released this tick
+
+
+IDLE = PlayerInput()
+
+
+class MatchState:
+    """
+    Complete state of one match: both paddles, the ball and the scores.
+    Each match owns its own random generator so matches are independent.
+    With continuous=True the ball uses swept collision detection, which stays
+    accurate for fast balls and for steps longer than one tick.
+    snapshot()/restore() save and load every changing value as a fixed-size
+    byte string (SNAPSHOT_SIZE bytes).
+    """
+    __slots__ = ("width", "height", "rules", "continuous", "seed", "rng",
+                 "left", "right", "ball", "player1_score", "player2_score", "tick")
+
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, rules=None, seed=None,
+                 continuous=False):
+        self.width = width
+        self.height = height
+        self.rules = rules or Rules()
+        self.continuous = continuous  # Use sweep_ball instead of per-tick overlap tests
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.rng = SimRandom(seed)
+        self.left = PaddleState(20, height // 2 - 50, True)
+        self.right = PaddleState(width - 35, height // 2 - 50, False)
+        self.ball = BallState(width // 2, height // 2,
+                              speed_x=self.rules.serve_speed, speed_y=self.rules.serve_speed)
+        self.player1_score = 0
+        self.player2_score = 0
+        self.tick = 0
+
+    def reset(self, seed=None):
+        """
+        Start a new match in place, as if newly created with the same size,
+        rules and collision mode. Returns self.
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.rng.state = seed & _MASK64
+        self.left.reset(self.height // 2 - 50)
+        self.right.reset(self.height // 2 - 50)
+        ball = self.ball
+        ball.x = self.width // 2
+        ball.y = self.height // 2
+        ball.speed_x = ball.speed_y = self.rules.serve_speed
+        ball.is_held = False
+        ball.rect_x = ball.x - ball.radius
+        ball.rect_y = ball.y - ball.radius
+        self.player1_score = 0
+        self.player2_score = 0
+        self.tick = 0
+        return self
+
+    def copy(self):
+        """
+        Return an independent copy of the match for rendering or look-ahead.
+        Rules are shared with the original.
+        """
+        clone = MatchState.__new__(MatchState)
+        clone.width = self.width
+        clone.height = self.height
+        clone.rules = self.rules
+        clone.continuous = self.continuous
+        clone.seed = self.seed
+        clone.rng = SimRandom(self.rng.state)
+        clone.left = self.left.copy()
+        clone.right = self.right.copy()
+        clone.ball = self.ball.copy()
+        clone.player1_score = self.player1_score
+        clone.player2_score = self.player2_score
+        clone.tick = self.tick
+        return clone
+
+    def snapshot(self):
+        """Return the changing state as SNAPSHOT_SIZE bytes"""
+        left, right, ball = self.left, self.right, self.ball
+        return _SNAPSHOT.pack(
+            self.tick, self.rng.state, self.player1_score, self.player2_score,
+            left.y, left.load_counter, left.arrow_angle,
+            left.is_powered_up, left.is_holding_ball,
+            right.y, right.load_counter, right.arrow_angle,
+            right.is_powered_up, right.is_holding_ball,
+            ball.x, ball.y, ball.speed_x, ball.speed_y, ball.rect_x, ball.rect_y, ball.is_held)
+
+    def snapshot_into(self, buffer, offset=0):
+        """Write a snapshot into a preallocated writable buffer at offset"""
+        left, right, ball = self.left, self.right, self.ball
+        _SNAPSHOT.pack_into(
+            buffer, offset,
+            self.tick, self.rng.state, self.player1_score, self.player2_score,
+            left.y, left.load_counter, left.arrow_angle,
+            left.is_powered_up, left.is_holding_ball,
+            right.y, right.load_counter, right.arrow_angle,
+            right.is_powered_up, right.is_holding_ball,
+            ball.x, ball.y, ball.speed_x, ball.speed_y, ball.rect_x, ball.rect_y, ball.is_held)
+
+    def restore(self, data, offset=0):
+        """
+        Load a snapshot taken from a match with the same size, rules and
+        collision mode. Returns self.
+        """
+        left, right, ball = self.left, self.right, self.ball
+        (self.tick, self.rng.state, self.player1_score, self.player2_score,
+         left.y, left.load_counter, left.arrow_angle,
+         left.is_powered_up, left.is_holding_ball,
+         right.y, right.load_counter, right.arrow_angle,
+         right.is_powered_up, right.is_holding_ball,
+         ball.x, ball.y, ball.speed_x, ball.speed_y, ball.rect_x, ball.rect_y,
+         ball.is_held) = _SNAPSHOT.unpack_from(data, offset)
+        return self
+
+    def holder(self):
+        """Return the paddle currently holding the ball, or None"""
+        if self.left.is_holding_ball:
+            return self.left
+        if self.right.is_holding_ball:
+            return self.right
+        return None
+
+
+def move_paddle(paddle, direction, rules, height, dt=1):
+    """Move the paddle up or down within screen boundaries"""
+    if direction == "up" and paddle.top > 0:
+        paddle.y -= rules.paddle_speed * dt
+    if direction == "down" and paddle.bottom < height:
+        paddle.y += rules.paddle_speed * dt
+
+
+def activate_power_up(paddle, rules):
+    """Activate power-up if the load counter is full"""
+    if paddle.load_counter >= rules.max_load:
+        paddle.is_powered_up = True
+        paddle.load_counter = 0
+        return True
+    return False
+
+
+def hold_ball(paddle, ball, margin=0):
+    """Catch the ball if powered up and in contact"""
+    if paddle.is_powered_up and ball.overlaps(paddle, margin):
+        paddle.is_holding_ball = True
+        paddle.is_powered_up = False
+        ball.is_held = True
+        _attach_ball(paddle, ball)
+        ball.speed_x = 0
+        ball.speed_y = 0
+        return True
+    return False
+
+
+def _attach_ball(paddle, ball):
+    """Place the ball at the front edge of the holding paddle"""
+    if paddle.is_left:
+        ball.x = paddle.right + ball.radius
+    else:
+        ball.x = paddle.left - ball.radius
+    ball.y = paddle.centery
+    ball.sync_rect()
+
+
+def rotate_arrow(paddle, direction, rules, dt=1):
+    """Rotate the aiming arrow within the forward half-plane"""
+    if direction == "clockwise":
+        paddle.arrow_angle += rules.arrow_step * dt
+    else:
+        paddle.arrow_angle -= rules.arrow_step * dt
+
+    if paddle.is_left:
+        paddle.arrow_angle = max(-90, min(90, paddle.arrow_angle))
+    else:
+        paddle.arrow_angle = max(90, min(270, paddle.arrow_angle))
+
+
+def throw_ball(paddle, ball, rules):
+    """Release a held ball along the arrow"""
+    if paddle.is_holding_ball:
+        paddle.is_holding_ball = False
+        ball.is_held = False
+        angle_radians = math.radians(paddle.arrow_angle)
+        ball.speed_x = rules.throw_speed * math.cos(angle_radians)
+        ball.speed_y = rules.throw_speed * math.sin(angle_radians)
+        return True
+    return False
+
+
+def update_ball(ball, rng, height, rules, dt=1):
+    """Move the ball and bounce it off the top and bottom walls"""
+    if not ball.is_held:
+        ball.x += ball.speed_x * dt
+        ball.y += ball.speed_y * dt
+        ball.sync_rect()
+
+        if ball.y <= ball.radius or ball.y >= height - ball.radius:
+            ball.speed_y *= -1
+            ball.speed_y += rng.uniform(-rules.wall_jitter, rules.wall_jitter)
+
+
+def check_paddle_collision(ball, paddle, rules):
+    """
+    Bounce the ball off a paddle.
+    Returns True if a collision occurred.
+    """
+    if ball.overlaps(paddle):
+        _bounce_off_paddle(ball, paddle, rules)
+        if paddle.is_left:
+            ball.x = paddle.right + ball.radius
+        else:
+            ball.x = paddle.left - ball.radius
+        ball.sync_rect()
+        return True
+    return False
+
+
+def _bounce_off_paddle(ball, paddle, rules):
+    """Reverse and speed up the ball, angled by where it met the paddle"""
+    half_height = paddle.height / 2
+    relative_intersect_y = (paddle.y + half_height) - ball.y
+    bounce_angle = relative_intersect_y / half_height * 0.8
+
+    ball.speed_x = -ball.speed_x
+    if abs(ball.speed_x) < rules.max_speed:
+        ball.speed_x = ball.speed_x * (1 + rules.speed_increase)
+    ball.speed_y = -bounce_angle * abs(ball.speed_x)
+
+
+def _paddle_impact_time(ball, paddle, limit):
+    """
+    Time until the moving ball's bounding box reaches the front face of the
+    paddle, or None if that does not happen within limit ticks.
+    """
+    radius = ball.radius
+    if paddle.is_left:
+        if ball.speed_x >= 0:
+            return None
+        face = paddle.right + radius
+        inside = ball.x < face and ball.x > paddle.left - radius
+    else:
+        if ball.speed_x <= 0:
+            return None
+        face = paddle.left - radius
+        inside = ball.x > face and ball.x < paddle.right + radius
+
+    if inside:
+        # Already overlapping (e.g. the paddle moved onto the ball)
+        time = 0.0
+    else:
+        time = (face - ball.x) / ball.speed_x
+        if time < 0 or time > limit:
+            return None
+
+    y = ball.y + ball.speed_y * time
+    if paddle.top - radius < y < paddle.bottom + radius:
+        return time
+    return None
+
+
+def sweep_ball(ball, left, right, rng, height, rules, dt=1, max_impacts=8):
+    """
+    Move the ball for dt ticks with continuous collision detection.
+    Impacts with the walls and the front faces of both paddles are found
+    analytically and resolved in order, so fast balls cannot tunnel through a
+    paddle and the ball never ends a step inside a wall.
+    Returns the list of paddles that were hit.
+    """
+    hits = []
+    remaining = dt
+    radius = ball.radius
+    for _ in range(max_impacts):
+        impact_time = remaining
+        impact = None
+
+        # Top and bottom walls
+        if ball.speed_y < 0:
+            time = max((radius - ball.y) / ball.speed_y, 0.0)
+            if time <= impact_time:
+                impact_time, impact = time, "top"
+        elif ball.speed_y > 0:
+            time = max((height - radius - ball.y) / ball.speed_y, 0.0)
+            if time <= impact_time:
+                impact_time, impact = time, "bottom"
+
+        # Paddle faces
+        for paddle in (left, right):
+            time = _paddle_impact_time(ball, paddle, impact_time)
+            if time is not None and time <= impact_time:
+                impact_time, impact = time, paddle
+
+        ball.x += ball.speed_x * impact_time
+        ball.y += ball.speed_y * impact_time
+        remaining -= impact_time
+        if impact is None:
+            break
+
+        if impact == "top" or impact == "bottom":
+            # Reflect with the usual random variation, always away from the wall
+            speed_y = abs(ball.speed_y) + rng.uniform(-rules.wall_jitter, rules.wall_jitter)
+            ball.speed_y = abs(speed_y) if impact == "top" else -abs(speed_y)
+        else:
+            _bounce_off_paddle(ball, impact, rules)
+            if impact.is_left:
+                ball.x = max(ball.x, impact.right + radius)
+            else:
+                ball.x = min(ball.x, impact.left - radius)
+            hits.append(impact)
+    else:
+        # Out of impacts to resolve; spend the rest of the step in free flight
+        ball.x += ball.speed_x * remaining
+        ball.y += ball.speed_y * remaining
+
+    ball.sync_rect()
+    return hits
+
+
+def reset_ball(ball, rng, x, y, rules):
+    """Serve the ball from (x, y) in a random direction"""
+    ball.x = x
+    ball.y = y
+    ball.sync_rect()
+    ball.is_held = False
+    ball.speed_x = rng.choice([-1, 1]) * rules.serve_speed
+    ball.speed_y = rng.uniform(-rules.serve_spread, rules.serve_spread)
+
+
+def _emit_hit(telemetry, tick, paddle, ball):
+    """Report a paddle hit and the load it gave"""
+    side = 0 if paddle.is_left else 1
+    telemetry.emit("hit", tick, side, abs(ball.speed_x))
+    telemetry.emit("load", tick, side, paddle.load_counter)
+
+
+def step(state, inputs, dt=1, telemetry=None):
+    """
+    Advance the match by dt ticks (one by default).
+    inputs is a (left, right) pair of PlayerInput. The state is updated in
+    place and returned so calls can be chained. dt, a whole number of ticks,
+    stretches the step to cover several ticks of held input and advances
+    state.tick by as much; use it with continuous matches, since the
+    per-tick overlap test misses collisions on long steps. telemetry is
+    an optional game.telemetry.TelemetryBus that receives the tick's events.
+    """
+    left, right = state.left, state.right
+    ball, rules, height = state.ball, state.rules, state.height
+    left_input, right_input = inputs
+    tick = state.tick
+
+    # Edge-triggered actions, in the order the game loop handles key events
+    if left_input.activate:
+        if activate_power_up(left, rules) and telemetry:
+            telemetry.emit("power_up", tick, 0)
+    if right_input.activate:
+        if activate_power_up(right, rules) and telemetry:
+            telemetry.emit("power_up", tick, 1)
+    if (left_input.hold or right_input.hold) and state.holder() is None:
+        # A swept ball bounces mid-tick and never rests inside a paddle, so it
+        # counts as in contact while within one tick of travel
+        margin = abs(ball.speed_x) if state.continuous else 0
+        if left_input.hold:
+            if hold_ball(left, ball, margin) and telemetry:
+                telemetry.emit("hold", tick, 0)
+        if right_input.hold:
+            if hold_ball(right, ball, margin) and telemetry:
+                telemetry.emit("hold", tick, 1)
+    if left_input.release and left.is_holding_ball:
+        throw_ball(left, ball, rules)
+        if telemetry:
+            telemetry.emit("throw", tick, 0, left.arrow_angle)
+    elif right_input.release and right.is_holding_ball:
+        throw_ball(right, ball, rules)
+        if telemetry:
+            telemetry.emit("throw", tick, 1, right.arrow_angle)
+
+    # Paddle movement
+    if left_input.up:
+        move_paddle(left, "up", rules, height, dt)
+    if left_input.down:
+        move_paddle(left, "down", rules, height, dt)
+    if right_input.up:
+        move_paddle(right, "up", rules, height, dt)
+    if right_input.down:
+        move_paddle(right, "down", rules, height, dt)
+
+    # Arrow rotation while holding
+    if left.is_holding_ball:
+        if left_input.rotate_ccw:
+            rotate_arrow(left, "counterclockwise", rules, dt)
+        if left_input.rotate_cw:
+            rotate_arrow(left, "clockwise", rules, dt)
+    if right.is_holding_ball:
+        if right_input.rotate_ccw:
+            rotate_arrow(right, "counterclockwise", rules, dt)
+        if right_input.rotate_cw:
+            rotate_arrow(right, "clockwise", rules, dt)
+
+    holder = state.holder()
+    if holder is not None:
+        # The held ball follows the paddle holding it
+        _attach_ball(holder, ball)
+    elif state.continuous:
+        for paddle in sweep_ball(ball, left, right, state.rng, height, rules, dt):
+            paddle.load_counter = min(paddle.load_counter + rules.hit_load, rules.max_load)
+            if telemetry:
+                _emit_hit(telemetry, tick, paddle, ball)
+    else:
+        update_ball(ball, state.rng, height, rules, dt)
+
+        if check_paddle_collision(ball, left, rules):
+            left.load_counter = min(left.load_counter + rules.hit_load, rules.max_load)
+            if telemetry:
+                _emit_hit(telemetry, tick, left, ball)
+        if check_paddle_collision(ball, right, rules):
+            right.load_counter = min(right.load_counter + rules.hit_load, rules.max_load)
+            if telemetry:
+                _emit_hit(telemetry, tick, right, ball)
+
+    if holder is None:
+        if ball.x < 0:  # Right player scores
+            state.player2_score += 1
+            reset_ball(ball, state.rng, state.width // 2, height // 2, rules)
+            if telemetry:
+                telemetry.emit("score", tick, 1, state.player2_score)
+        elif ball.x > state.width:  # Left player scores
+            state.player1_score += 1
+            reset_ball(ball, state.rng, state.width // 2, height // 2, rules)
+            if telemetry:
+                telemetry.emit("score", tick, 0, state.player1_score)
+
+    state.tick += dt
+    return state
+
+
+def interpolate(previous, current, alpha):
+    """
+    Return a copy of current with paddle and ball positions blended towards
+    it from previous by alpha (0..1). The ball is not blended across a serve,
+    where it jumps back to the centre.
+    """
+    blended = current.copy()
+    for before, after in ((previous.left, blended.left), (previous.right, blended.right)):
+        after.y = before.y + (after.y - before.y) * alpha
+    scored = (previous.player1_score != current.player1_score or
+              previous.player2_score != current.player2_score)
+    if not scored:
+        ball = blended.ball
+        ball.x = previous.ball.x + (ball.x - previous.ball.x) * alpha
+        ball.y = previous.ball.y + (ball.y - previous.ball.y) * alpha
+        ball.sync_rect()
+    return blended
+
+
+def run(state, ticks, inputs=(IDLE, IDLE)):
+    """Advance the match by a number of ticks with constant inputs"""
+    for _ in range(ticks):
+        step(state, inputs)
+    return state
@@ -0,0 +1,476 @@
+"""
+Spectator streaming for the Pong game.
+A SpectatorServer runs an asyncio TCP server in its own process and
+broadcasts every simulated tick to any number of watching clients. The
+game only quantizes the match into a few integers and writes them to a
+non-blocking pipe; encoding and sending happen in the server process, so
+they never compete with the game loop for the GIL. Ticks go out as
+deltas against the previous tick (a bitmask of changed fields followed by
+zigzag varints), with a full keyframe every keyframe_interval ticks. A
+client that cannot keep up has its unsent frames dropped and is resynced
+with a keyframe, so slow spectators fall behind by at most a few frames
+and never hold up the others.
+
+Watch a match with:
+    python -m game.spectator HOST[:PORT]
+"""
+
+import asyncio
+import multiprocessing
+import os
+import socket
+import struct
+from collections import deque
+
+from game.constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from game.simulation import MatchState
+
+# Quantized fields of one tick. Positions are sent in 1/8 pixels, loads
+# and arrow angles in tenths; everything else is already an integer.
+FIELDS = ("ball_x", "ball_y",
+          "left_x", "left_y", "left_width", "left_height", "left_load", "left_arrow",
+          "right_x", "right_y", "right_width", "right_height", "right_load", "right_arrow",
+          "flags", "score1", "score2")
+POSITION_SCALE = 8
+TENTHS = 10
+
+# Bits of the flags field
+LEFT_POWERED = 1
+LEFT_HOLDING = 2
+RIGHT_POWERED = 4
+RIGHT_HOLDING = 8
+BALL_HELD = 16
+
+KEYFRAME = 0
+DELTA = 1
+
+# Message header: payload length, message kind, tick
+_HEADER = struct.Struct("<HBI")
+
+# A tick handed from the game to the server process: tick, then the fields
+_TICK = struct.Struct("<I%di" % len(FIELDS))
+
+# Server statistics shared with the game process
+PUBLISHED, KEYFRAMES, DROPPED = range(3)
+
+
+def quantize(state):
+    """Return a MatchState's spectator fields as a tuple of integers"""
+    left, right, ball = state.left, state.right, state.ball
+    flags = ((left.is_powered_up and LEFT_POWERED) | (left.is_holding_ball and LEFT_HOLDING) |
+             (right.is_powered_up and RIGHT_POWERED) | (right.is_holding_ball and RIGHT_HOLDING) |
+             (ball.is_held and BALL_HELD))
+    position, tenths = POSITION_SCALE, TENTHS
+    return (round(ball.x * position), round(ball.y * position),
+            round(left.x * position), round(left.y * position), left.width, left.height,
+            round(left.load_counter * tenths), round(left.arrow_angle * tenths),
+            round(right.x * position), round(right.y * position), right.width, right.height,
+            round(right.load_counter * tenths), round(right.arrow_angle * tenths),
+            flags, state.player1_score, state.player2_score)
+
+
+def _write_signed(out, value):
+    """Append value as a zigzag varint"""
+    value = value << 1 if value >= 0 else (-value << 1) - 1
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_signed(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return (value >> 1) ^ -(value & 1), offset
+
+
+def encode_keyframe(tick, values):
+    """Encode every field of a tick"""
+    payload = bytearray()
+    for value in values:
+        _write_signed(payload, value)
+    return _HEADER.pack(len(payload), KEYFRAME, tick) + payload
+
+
+def encode_delta(tick, values, previous):
+    """Encode the fields that changed since the previous tick's values"""
+    payload = bytearray()
+    mask = 0
+    for index, (value, old) in enumerate(zip(values, previous)):
+        if value != old:
+            mask |= 1 << index
+            _write_signed(payload, value - old)
+    head = bytearray()
+    _write_signed(head, mask)
+    return _HEADER.pack(len(head) + len(payload), DELTA, tick) + head + payload
+
+
+def decode(kind, payload, previous):
+    """Return a message's field values; previous is needed for deltas"""
+    if kind == KEYFRAME:
+        values = []
+        offset = 0
+        for _ in FIELDS:
+            value, offset = _read_signed(payload, offset)
+            values.append(value)
+        return values
+    mask, offset = _read_signed(payload, 0)
+    values = list(previous)
+    index = 0
+    while mask:
+        if mask & 1:
+            delta, offset = _read_signed(payload, offset)
+            values[index] += delta
+        mask >>= 1
+        index += 1
+    return values
+
+
+def apply(values, state):
+    """Write decoded field values into a MatchState for drawing"""
+    (ball_x, ball_y, left_x, left_y, left_width, left_height, left_load, left_arrow,
+     right_x, right_y, right_width, right_height, right_load, right_arrow,
+     flags, score1, score2) = values
+    for paddle, x, y, width, height, load, arrow, powered, holding in (
+            (state.left, left_x, left_y, left_width, left_height, left_load, left_arrow,
+             LEFT_POWERED, LEFT_HOLDING),
+            (state.right, right_x, right_y, right_width, right_height, right_load, right_arrow,
+             RIGHT_POWERED, RIGHT_HOLDING)):
+        paddle.x = x / POSITION_SCALE
+        paddle.y = y / POSITION_SCALE
+        paddle.width = width
+        paddle.height = height
+        paddle.load_counter = load / TENTHS
+        paddle.arrow_angle = arrow / TENTHS
+        paddle.is_powered_up = bool(flags & powered)
+        paddle.is_holding_ball = bool(flags & holding)
+    ball = state.ball
+    ball.x = ball_x / POSITION_SCALE
+    ball.y = ball_y / POSITION_SCALE
+    ball.is_held = bool(flags & BALL_HELD)
+    ball.sync_rect()
+    state.player1_score = score1
+    state.player2_score = score2
+    return state
+
+
+class _Spectator(asyncio.Protocol):
+    """
+    One connected client. Frames are written straight to the socket while
+    it keeps up; once the transport's buffer passes its high-water mark they
+    wait in `pending`, and if more than max_pending pile up they are dropped
+    and the client is resynced with the next keyframe.
+    """
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self.transport = None
+        self.paused = False
+        self.resync = True  # Needs a keyframe before any delta
+        self.pending = deque()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        # Small socket buffers, so a stalled client is noticed after a few
+        # frames instead of after megabytes of stale ones
+        buffer_bytes = self.broadcaster.buffer_bytes
+        transport.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF,
+                                                      buffer_bytes)
+        transport.set_write_buffer_limits(high=buffer_bytes)
+        self.broadcaster.clients.add(self)
+
+    def connection_lost(self, error):
+        self.broadcaster.clients.discard(self)
+
+    def data_received(self, data):
+        pass  # Spectators only listen
+
+    def pause_writing(self):
+        self.paused = True
+
+    def resume_writing(self):
+        self.paused = False
+        pending = self.pending
+        if pending:
+            self.transport.writelines(pending)
+            pending.clear()
+
+    def send(self, keyframe, delta):
+        """Queue this tick's frame; keyframe is a callable so it is encoded only when needed"""
+        if self.paused:
+            pending = self.pending
+            if len(pending) >= self.broadcaster.max_pending:
+                # Stale frames are worthless to a spectator; skip to the present
+                self.broadcaster.stats[DROPPED] += len(pending)
+                pending.clear()
+                self.resync = True
+            pending.append(keyframe() if self.resync or delta is None else delta)
+        else:
+            self.transport.write(keyframe() if self.resync or delta is None else delta)
+        self.resync = False
+
+
+class _Broadcaster:
+    """Encodes each tick once and sends it to every client (server process)"""
+    def __init__(self, stats, keyframe_interval, max_pending, buffer_bytes):
+        self.stats = stats
+        self.keyframe_interval = keyframe_interval
+        self.max_pending = max_pending
+        self.buffer_bytes = buffer_bytes
+        self.clients = set()
+        self.previous = None  # Values of the last broadcast tick
+
+    def broadcast(self, tick, values):
+        stats = self.stats
+        stats[PUBLISHED] += 1
+        previous = self.previous
+        self.previous = values
+        if not self.clients:
+            return
+        if previous is None or tick % self.keyframe_interval == 0:
+            delta = None
+        else:
+            delta = encode_delta(tick, values, previous)
+
+        keyframe = []
+        def encoded_keyframe():
+            if not keyframe:
+                keyframe.append(encode_keyframe(tick, values))
+                stats[KEYFRAMES] += 1
+            return keyframe[0]
+
+        for client in self.clients:
+            client.send(encoded_keyframe, delta)
+
+
+async def _serve(reader, control, stats, host, port, keyframe_interval, max_pending,
+                 buffer_bytes):
+    loop = asyncio.get_running_loop()
+    broadcaster = _Broadcaster(stats, keyframe_interval, max_pending, buffer_bytes)
+    try:
+        server = await loop.create_server(lambda: _Spectator(broadcaster), host, port)
+    except OSError as error:
+        control.send(error)
+        return
+    control.send(server.sockets[0].getsockname()[1])
+
+    # Ticks arrive as whole fixed-size records; the game closing its end
+    # of the pipe stops the server
+    closed = loop.create_future()
+    fd = reader.fileno()
+    buffer = bytearray()
+    def readable():
+        data = os.read(fd, 65536)
+        if not data:
+            loop.remove_reader(fd)
+            closed.set_result(None)
+            return
+        buffer.extend(data)
+        end = len(buffer) - len(buffer) % _TICK.size
+        for record in _TICK.iter_unpack(memoryview(buffer)[:end]):
+            broadcaster.broadcast(record[0], record[1:])
+        del buffer[:end]
+    loop.add_reader(fd, readable)
+    await closed
+
+    server.close()
+    for client in list(broadcaster.clients):
+        client.transport.close()
+    await server.wait_closed()
+
+
+def _run_server(*args):
+    """Entry point of the server process"""
+    # Lower priority, so on a busy machine the game wins any contended core
+    if hasattr(os, "nice"):
+        os.nice(10)
+    asyncio.run(_serve(*args))
+
+
+class SpectatorServer:
+    """
+    Broadcasts a match to spectators over TCP from a separate process, so
+    serving many clients takes no time (or GIL) from the game. Call start()
+    once, publish(state) after every simulated tick and close() when done.
+    port=0 picks a free port; start() returns the bound one.
+    """
+    def __init__(self, host="127.0.0.1", port=0, keyframe_interval=60, max_pending=8,
+                 buffer_bytes=4096):
+        self.host = host
+        self.port = port
+        self.keyframe_interval = keyframe_interval
+        self.max_pending = max_pending  # Frames queued per client before dropping
+        self.buffer_bytes = buffer_bytes  # Buffered bytes per client that count as falling behind
+        self.process = None
+        self.writer = None
+        self.fd = None
+        self.stats = None
+        self.skipped = 0  # Ticks not handed over because the server fell behind
+
+    def start(self):
+        """Start the server process and return the port it listens on"""
+        context = multiprocessing.get_context("spawn")
+        reader, writer = context.Pipe(duplex=False)
+        control, child_control = context.Pipe(duplex=False)
+        self.stats = context.RawArray("q", 3)
+        self.process = context.Process(
+            target=_run_server, name="spectator-server", daemon=True,
+            args=(reader, child_control, self.stats, self.host, self.port,
+                  self.keyframe_interval, self.max_pending, self.buffer_bytes))
+        self.process.start()
+        reader.close()
+        child_control.close()
+        try:
+            result = control.recv()
+        except EOFError:
+            result = RuntimeError("The spectator server process exited during startup")
+        control.close()
+        if isinstance(result, Exception):
+            self.process.join()
+            raise result
+        self.port = result
+        # Ticks are written as raw records that fit in one atomic pipe write
+        self.writer = writer
+        self.fd = writer.fileno()
+        os.set_blocking(self.fd, False)
+        return self.port
+
+    def publish(self, state):
+        """Hand a tick over to the server process; never blocks"""
+        if self.fd is not None:
+            try:
+                os.write(self.fd, _TICK.pack(state.tick, *quantize(state)))
+            except BlockingIOError:
+                self.skipped += 1
+
+    @property
+    def published(self):
+        return self.stats[PUBLISHED] if self.stats else 0
+
+    @property
+    def keyframes(self):
+        return self.stats[KEYFRAMES] if self.stats else 0
+
+    @property
+    def dropped(self):
+        """Frames dropped for slow clients"""
+        return self.stats[DROPPED] if self.stats else 0
+
+    def close(self):
+        """Disconnect every client and stop the server process"""
+        if self.fd is not None:
+            self.writer.close()
+            self.fd = None
+            self.process.join()
+
+
+class SpectatorClient:
+    """
+    Receives a match from a SpectatorServer. Each receive() applies one
+    message to `state`, a MatchState of the given size, and returns its
+    tick, or None once the server has closed the connection.
+    """
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        self.state = MatchState(width, height, seed=0)
+        self.values = None
+        self.reader = None
+        self.writer = None
+        self.messages = 0
+        self.keyframes = 0
+        self.bytes = 0
+
+    async def connect(self, host, port):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    async def receive(self):
+        """Wait for the next message, apply it and return its tick"""
+        while True:
+            try:
+                header = await self.reader.readexactly(_HEADER.size)
+                length, kind, tick = _HEADER.unpack(header)
+                payload = await self.reader.readexactly(length)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return None
+            self.messages += 1
+            self.bytes += _HEADER.size + length
+            if kind == DELTA and self.values is None:
+                continue  # Joined mid-stream; wait for a keyframe
+            if kind == KEYFRAME:
+                self.keyframes += 1
+            self.values = decode(kind, payload, self.values)
+            apply(self.values, self.state)
+            self.state.tick = tick
+            return tick
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def watch(host, port, fps=60):
+    """Open a window and draw the match streamed by a SpectatorServer"""
+    import pygame
+
+    from entities import Ball, Paddle, ScoreSystem
+    from game.constants import BLACK
+    from game.startup import init_video
+
+    init_video()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Pong Game - Spectating %s:%d" % (host, port))
+    left_paddle = Paddle(20, SCREEN_HEIGHT // 2 - 50, is_left=True)
+    right_paddle = Paddle(SCREEN_WIDTH - 35, SCREEN_HEIGHT // 2 - 50, is_left=False)
+    ball = Ball(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+    score_system = ScoreSystem()
+
+    async def run():
+        client = SpectatorClient()
+        await client.connect(host, port)
+        # Ticks are applied as they arrive and the newest one is drawn at fps
+        receiving = asyncio.ensure_future(_receive_all(client))
+        while not receiving.done():
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                break
+            state = client.state
+            left_paddle.sync_from(state.left)
+            right_paddle.sync_from(state.right)
+            ball.sync_from(state.ball)
+            score_system.sync_from(state)
+            screen.fill(BLACK)
+            score_system.draw(screen, SCREEN_WIDTH, SCREEN_HEIGHT)
+            screen.blits(left_paddle.sprites() + right_paddle.sprites() + ball.sprites(),
+                         doreturn=False)
+            pygame.display.flip()
+            await asyncio.sleep(1 / fps)
+        receiving.cancel()
+        await client.close()
+
+    asyncio.run(run())
+    pygame.quit()
+
+
+async def _receive_all(client):
+    while await client.receive() is not None:
+        pass
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from game.constants import SPECTATOR_PORT
+
+    parser = argparse.ArgumentParser(description="Watch a Pong match")
+    parser.add_argument("address", metavar="HOST[:PORT]")
+    args = parser.parse_args()
+    host, _, port = args.address.partition(":")
+    watch(host, int(port) if port else SPECTATOR_PORT)
@@ -0,0 +1,134 @@
+"""
+Pre-rendered sprites for the match entities.
+Paddles, load bars, the aiming arrow and the ball used to be rasterized
+with draw primitives every frame (the arrow alone took six cos/sin calls and
+three line draws). They are now drawn once into small colorkeyed surfaces
+and blitted, so a whole frame's entities can go out in one Surface.blits()
+call. Every arrow angle reachable in 5 degree steps and every load level of
+the default paddles is baked up front; anything else is baked on first use.
+"""
+
+import math
+
+import pygame
+
+ARROW_COLOR = (255, 255, 0)
+LOAD_BAR_BACKGROUND = (100, 100, 100)
+LOAD_BAR_HEIGHT = 5
+LOAD_BAR_GAP = 5      # Pixels between the paddle and its load bar
+ARROW_HEAD = 10       # Length of the arrowhead strokes
+ARROW_WIDTH = 3
+_TRANSPARENT = (0, 0, 0)
+
+
+def _surface(width, height):
+    """A sprite surface, converted to the display format when there is one"""
+    surface = pygame.Surface((width, height))
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    return surface
+
+
+def _keyed(surface):
+    """Make black transparent; run-length encoding speeds up sparse sprites"""
+    surface.set_colorkey(_TRANSPARENT, pygame.RLEACCEL)
+    return surface
+
+
+class SpriteAtlas:
+    """
+    Cache of entity sprites keyed by everything that affects their pixels.
+    Each method returns a sprite; arrow() also returns the position of the
+    arrow's start point inside its sprite. Blitting a sprite gives the pixels
+    the draw primitives it replaces would have produced, except that the
+    arrow no longer shifts by a pixel with float rounding at some positions.
+    """
+    def __init__(self):
+        self.paddles = {}    # (width, height, color) -> surface
+        self.balls = {}      # (radius, color) -> surface
+        self.load_bars = {}  # (width, load, max_load) -> surface
+        self.arrows = {}     # (angle rounded to 0.001, length) -> (surface, (dx, dy))
+
+    def bake(self, paddle_width=15, max_load=100, arrow_length=50, arrow_step=5):
+        """Render every load level and arrow angle a paddle can show"""
+        for load in range(max_load + 1):
+            self.load_bar(paddle_width, load, max_load)
+        # Arrows start at 0 (left paddle) or 180 degrees (right paddle), turn
+        # in arrow_step increments and stop at 90 degrees either way
+        steps = int(90 / arrow_step + 1e-9)
+        for center in (0, 180):
+            for angle in [center - 90, center + 90] + [center + step * arrow_step
+                                                     for step in range(-steps, steps + 1)]:
+                self.arrow(angle, arrow_length)
+
+    def paddle(self, width, height, color):
+        key = (width, height, tuple(color))
+        surface = self.paddles.get(key)
+        if surface is None:
+            surface = self.paddles[key] = _surface(width, height)
+            surface.fill(color)
+        return surface
+
+    def ball(self, radius, color):
+        key = (radius, tuple(color))
+        surface = self.balls.get(key)
+        if surface is None:
+            surface = _surface(radius * 2 + 1, radius * 2 + 1)
+            surface.fill(_TRANSPARENT)
+            pygame.draw.circle(surface, color, (radius, radius), radius)
+            surface = self.balls[key] = _keyed(surface)
+        return surface
+
+    def load_bar(self, width, load, max_load):
+        key = (width, load, max_load)
+        surface = self.load_bars.get(key)
+        if surface is None:
+            # Gray background, filled from the left in a blue to red gradient
+            fraction = load / max_load
+            fill_width = int(width * fraction) if load > 0 else 0
+            surface = _surface(max(width, fill_width), LOAD_BAR_HEIGHT)
+            surface.fill(_TRANSPARENT)
+            surface.fill(LOAD_BAR_BACKGROUND, (0, 0, width, LOAD_BAR_HEIGHT))
+            if fill_width:
+                color = (int(255 * fraction), int(100 * (1 - fraction)), 255)
+                surface.fill(color, (0, 0, fill_width, LOAD_BAR_HEIGHT))
+            surface = self.load_bars[key] = _keyed(surface)
+        return surface
+
+    def arrow(self, angle, length):
+        # Angles that drifted by float rounding share one sprite
+        angle = round(angle, 3)
+        key = (angle, length)
+        sprite = self.arrows.get(key)
+        if sprite is None:
+            sprite = self.arrows[key] = self._render_arrow(angle, length)
+        return sprite
+
+    def _render_arrow(self, angle, length):
+        """Draw the arrow around an integer origin, so it can be blitted anywhere"""
+        reach = length + ARROW_HEAD + ARROW_WIDTH
+        surface = _surface(reach * 2, reach * 2)
+        surface.fill(_TRANSPARENT)
+        start_x = start_y = reach
+
+        # Rounded so that e.g. cos(270) lands on 0 rather than just below it
+        angle_radians = math.radians(angle)
+        end_x = start_x + round(length * math.cos(angle_radians), 9)
+        end_y = start_y + round(length * math.sin(angle_radians), 9)
+        pygame.draw.line(surface, ARROW_COLOR, (start_x, start_y), (end_x, end_y), ARROW_WIDTH)
+        for head_angle in (angle_radians + math.radians(150), angle_radians - math.radians(150)):
+            head_x = end_x + round(ARROW_HEAD * math.cos(head_angle), 9)
+            head_y = end_y + round(ARROW_HEAD * math.sin(head_angle), 9)
+            pygame.draw.line(surface, ARROW_COLOR, (end_x, end_y), (head_x, head_y), ARROW_WIDTH)
+
+        # Crop to the drawn pixels so blits and dirty regions stay small
+        surface.set_colorkey(_TRANSPARENT)
+        bounds = surface.get_bounding_rect()
+        sprite = _surface(max(bounds.width, 1), max(bounds.height, 1))
+        sprite.fill(_TRANSPARENT)
+        sprite.blit(surface, (0, 0), bounds)
+        return _keyed(sprite), (start_x - bounds.x, start_y - bounds.y)
+
+
+# Shared atlas used by the entities
+atlas = SpriteAtlas()
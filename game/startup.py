@@ -0,0 +1,58 @@
+"""
+Fast-startup helpers for the Pong game.
+Only the SDL subsystems the game uses (display and font) are initialized,
+and only when the window is first needed; pygame.init() would also start
+the mixer, joystick and other subsystems. Startup milestones are timed from
+the moment this module is first imported (main.py imports it before
+anything else), and the time to the first presented frame is reported once.
+"""
+
+import sys
+from time import perf_counter
+
+# Taken before pygame is imported so the import is part of the startup time
+STARTED = perf_counter()
+
+import pygame
+
+# (label, seconds since STARTED), in the order they were reached
+milestones = []
+_first_frame = None
+
+
+def mark(label):
+    """Record a startup milestone"""
+    milestones.append((label, perf_counter() - STARTED))
+
+
+def init_video():
+    """Initialize only the display and font modules, if not done yet"""
+    if not pygame.display.get_init():
+        pygame.display.init()
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+
+def time_to_first_frame():
+    """Seconds from startup to the first presented frame, or None before it"""
+    return _first_frame
+
+
+def mark_first_frame(report=True):
+    """
+    Record that a frame has been presented. Only the first call counts;
+    with report set it prints the time to first frame and its milestones.
+    """
+    global _first_frame
+    if _first_frame is not None:
+        return
+    mark("first frame")
+    _first_frame = milestones[-1][1]
+    if report:
+        steps = []
+        previous = 0.0
+        for label, seconds in milestones:
+            steps.append("%s %.1f ms" % (label, (seconds - previous) * 1000))
+            previous = seconds
+        print("Time to first frame: %.1f ms (%s)" % (_first_frame * 1000, ", ".join(steps)),
+              file=sys.stderr)
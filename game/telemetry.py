@@ -0,0 +1,171 @@
+"""
+Match telemetry for the Pong game.
+Gameplay events (paddle hits, load gains, power-ups, holds, throws and
+points) are pushed onto a bounded in-memory queue by simulation.step and
+written to disk by a background thread, so the game loop never waits on
+file I/O. emit() only appends to a deque and never takes a lock or blocks;
+when the queue is full the event is dropped and counted instead, and the
+writer records how many were lost. The writer drains the queue in batches
+into compact JSON Lines or binary files and starts a new file once the
+current one reaches its size limit, keeping only the newest few.
+"""
+
+import json
+import os
+import struct
+import sys
+import threading
+from collections import deque
+from time import sleep, strftime, time
+
+# Event kinds; the binary format stores the index into this tuple
+EVENTS = ("match", "hit", "load", "power_up", "hold", "throw", "score", "dropped")
+EVENT_CODES = {name: code for code, name in enumerate(EVENTS)}
+
+MAGIC = b"PONGTEL"
+VERSION = 1
+FORMATS = {"jsonl": ".jsonl", "binary": ".ptel"}
+
+# Binary record: wall time, tick, event code, side (-1 for none), value
+_RECORD = struct.Struct("<dIBbd")
+
+
+# One JSON Lines record; formatting it directly is several times faster than json.dumps
+_JSON_RECORD = '{"t":%.6f,"event":"%s","tick":%d,"side":%d,"value":%r}\n'
+
+
+def encode_jsonl(events):
+    """Encode (time, kind, tick, side, value) events as JSON Lines"""
+    return "".join([_JSON_RECORD % event for event in events]).encode()
+
+
+def encode_binary(events):
+    """Encode (time, kind, tick, side, value) events as fixed-size records"""
+    pack = _RECORD.pack
+    return b"".join(pack(t, tick, EVENT_CODES[kind], side, value)
+                    for t, kind, tick, side, value in events)
+
+
+def read_events(path):
+    """Return the (time, kind, tick, side, value) events in a telemetry file of either format"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(MAGIC):
+        if data[len(MAGIC)] != VERSION:
+            raise ValueError("Not a version %d Pong telemetry file" % VERSION)
+        return [(t, EVENTS[code], tick, side, value) for t, tick, code, side, value
+                in _RECORD.iter_unpack(data[len(MAGIC) + 1:])]
+    events = []
+    for line in data.splitlines():
+        record = json.loads(line)
+        events.append((record["t"], record["event"], record["tick"], record["side"],
+                       record["value"]))
+    return events
+
+
+class TelemetryBus:
+    """
+    Bounded event queue with a background writer thread.
+    Files are named <prefix>-<start time>-<index> in directory; a new one is
+    started once the current file holds max_file_bytes, and only the newest
+    max_files are kept. close() stops the thread and writes what is left.
+    """
+    def __init__(self, directory, fmt="jsonl", capacity=8192, batch_size=256,
+                 flush_interval=0.5, max_file_bytes=1 << 20, max_files=10, prefix="telemetry"):
+        if fmt not in FORMATS:
+            raise ValueError("Unknown telemetry format %r" % fmt)
+        self.directory = directory
+        self.fmt = fmt
+        self.encode = encode_jsonl if fmt == "jsonl" else encode_binary
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.name = "%s-%s" % (prefix, strftime("%Y%m%d-%H%M%S"))
+
+        # Appends and pops on a deque are atomic, so the game thread and the
+        # writer share it without a lock
+        self.events = deque()
+        self.emitted = 0
+        self.dropped = 0        # Events refused because the queue was full
+        self.written = 0
+        self.batches = 0
+        self.drops_written = 0  # Part of dropped already recorded in the files
+
+        self.file = None
+        self.file_bytes = 0
+        self.file_index = 0
+        self.paths = deque()    # Files written so far and still kept
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+        self.thread.start()
+
+    def emit(self, kind, tick, side=-1, value=0.0):
+        """Queue an event without blocking; returns False if it was dropped"""
+        events = self.events
+        if len(events) >= self.capacity:
+            self.dropped += 1
+            return False
+        events.append((time(), kind, tick, side, value))
+        self.emitted += 1
+        return True
+
+    def _open(self):
+        """Start the next file, removing the oldest ones beyond max_files"""
+        if self.file:
+            self.file.close()
+        self.file_index += 1
+        path = os.path.join(self.directory, "%s-%03d%s" % (self.name, self.file_index,
+                                                           FORMATS[self.fmt]))
+        self.file = open(path, "wb")
+        self.file_bytes = 0
+        if self.fmt == "binary":
+            self.file_bytes = self.file.write(MAGIC + bytes((VERSION,)))
+        self.paths.append(path)
+        while len(self.paths) > self.max_files:
+            os.remove(self.paths.popleft())
+
+    def _write(self, batch):
+        data = self.encode(batch)
+        if self.file is None or self.file_bytes + len(data) > self.max_file_bytes:
+            self._open()
+        self.file_bytes += self.file.write(data)
+        self.written += len(batch)
+        self.batches += 1
+
+    def _drain(self):
+        """Write everything queued so far in batches of at most batch_size"""
+        events = self.events
+        popleft = events.popleft
+        while events:
+            batch = [popleft() for _ in range(min(len(events), self.batch_size))]
+            dropped = self.dropped
+            if dropped > self.drops_written:
+                # Leave a marker where events went missing
+                batch.append((time(), "dropped", batch[-1][2], -1, dropped - self.drops_written))
+                self.drops_written = dropped
+            self._write(batch)
+            # Hand the GIL back between batches so a long drain cannot stall a frame
+            sleep(0)
+        if self.file:
+            self.file.flush()
+
+    def _run(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            while not self.stopping.wait(self.flush_interval):
+                self._drain()
+            self._drain()
+        except OSError as error:
+            # Analytics must never take the game down; stop recording instead
+            print("Telemetry disabled: %s" % error, file=sys.stderr)
+            self.capacity = 0
+        finally:
+            if self.file:
+                self.file.close()
+
+    def close(self):
+        """Stop the writer after it has written every queued event"""
+        self.stopping.set()
+        self.thread.join()
@@ -0,0 +1,62 @@
+"""
+Font and rendered-text caches for the Pong game.
+Creating a pygame Font and rasterizing text are both expensive, so fonts are
+shared by size and rendered surfaces are kept in a bounded LRU cache.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+_fonts = {}
+
+
+def get_font(size, name=None):
+    """Return a shared pygame Font for the given file name and size"""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(name, size)
+    return font
+
+
+class TextCache:
+    """
+    LRU cache of rendered text surfaces.
+    Entries are keyed by (text, size, color, antialias); the least recently
+    used surface is evicted once more than max_entries are stored.
+    """
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, size, color, antialias=True):
+        """Return the surface for text, rendering it only on a cache miss"""
+        key = (text, size, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = get_font(size).render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Drop every cached surface"""
+        self.surfaces.clear()
+
+
+# Shared cache used by the HUD and the menus
+text_cache = TextCache()
+
+
+def render_text(text, size, color, antialias=True):
+    """Render text with the default font through the shared cache"""
+    return text_cache.render(text, size, color, antialias)
@@ -0,0 +1,40 @@
+"""
+Fixed-timestep accumulator for the Pong game.
+Physics runs at a constant tick rate while rendering runs as fast as the
+display allows; the leftover fraction of a tick is used to interpolate.
+"""
+
+
+class FixedTimestep:
+    """
+    Converts elapsed frame time into a whole number of simulation ticks.
+    When a frame takes too long, at most max_substeps ticks are run and the
+    rest of the backlog is dropped so the game slows down instead of spiralling.
+    """
+    def __init__(self, tick_rate, max_substeps=5):
+        self.tick_rate = tick_rate
+        self.tick_seconds = 1.0 / tick_rate
+        self.max_substeps = max_substeps
+        self.accumulator = 0.0
+        self.dropped_ticks = 0  # Ticks skipped because frames were too slow
+
+    def reset(self):
+        """Forget any accumulated time, e.g. after leaving a menu"""
+        self.accumulator = 0.0
+
+    def advance(self, elapsed_seconds):
+        """Add a frame's elapsed time and return how many ticks to simulate"""
+        self.accumulator += elapsed_seconds
+        ticks = int(self.accumulator / self.tick_seconds)
+        if ticks > self.max_substeps:
+            dropped = ticks - self.max_substeps
+            self.dropped_ticks += dropped
+            self.accumulator -= dropped * self.tick_seconds
+            ticks = self.max_substeps
+        self.accumulator -= ticks * self.tick_seconds
+        return ticks
+
+    @property
+    def alpha(self):
+        """Fraction of the next tick already elapsed, for render interpolation"""
+        return min(self.accumulator / self.tick_seconds, 1.0)
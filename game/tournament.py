@@ -0,0 +1,351 @@
+"""
+Self-play tournament runner for balance analysis.
+AI-vs-AI matches are played headlessly with game.simulation across a pool
+of worker processes. Every combination in a parameter grid of Rules values
+and AI Difficulty values is played a number of times; each match gets its
+own seed derived from the tournament seed, so results are reproducible for
+any worker count. Aggregated results are streamed while the run progresses.
+
+Usage:
+    python -m game.tournament --matches 200 --param max_load=60,100 \\
+        --param right.difficulty=normal,hard --output report.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from game.ai import DIFFICULTIES, AIController, Difficulty
+from game.constants import CONTINUOUS_COLLISION, SCREEN_WIDTH, SCREEN_HEIGHT
+from game.simulation import MatchState, Rules, step
+
+RULE_NAMES = tuple(vars(Rules()))
+DIFFICULTY_NAMES = tuple(vars(DIFFICULTIES["normal"]))
+_MASK64 = (1 << 64) - 1
+
+
+def match_seed(tournament_seed, config_index, match_index):
+    """Derive an independent 64-bit seed for one match (SplitMix64 finalizer)"""
+    value = (tournament_seed * 0x9E3779B97F4A7C15 + config_index * 0xBF58476D1CE4E5B9
+             + match_index) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def parse_value(text):
+    """Convert a grid value from the command line to int, float or str"""
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def expand_grid(grid):
+    """
+    Return every combination of a grid as a list of config dicts.
+    Keys are Rules attribute names, or "left."/"right." followed by
+    "difficulty" (a DIFFICULTIES name) or a Difficulty attribute.
+    Raises ValueError for an unknown key or a value the key cannot take.
+    """
+    defaults = vars(Rules())
+    for key, values in grid.items():
+        side, _, name = key.rpartition(".")
+        if side in ("left", "right"):
+            if name == "difficulty":
+                for value in values:
+                    if value not in DIFFICULTIES:
+                        raise ValueError("Unknown difficulty for %s: %r (choose from %s)" % (
+                            key, value, ", ".join(DIFFICULTIES)))
+                continue
+            if name not in DIFFICULTY_NAMES:
+                raise ValueError("Unknown AI parameter: %s" % key)
+            default = getattr(DIFFICULTIES["normal"], name)
+        elif side or key not in RULE_NAMES:
+            raise ValueError("Unknown rule: %s" % key)
+        else:
+            default = defaults[key]
+        for value in values:
+            if isinstance(default, bool):
+                valid = value in (True, False)
+            else:
+                valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if not valid:
+                raise ValueError("%s needs %s values, got %r" % (
+                    key, "boolean (0/1)" if isinstance(default, bool) else "numeric", value))
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def _difficulty(config, side):
+    """Build the Difficulty for one side of a config"""
+    base = DIFFICULTIES[config.get(side + ".difficulty", "normal")]
+    values = dict(vars(base))
+    for name in DIFFICULTY_NAMES:
+        values[name] = config.get("%s.%s" % (side, name), values[name])
+    return Difficulty(**values)
+
+
+class _HitCounter:
+    """
+    Stands in for a TelemetryBus and counts the paddle hits and catches
+    step() reports. A catch right after a bounce off the same paddle is one
+    contact, not two.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.last = None  # (side, tick) of the last counted contact
+
+    def emit(self, kind, tick, side=-1, value=0.0):
+        if kind == "hit" or (kind == "hold" and self.last != (side, tick - 1)):
+            self.hits += 1
+            self.last = (side, tick)
+
+
+def play_match(config, seed, target_score=5, max_ticks=36000, continuous=CONTINUOUS_COLLISION):
+    """
+    Play one AI-vs-AI match and return its statistics.
+    The match ends when a side reaches target_score or after max_ticks.
+    """
+    rules = Rules(**{name: config[name] for name in RULE_NAMES if name in config})
+    state = MatchState(SCREEN_WIDTH, SCREEN_HEIGHT, rules=rules, seed=seed, continuous=continuous)
+    left_ai = AIController(True, _difficulty(config, "left"), seed=seed ^ 1)
+    right_ai = AIController(False, _difficulty(config, "right"), seed=seed ^ 2)
+    left, right = state.left, state.right
+    # Hits come from the collision code itself; the ball's direction also
+    # flips on a serve and stops on a catch
+    counter = _HitCounter()
+
+    rallies = []
+    rally_start = 0  # Hits counted before the current rally
+    power_ups = [0, 0]
+    holds = [0, 0]
+    scores = 0
+    while state.tick < max_ticks:
+        powered_before = (left.is_powered_up, right.is_powered_up)
+        holding_before = (left.is_holding_ball, right.is_holding_ball)
+
+        step(state, (left_ai.get_input(state), right_ai.get_input(state)), telemetry=counter)
+        for side, paddle in enumerate((left, right)):
+            if paddle.is_powered_up and not powered_before[side]:
+                power_ups[side] += 1
+            if paddle.is_holding_ball and not holding_before[side]:
+                holds[side] += 1
+        if state.player1_score + state.player2_score != scores:
+            scores += 1
+            rallies.append(counter.hits - rally_start)
+            rally_start = counter.hits
+            if max(state.player1_score, state.player2_score) >= target_score:
+                break
+
+    if state.player1_score == state.player2_score:
+        winner = None
+    else:
+        winner = "left" if state.player1_score > state.player2_score else "right"
+    return {
+        "seed": seed,
+        "winner": winner,
+        "score": (state.player1_score, state.player2_score),
+        "ticks": state.tick,
+        "rallies": rallies,
+        "power_ups": power_ups,
+        "holds": holds,
+    }
+
+
+def _run_chunk(config_index, config, seeds, target_score, max_ticks, continuous):
+    """Worker entry point: play several matches of one config"""
+    return config_index, [play_match(config, seed, target_score, max_ticks, continuous)
+                          for seed in seeds]
+
+
+class ConfigResults:
+    """Running totals for every match played with one config"""
+    def __init__(self, config):
+        self.config = config
+        self.matches = 0
+        self.wins = Counter()          # "left"/"right"/"draw" -> matches
+        self.scores = Counter()        # "5-3" -> matches
+        self.rally_lengths = Counter() # paddle hits in a rally -> rallies
+        self.power_ups = [0, 0]
+        self.holds = [0, 0]
+        self.ticks = 0
+
+    def add(self, result):
+        self.matches += 1
+        self.wins[result["winner"] or "draw"] += 1
+        self.scores["%d-%d" % tuple(result["score"])] += 1
+        self.rally_lengths.update(result["rallies"])
+        for side in (0, 1):
+            self.power_ups[side] += result["power_ups"][side]
+            self.holds[side] += result["holds"][side]
+        self.ticks += result["ticks"]
+
+    def _rally_percentile(self, fraction):
+        total = sum(self.rally_lengths.values())
+        seen = 0
+        for length in sorted(self.rally_lengths):
+            seen += self.rally_lengths[length]
+            if seen >= fraction * total:
+                return length
+        return 0
+
+    def summary(self):
+        """Return a JSON-serializable summary"""
+        matches = max(self.matches, 1)
+        rallies = sum(self.rally_lengths.values())
+        return {
+            "config": self.config,
+            "matches": self.matches,
+            "win_rate": {side: self.wins[side] / matches for side in ("left", "right", "draw")},
+            "rally": {
+                "count": rallies,
+                "mean": (sum(length * count for length, count in self.rally_lengths.items())
+                         / rallies if rallies else 0.0),
+                "p50": self._rally_percentile(0.5),
+                "p90": self._rally_percentile(0.9),
+                "max": max(self.rally_lengths, default=0),
+            },
+            "power_ups_per_match": [count / matches for count in self.power_ups],
+            "holds_per_match": [count / matches for count in self.holds],
+            "mean_ticks": self.ticks / matches,
+            "score_distribution": dict(self.scores.most_common()),
+        }
+
+
+def run_tournament(grid, matches=100, workers=None, seed=0, target_score=5,
+                   max_ticks=36000, chunk_size=10, on_progress=None,
+                   continuous=CONTINUOUS_COLLISION):
+    """
+    Play `matches` matches for every config in grid and return the report.
+    Work is split into chunks of chunk_size matches spread over `workers`
+    processes (all cores by default; 1 runs in this process).
+    on_progress(done, total, results) is called after every finished chunk
+    with the list of ConfigResults so far.
+    """
+    configs = expand_grid(grid)
+    results = [ConfigResults(config) for config in configs]
+    tasks = []
+    for index, config in enumerate(configs):
+        seeds = [match_seed(seed, index, number) for number in range(matches)]
+        for start in range(0, matches, chunk_size):
+            tasks.append((index, config, seeds[start:start + chunk_size],
+                          target_score, max_ticks, continuous))
+
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    done = 0
+
+    def collect(config_index, chunk):
+        nonlocal done
+        for result in chunk:
+            results[config_index].add(result)
+        done += len(chunk)
+        if on_progress:
+            on_progress(done, len(configs) * matches, results)
+
+    if workers == 1:
+        for task in tasks:
+            collect(*_run_chunk(*task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_chunk, *task) for task in tasks]
+            for future in as_completed(futures):
+                collect(*future.result())
+
+    return {
+        "seed": seed,
+        "matches_per_config": matches,
+        "target_score": target_score,
+        "max_ticks": max_ticks,
+        "continuous": continuous,
+        "workers": workers,
+        "seconds": time.perf_counter() - started,
+        "configs": [config_results.summary() for config_results in results],
+    }
+
+
+def format_summary(summary):
+    """One line describing a config's results"""
+    config = ", ".join("%s=%s" % item for item in summary["config"].items()) or "defaults"
+    win_rate = summary["win_rate"]
+    return ("%s: %d matches, left %.0f%% right %.0f%% draw %.0f%%, rally mean %.1f p90 %d, "
+            "power-ups %.1f/%.1f" % (
+                config, summary["matches"], win_rate["left"] * 100, win_rate["right"] * 100,
+                win_rate["draw"] * 100, summary["rally"]["mean"], summary["rally"]["p90"],
+                *summary["power_ups_per_match"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI-vs-AI balance tournament")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2",
+                        help="grid axis: a Rules name or left./right. + difficulty or a "
+                             "Difficulty attribute (repeatable)")
+    parser.add_argument("--grid", help="JSON file mapping parameter names to value lists")
+    parser.add_argument("--matches", type=int, default=100, help="matches per config")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="tournament seed")
+    parser.add_argument("--target-score", type=int, default=5)
+    parser.add_argument("--max-ticks", type=int, default=36000)
+    parser.add_argument("--discrete", action="store_true",
+                        help="use per-tick overlap collisions instead of CONTINUOUS_COLLISION")
+    parser.add_argument("--chunk-size", type=int, default=10, help="matches per worker task")
+    parser.add_argument("--output", help="write the final report as JSON")
+    parser.add_argument("--stream", help="append a JSON line of partial results per update")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="seconds between streamed progress updates")
+    args = parser.parse_args(argv)
+
+    grid = {}
+    if args.grid:
+        with open(args.grid) as f:
+            grid.update(json.load(f))
+    for param in args.param:
+        name, _, values = param.partition("=")
+        grid[name] = [parse_value(value) for value in values.split(",")]
+    try:
+        expand_grid(grid)
+    except ValueError as error:
+        parser.error(str(error))
+
+    last_update = [0.0]
+    stream = open(args.stream, "a") if args.stream else None
+
+    def progress(done, total, results):
+        now = time.perf_counter()
+        if now - last_update[0] < args.interval and done < total:
+            return
+        last_update[0] = now
+        print("[%d/%d matches]" % (done, total))
+        for config_results in results:
+            if config_results.matches:
+                print("  " + format_summary(config_results.summary()))
+        if stream:
+            stream.write(json.dumps({"done": done, "total": total, "configs": [
+                config_results.summary() for config_results in results]}) + "\n")
+            stream.flush()
+
+    try:
+        report = run_tournament(grid, args.matches, args.workers, args.seed, args.target_score,
+                                args.max_ticks, args.chunk_size, progress,
+                                CONTINUOUS_COLLISION and not args.discrete)
+    finally:
+        if stream:
+            stream.close()
+    print("Finished %d configs in %.1f s with %d workers" % (
+        len(report["configs"]), report["seconds"], report["workers"]))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
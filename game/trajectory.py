@@ -0,0 +1,115 @@
+"""
+Throw-trajectory preview for the Pong game.
+While a paddle holds the ball, a dotted line shows where throw_ball will
+send it: straight along the arrow, reflected off the top and bottom walls,
+up to the line where it would meet the far paddle. The small random change
+a wall bounce adds in play is left out. The arrow only turns in fixed steps,
+so every path from one ball position is traced and laid out as dot sprites
+once, and the cache is only cleared when the paddle moves.
+"""
+
+import math
+
+import pygame
+
+from game.sprites import atlas
+
+PREVIEW_COLOR = (150, 150, 60)
+DOT_RADIUS = 2
+DOT_SPACING = 12      # Pixels between the dots of the preview
+MAX_BOUNCES = 6       # Steep throws are only traced this far
+MAX_LENGTH = 1600     # Longest path traced, in pixels
+
+
+def trace(x, y, angle, top, bottom, end_x, max_bounces=MAX_BOUNCES, max_length=MAX_LENGTH):
+    """
+    Return the points of a throw from (x, y) along angle (degrees): the
+    start, each wall bounce and the end, where the ball's center reaches
+    end_x or the bounce or length limit is hit. top and bottom are the
+    highest and lowest y the ball's center can reach.
+    """
+    angle_radians = math.radians(angle)
+    # Rounded so that e.g. a 90 degree throw is exactly vertical
+    dx = round(math.cos(angle_radians), 9)
+    dy = round(math.sin(angle_radians), 9)
+    points = [(x, y)]
+    remaining = max_length
+    for _ in range(max_bounces + 1):
+        # Distance along the path to the end line and to the next wall
+        to_end = (end_x - x) / dx if dx else math.inf
+        if dy > 0:
+            to_wall = (bottom - y) / dy
+        elif dy < 0:
+            to_wall = (top - y) / dy
+        else:
+            to_wall = math.inf
+        distance = min(to_end, to_wall, remaining)
+        x += dx * distance
+        y += dy * distance
+        points.append((x, y))
+        remaining -= distance
+        if distance != to_wall or remaining <= 0:
+            break
+        dy = -dy
+    return points
+
+
+def dots(points, spacing=DOT_SPACING):
+    """Return integer positions every spacing pixels along a polyline, after its start"""
+    positions = []
+    carried = spacing  # Distance still to go before the next dot
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        length = math.hypot(x2 - x1, y2 - y1)
+        travelled = carried
+        while travelled <= length:
+            fraction = travelled / length
+            positions.append((round(x1 + (x2 - x1) * fraction), round(y1 + (y2 - y1) * fraction)))
+            travelled += spacing
+        carried = travelled - length
+    return positions
+
+
+class TrajectoryPreview:
+    """
+    Cached throw previews for one paddle.
+    sprites() returns (surface, position) pairs for Surface.blits and a rect
+    bounding them. Paths are cached per arrow angle for the current ball
+    position and far paddle line, and dropped when either changes.
+    """
+    def __init__(self, top, bottom, color=PREVIEW_COLOR, spacing=DOT_SPACING,
+                 radius=DOT_RADIUS):
+        self.top = top
+        self.bottom = bottom
+        self.color = color
+        self.spacing = spacing
+        self.radius = radius
+        self.origin = None
+        self.paths = {}   # angle rounded to 0.001 -> (sprites, bounds)
+        self.traced = 0   # Paths traced so far, for profiling the cache
+
+    def sprites(self, x, y, angle, end_x):
+        """Return the preview of a throw from (x, y) along angle up to end_x"""
+        origin = (x, y, end_x)
+        if origin != self.origin:
+            self.origin = origin
+            self.paths.clear()
+        key = round(angle, 3)
+        path = self.paths.get(key)
+        if path is None:
+            path = self.paths[key] = self._build(x, y, key, end_x)
+        return path
+
+    def _build(self, x, y, angle, end_x):
+        self.traced += 1
+        radius = self.radius
+        dot = atlas.ball(radius, self.color)
+        positions = dots(trace(x, y, angle, self.top, self.bottom, end_x), self.spacing)
+        sprites = [(dot, (dot_x - radius, dot_y - radius)) for dot_x, dot_y in positions]
+        if not positions:
+            return sprites, pygame.Rect(x, y, 0, 0)
+        xs = [dot_x for dot_x, dot_y in positions]
+        ys = [dot_y for dot_x, dot_y in positions]
+        size = radius * 2 + 1
+        bounds = pygame.Rect(min(xs) - radius, min(ys) - radius,
+                             max(xs) - min(xs) + size, max(ys) - min(ys) + size)
+        return sprites, bounds
@@ -1,21 +1,89 @@
+from game import startup  # First, so startup is timed from here
 import pygame
+import os
 import sys
+import time
 from game.constants import *
-from game.screens import StartScreen
+from game.screens import StartScreen, PauseScreen, GameOverScreen, MENU_PHASES
+from game.scenes import Scene, SceneManager, MENU, MATCH, PAUSE, GAME_OVER
+from game import display
+from game.display import Display
 from entities import Paddle, Ball, ScoreSystem
+from game.simulation import MatchState, PlayerInput, Rules, step, interpolate
+from game.timestep import FixedTimestep
+from game.text import render_text
+from game.render import DirtyRectRenderer
+from game.sprites import atlas
+from game.trajectory import TrajectoryPreview
+from game.ai import AIController
+from game.replay import InputRecorder
+from game.profiler import FrameProfiler, dump_profiles
+from game.pacing import FramePacer
+from game.telemetry import TelemetryBus
 
-# Initialize pygame
-pygame.init()
-
-# Set up the display
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Pong Game")
+# The window is created on first use, see init_display; the game draws on
+# screen, its playfield-sized canvas
+window = None
+screen = None
 clock = pygame.time.Clock()
+# Sleep-first pacing for matches, see game.pacing; None uses clock.tick
+pacer = FramePacer(FPS, PACING_SPIN) if LOW_LATENCY_PACING else None
+
+# Frame-time instrumentation for the match and the menu screens (F3 toggles)
+GAME_PHASES = ("events", "ai", "physics", "sync", "draw", "present", "wait")
+game_profiler = FrameProfiler("match", GAME_PHASES, PROFILE_HISTORY, PROFILE_FRAMES)
+menu_profiler = FrameProfiler("menu", MENU_PHASES, PROFILE_HISTORY, PROFILE_FRAMES)
+# Input-to-present latency of every match frame: from sampling the input
+# through simulating to presenting the frame
+latency_profiler = FrameProfiler("latency", ("simulate", "present"), PROFILE_HISTORY, True)
+
+# Game objects are built by the first match and reset in place after that,
+# see initialize_game_objects and initialize_multiball
+match = None
+multiball = None
+# Gameplay event stream, started by main() when TELEMETRY is set
+telemetry = None
+# Broadcasts every tick to spectators, started by main() when SPECTATOR_SERVER is set
+spectators = None
+
+startup.mark("imports")
+
+def configure(window_size=None, fps=None, fullscreen=None, smooth=None, render_scale=None,
+              telemetry=None, record_replays=None):
+    """Override settings from game.constants; call before the window is created"""
+    global WINDOW_SIZE, FPS, FULLSCREEN, SMOOTH_SCALING, RENDER_SCALE, TELEMETRY, RECORD_REPLAYS
+    global pacer
+    if window_size is not None:
+        WINDOW_SIZE = window_size
+    if fullscreen is not None:
+        FULLSCREEN = fullscreen
+    if smooth is not None:
+        SMOOTH_SCALING = smooth
+    if render_scale is not None:
+        RENDER_SCALE = render_scale
+    if fps is not None:
+        FPS = fps
+        pacer = FramePacer(FPS, PACING_SPIN) if LOW_LATENCY_PACING else None
+    if telemetry is not None:
+        TELEMETRY = telemetry
+    if record_replays is not None:
+        RECORD_REPLAYS = record_replays
+
+def init_display():
+    """Create the game window on first use and return the surface the game draws on"""
+    global window, screen
+    if screen is None:
+        # Only the display and font modules are used; pygame.init() would
+        # also start the mixer, joystick and other subsystems
+        startup.init_video()
+        window = Display((SCREEN_WIDTH, SCREEN_HEIGHT), WINDOW_SIZE, FULLSCREEN, SMOOTH_SCALING,
+                         RENDER_SCALE)
+        screen = window.canvas
+        startup.mark("display")
+    return screen
 
 def draw_instructions(screen):
     """Draw instructions for the hold and throw feature"""
-    font = pygame.font.Font(None, 24)
-    
     # Instructions for the hold and throw feature
     instructions = [
         "Hold & Throw Feature:",
@@ -29,171 +97,484 @@ def draw_instructions(screen):
     # Draw instructions at the bottom of the screen
     y_pos = SCREEN_HEIGHT - len(instructions) * 25 - 10
     for line in instructions:
-        text = font.render(line, True, (200, 200, 200))
+        text = render_text(line, 24, (200, 200, 200))
         text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, y_pos))
         screen.blit(text, text_rect)
         y_pos += 25
 
-def main():
-    # Game state
-    game_state = "START_SCREEN"
-    
-    # Main game loop
-    running = True
-    while running:
-        if game_state == "START_SCREEN":
-            # Show the start screen
-            start_screen = StartScreen(screen)
-            result = start_screen.run()
-            
-            # Handle the result from the start screen
-            if result == "QUIT":
-                running = False
-            elif result == "VS_MACHINE":
-                game_state = "GAME_VS_MACHINE"
-                # Initialize game objects for VS Machine mode
-                initialize_game_objects(True)
-            elif result == "VS_FRIEND":
-                game_state = "GAME_VS_FRIEND"
-                # Initialize game objects for VS Friend mode
-                initialize_game_objects(False)
+class MatchScene(Scene):
+    """
+    A match in one of the game modes, played until a side reaches the
+    winning score. Entering it again without a mode is a rematch: the
+    existing match state, entities and surfaces are reset in place.
+    """
+    profiler = game_profiler
+    
+    def __init__(self):
+        self.game_state = None
+        self.session = None
+    
+    def preload(self):
+        if match is None:
+            build_game_objects()
+    
+    def enter(self, mode=None, seed=None, session=None):
+        if mode:
+            self.game_state = "GAME_" + mode
+        self.session = session
+        if self.game_state == "GAME_MULTIBALL":
+            initialize_multiball(seed)
+        else:
+            initialize_game_objects(self.game_state == "GAME_VS_MACHINE", seed,
+                                    record=session is None)
+            if telemetry and session is None:
+                telemetry.emit("match", match.tick)
+    
+    def exit(self):
+        save_replay()
+    
+    def resume(self):
+        # An overlay was drawn over the screen and no time passed in the match
+        renderer.invalidate()
+        timestep.reset()
+    
+    def handle_events(self, events):
+        latency_profiler.begin_frame()
         
-        elif game_state == "GAME_VS_MACHINE" or game_state == "GAME_VS_FRIEND":
-            # Handle events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        running = False
-                    # Power-up activation keys
-                    elif event.key == pygame.K_LSHIFT:  # Left player power-up
-                        left_paddle.activate_power_up()
-                    elif event.key == pygame.K_RSHIFT:  # Right player power-up
-                        right_paddle.activate_power_up()
-                    # Hold ball with space key
-                    elif event.key == pygame.K_SPACE:
-                        # Try to hold the ball with either paddle
-                        if not left_paddle.is_holding_ball and not right_paddle.is_holding_ball:
-                            left_paddle.hold_ball(ball)
-                            right_paddle.hold_ball(ball)
-                elif event.type == pygame.KEYUP:
-                    # Release the ball when space key is released
-                    if event.key == pygame.K_SPACE:
-                        if left_paddle.is_holding_ball:
-                            left_paddle.throw_ball(ball)
-                        elif right_paddle.is_holding_ball:
-                            right_paddle.throw_ball(ball)
-            
-            # Get pressed keys for paddle movement and arrow rotation
-            keys = pygame.key.get_pressed()
-            
-            # Left paddle movement (W/S keys)
-            if keys[pygame.K_w]:
-                left_paddle.move("up", SCREEN_HEIGHT)
-            if keys[pygame.K_s]:
-                left_paddle.move("down", SCREEN_HEIGHT)
-                
-            # Right paddle movement
-            if game_state == "GAME_VS_FRIEND":
-                # Human player (Arrow keys)
-                if keys[pygame.K_UP]:
-                    right_paddle.move("up", SCREEN_HEIGHT)
-                if keys[pygame.K_DOWN]:
-                    right_paddle.move("down", SCREEN_HEIGHT)
-            else:
-                # Simple AI for VS_MACHINE mode
-                # Follow the ball with some delay
-                if ball.y < right_paddle.rect.centery - 10:
-                    right_paddle.move("up", SCREEN_HEIGHT)
-                elif ball.y > right_paddle.rect.centery + 10:
-                    right_paddle.move("down", SCREEN_HEIGHT)
-            
-            # Arrow rotation controls
-            # Left paddle: A/S keys
-            if left_paddle.is_holding_ball:
-                if keys[pygame.K_a]:
-                    left_paddle.rotate_arrow("counterclockwise")
-                if keys[pygame.K_s]:
-                    left_paddle.rotate_arrow("clockwise")
-            
-            # Right paddle: Left/Right arrow keys
-            if right_paddle.is_holding_ball:
-                if keys[pygame.K_LEFT]:
-                    right_paddle.rotate_arrow("counterclockwise")
-                if keys[pygame.K_RIGHT]:
-                    right_paddle.rotate_arrow("clockwise")
+        # Collect this frame's input for both paddles. Key presses stay
+        # pending in left_input/right_input until a tick consumes them.
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    # A networked match cannot be paused for the other player
+                    if self.session:
+                        self.manager.quit()
+                    else:
+                        self.manager.push(PAUSE)
+                # Power-up activation keys
+                elif event.key == pygame.K_LSHIFT:  # Left player power-up
+                    left_input.activate = True
+                elif event.key == pygame.K_RSHIFT:  # Right player power-up
+                    right_input.activate = True
+                # Hold ball with space key (either paddle may catch it)
+                elif event.key == pygame.K_SPACE:
+                    left_input.hold = right_input.hold = True
+            elif event.type == pygame.KEYUP:
+                # Release the ball when space key is released
+                if event.key == pygame.K_SPACE:
+                    left_input.release = right_input.release = True
+        
+        # Get pressed keys for paddle movement and arrow rotation
+        keys = pygame.key.get_pressed()
+        
+        # Left paddle: W/S to move, A/S to rotate the arrow
+        left_input.up = keys[pygame.K_w]
+        left_input.down = keys[pygame.K_s]
+        left_input.rotate_ccw = keys[pygame.K_a]
+        left_input.rotate_cw = keys[pygame.K_s]
             
-            # Update ball position (only if not being held)
-            if not left_paddle.is_holding_ball and not right_paddle.is_holding_ball:
-                ball.update(SCREEN_WIDTH, SCREEN_HEIGHT)
+        # Right paddle movement (Arrow keys) for a human player
+        if self.game_state != "GAME_VS_MACHINE":
+            right_input.up = keys[pygame.K_UP]
+            right_input.down = keys[pygame.K_DOWN]
+        
+        # Right paddle: Left/Right arrow keys rotate the arrow
+        right_input.rotate_ccw = keys[pygame.K_LEFT]
+        right_input.rotate_cw = keys[pygame.K_RIGHT]
+    
+    def update(self, frame_seconds):
+        if self.game_state == "GAME_MULTIBALL":
+            update_multiball(timestep.advance(frame_seconds))
+            state, winning_score = multiball, MULTIBALL_WINNING_SCORE
+        else:
+            update_game(self.game_state, timestep.advance(frame_seconds), self.session)
+            state, winning_score = match, WINNING_SCORE
+        latency_profiler.mark("simulate")
+        
+        scores = (state.player1_score, state.player2_score)
+        if max(scores) >= winning_score:
+            left_won = scores[0] > scores[1]
+            if self.game_state == "GAME_VS_MACHINE":
+                title = "You win!" if left_won else "The machine wins!"
             else:
-                # Update ball position to follow the paddle that's holding it
-                if left_paddle.is_holding_ball:
-                    ball.x = left_paddle.rect.right + ball.radius
-                    ball.y = left_paddle.rect.centery
-                elif right_paddle.is_holding_ball:
-                    ball.x = right_paddle.rect.left - ball.radius
-                    ball.y = right_paddle.rect.centery
-                
-                # Update ball's rect
-                ball.rect.x = ball.x - ball.radius
-                ball.rect.y = ball.y - ball.radius
-            
-            # Check for paddle collisions (only if not being held)
-            if not left_paddle.is_holding_ball and not right_paddle.is_holding_ball:
-                if ball.check_paddle_collision(left_paddle, True):
-                    left_paddle.increase_load(10)  # Increase load counter on hit
-                
-                if ball.check_paddle_collision(right_paddle, False):
-                    right_paddle.increase_load(10)  # Increase load counter on hit
-            
-            # Check for scoring (only if not being held)
-            if not left_paddle.is_holding_ball and not right_paddle.is_holding_ball:
-                if ball.x < 0:  # Right player scores
-                    score_system.update_score(2)
-                    ball.reset(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-                elif ball.x > SCREEN_WIDTH:  # Left player scores
-                    score_system.update_score(1)
-                    ball.reset(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-            
-            # Draw everything
-            screen.fill(BLACK)  # Clear the screen with black
-            
-            # Draw center line
-            score_system.draw(screen, SCREEN_WIDTH, SCREEN_HEIGHT)
-            
-            # Draw paddles and ball
-            left_paddle.draw(screen)
-            right_paddle.draw(screen)
-            ball.draw(screen)
-            
-            # Draw instructions
-            draw_instructions(screen)
-            
-            # Update the display
-            pygame.display.flip()
-            
-            # Cap the frame rate
-            clock.tick(FPS)
+                title = "Left player wins!" if left_won else "Right player wins!"
+            self.manager.push(GAME_OVER, title=title, scores=scores,
+                              can_rematch=self.session is None)
+    
+    def render(self):
+        if self.game_state == "GAME_MULTIBALL":
+            draw_multiball()
+        else:
+            draw_game()
+        latency_profiler.mark("present")
+        latency_profiler.end_frame()
+
+def create_scene_manager(frame_pacer=None):
+    """Register every screen with a new SceneManager; each is built once and reused"""
+    init_display()
+    manager = SceneManager(screen, clock, FPS, frame_pacer or pacer)
+    manager.register(MENU, lambda: StartScreen(screen, menu_profiler))
+    manager.register(MATCH, MatchScene)
+    manager.register(PAUSE, lambda: PauseScreen(screen, menu_profiler))
+    manager.register(GAME_OVER, lambda: GameOverScreen(screen, menu_profiler))
+    manager.preload(MATCH, PAUSE, GAME_OVER)
+    return manager
+
+def main(network=None):
+    """
+    Run the game. network is an optional (is_host, local_port, remote_address)
+    tuple that starts a networked match instead of showing the start screen.
+    """
+    global telemetry, spectators
+    init_display()
+    if TELEMETRY:
+        telemetry = TelemetryBus(TELEMETRY_DIR, TELEMETRY_FORMAT, TELEMETRY_QUEUE,
+                                 max_file_bytes=TELEMETRY_FILE_BYTES, max_files=TELEMETRY_FILES)
+    if SPECTATOR_SERVER:
+        from game.spectator import SpectatorServer
+        spectators = SpectatorServer(SPECTATOR_HOST, SPECTATOR_PORT, keyframe_interval=TICK_RATE)
+        print("Spectators can watch on port %d" % spectators.start(), file=sys.stderr)
+    
+    manager = create_scene_manager()
+    
+    if network:
+        # Agree on a seed with the other player, then start the match at once
+        from game.netplay import RollbackSession, UdpTransport, handshake
+        is_host, local_port, remote_address = network
+        transport = UdpTransport(local_port, remote_address)
+        seed = handshake(transport, is_host)
+        startup.mark("handshake")
+        initialize_game_objects(False, seed, record=False)
+        session = RollbackSession(match, 0 if is_host else 1, transport,
+                                  NET_INPUT_DELAY, NET_MAX_ROLLBACK)
+        manager.run(MATCH, mode="NETWORK", seed=seed, session=session)
+        print("Netplay: %d rollbacks (%d ticks resimulated), %d stalls, %d desyncs" % (
+            session.rollbacks, session.resimulated_ticks, session.stalls, session.desyncs),
+            file=sys.stderr)
+    else:
+        manager.run(MENU)
     
     # Clean up
+    if LATENCY_REPORT and latency_profiler.frames:
+        latency = latency_profiler.stats()["frame"]
+        print("Input-to-present latency (%s pacing): p50 %.2f ms, p99 %.2f ms, max %.2f ms" % (
+            "low-latency" if pacer else "standard", latency["p50"], latency["p99"],
+            latency["max"]), file=sys.stderr)
+    if PROFILE_DUMP and (game_profiler.frames or menu_profiler.frames):
+        dump_profiles((game_profiler, menu_profiler, latency_profiler), PROFILE_DUMP)
+    if spectators:
+        spectators.close()
+    if telemetry:
+        telemetry.close()
+        print("Telemetry: %d events written in %d batches, %d dropped" % (
+            telemetry.written, telemetry.batches, telemetry.dropped), file=sys.stderr)
     pygame.quit()
     sys.exit()
 
-def initialize_game_objects(vs_machine):
-    """Initialize game objects"""
-    global left_paddle, right_paddle, ball, score_system
+def update_game(game_state, ticks, session=None):
+    """Run `ticks` physics ticks and mirror the result into the drawable entities"""
+    global previous_match  # Replaced each physics tick, see initialize_game_objects
+    
+    for _ in range(ticks):
+        if game_state == "GAME_VS_MACHINE":
+            # The CPU opponent drives the right paddle
+            right_tick_input = cpu_player.get_input(match)
+        else:
+            right_tick_input = right_input
+        game_profiler.mark("ai")
+        
+        previous_match = match.copy()
+        if session:
+            # Only our own paddle's input is used; the session
+            # predicts the other player's and rolls back if wrong
+            local_input = left_input if session.local_side == 0 else right_input
+            if not session.advance(local_input):
+                game_profiler.mark("physics")
+                continue  # Waiting for the other player; keep key presses
+        else:
+            if recorder:
+                recorder.record((left_input, right_tick_input))
+            step(match, (left_input, right_tick_input), telemetry=telemetry)
+        
+        if spectators:
+            spectators.publish(match)
+        
+        # Key presses only apply to the first tick that sees them
+        for player_input in (left_input, right_input):
+            player_input.activate = player_input.hold = player_input.release = False
+        game_profiler.mark("physics")
+    
+    # Mirror the state, interpolated between the last two ticks, into the
+    # drawable entities
+    view = interpolate(previous_match, match, timestep.alpha)
+    left_paddle.sync_from(view.left)
+    right_paddle.sync_from(view.right)
+    ball.sync_from(view.ball)
+    score_system.sync_from(match)
+    game_profiler.mark("sync")
+
+def throw_previews():
+    """Yield (key, render_key, sprites, bounds) for each paddle holding the ball"""
+    if not THROW_PREVIEW:
+        return
+    radius = ball.radius
+    for key, paddle, preview, end_x in (
+            ("left_preview", left_paddle, left_preview, right_paddle.rect.left - radius),
+            ("right_preview", right_paddle, right_preview, left_paddle.rect.right + radius)):
+        if paddle.is_holding_ball:
+            # The held ball sits where the throw starts
+            sprites, bounds = preview.sprites(round(ball.x), round(ball.y), paddle.arrow_angle,
+                                              end_x)
+            yield key, (preview.origin, paddle.arrow_angle), sprites, bounds
+
+def draw_game():
+    """Draw the current match and update the display"""
+    if DIRTY_RECT_RENDERING:
+        # Redraw only what moved or changed over the cached background
+        renderer.add("scores", score_system.get_bounds(SCREEN_WIDTH),
+                     score_system.render_key(), score_system.draw_scores, SCREEN_WIDTH)
+        for key, render_key, sprites, bounds in throw_previews():
+            renderer.add_sprites(key, bounds, render_key, sprites)
+        renderer.add_sprites("left_paddle", left_paddle.get_bounds(),
+                             left_paddle.render_key(), left_paddle.sprites())
+        renderer.add_sprites("right_paddle", right_paddle.get_bounds(),
+                             right_paddle.render_key(), right_paddle.sprites())
+        renderer.add_sprites("ball", ball.get_bounds(), ball.render_key(), ball.sprites())
+        if game_profiler.enabled:
+            game_profiler.update_overlay()
+            renderer.add("profiler", game_profiler.overlay_bounds(),
+                         game_profiler.overlay_key(), game_profiler.draw_overlay)
+        renderer.render()
+        game_profiler.mark("draw")
+        renderer.update_display()
+    else:
+        # Draw everything
+        screen.fill(BLACK)  # Clear the screen with black
+        
+        # Draw center line
+        score_system.draw(screen, SCREEN_WIDTH, SCREEN_HEIGHT)
+        
+        # Draw throw previews, paddles and ball in one batch from the sprite atlas
+        sprites = []
+        for key, render_key, preview, bounds in throw_previews():
+            sprites += preview
+        sprites += left_paddle.sprites() + right_paddle.sprites() + ball.sprites()
+        screen.blits(sprites, doreturn=False)
+        
+        # Draw instructions
+        draw_instructions(screen)
+        
+        # Frame-time overlay (F3)
+        if game_profiler.enabled:
+            game_profiler.update_overlay()
+            game_profiler.draw_overlay(screen)
+        game_profiler.mark("draw")
+        
+        # Update the display
+        display.flip()
+    game_profiler.mark("present")
+
+def build_game_objects():
+    """Create the match state, entities and surfaces that every match reuses"""
+    global left_paddle, right_paddle, ball, score_system, match, timestep
+    global left_preview, right_preview
+    global renderer, machine_player
+    init_display()
+    
+    # The headless match state that drives the game; reset for each match
+    match = MatchState(SCREEN_WIDTH, SCREEN_HEIGHT, rules=Rules.for_tick_rate(TICK_RATE),
+                       continuous=CONTINUOUS_COLLISION)
+    
+    # CPU opponent for VS Machine mode
+    machine_player = AIController(is_left=False, difficulty=AI_DIFFICULTY)
+    
+    # Physics runs at TICK_RATE regardless of the frame rate
+    timestep = FixedTimestep(TICK_RATE, MAX_SUBSTEPS)
     
     # Create paddles
-    left_paddle = Paddle(20, SCREEN_HEIGHT // 2 - 50)
-    right_paddle = Paddle(SCREEN_WIDTH - 35, SCREEN_HEIGHT // 2 - 50)
+    left_paddle = Paddle(20, SCREEN_HEIGHT // 2 - 50, is_left=True)
+    right_paddle = Paddle(SCREEN_WIDTH - 35, SCREEN_HEIGHT // 2 - 50, is_left=False)
     
     # Create ball at center of screen
     ball = Ball(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
     
     # Create score system
     score_system = ScoreSystem()
+    
+    # Where a held ball will go when thrown, cached per arrow angle
+    left_preview = TrajectoryPreview(ball.radius, SCREEN_HEIGHT - ball.radius)
+    right_preview = TrajectoryPreview(ball.radius, SCREEN_HEIGHT - ball.radius)
+    
+    # Pre-render every arrow angle and load level
+    atlas.bake(left_paddle.rect.width, left_paddle.max_load, left_paddle.arrow_length,
+               match.rules.arrow_step)
+    
+    # The center line and instructions never change, so draw them once
+    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    background.fill(BLACK)
+    score_system.draw_center_line(background, SCREEN_WIDTH, SCREEN_HEIGHT)
+    draw_instructions(background)
+    renderer = DirtyRectRenderer(screen, background)
+
+def initialize_game_objects(vs_machine, seed=None, record=True):
+    """Start a new match, building the game objects the first time and resetting them after"""
+    global previous_match, left_input, right_input, cpu_player, recorder
+    if match is None:
+        build_game_objects()
+    
+    # Each match gets its own random seed so it can be replayed exactly
+    # from the recorded inputs
+    match.reset(seed)
+    # Networked matches are driven by the rollback session and not recorded
+    recorder = InputRecorder(match) if record and RECORD_REPLAYS else None
+    previous_match = match.copy()
+    left_input = PlayerInput()
+    right_input = PlayerInput()
+    
+    cpu_player = machine_player if vs_machine else None
+    machine_player.reset()
+    
+    timestep.reset()
+    clock.tick()  # Don't count time spent in the menu
+    if pacer:
+        pacer.reset()
+    
+    # Put the entities back where the new match starts
+    left_paddle.sync_from(match.left)
+    right_paddle.sync_from(match.right)
+    ball.sync_from(match.ball)
+    score_system.reset()
+    renderer.invalidate()
+
+def initialize_multiball(seed=None):
+    """Start a multiball party match (requires numpy), reusing it for rematches"""
+    global multiball, previous_positions, ball_sprite, multiball_background
+    
+    # Paddles, scores, inputs and the timestep are shared with the normal mode
+    initialize_game_objects(False, record=False)
+    if multiball is not None:
+        multiball.reset(seed)
+    else:
+        from game.multiball import MultiballState
+        multiball = MultiballState(SCREEN_WIDTH, SCREEN_HEIGHT,
+                                   rules=Rules.for_tick_rate(TICK_RATE), seed=seed,
+                                   ball_count=MULTIBALL_BALLS, max_balls=MULTIBALL_MAX_BALLS,
+                                   ball_collisions=MULTIBALL_BALL_COLLISIONS)
+        
+        # Every ball looks the same, so one sprite is blitted for each ball
+        ball_sprite = atlas.ball(multiball.radius, WHITE)
+        
+        multiball_background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        multiball_background.fill(BLACK)
+        score_system.draw_center_line(multiball_background, SCREEN_WIDTH, SCREEN_HEIGHT)
+        draw_instructions(multiball_background)
+    previous_positions = [array.copy() for array in multiball.positions()]
+
+def update_multiball(ticks):
+    """Run `ticks` multiball physics ticks and mirror the paddles and scores"""
+    global previous_positions
+    
+    for _ in range(ticks):
+        previous_positions = [array.copy() for array in multiball.positions()]
+        multiball.step((left_input, right_input))
+        for player_input in (left_input, right_input):
+            player_input.activate = player_input.hold = player_input.release = False
+        game_profiler.mark("physics")
+    
+    left_paddle.sync_from(multiball.left)
+    right_paddle.sync_from(multiball.right)
+    score_system.sync_from(multiball)
+    game_profiler.mark("sync")
+
+def draw_multiball():
+    """Draw the multiball match; with many balls a full redraw beats dirty rects"""
+    screen.blit(multiball_background, (0, 0))
+    score_system.draw_scores(screen, SCREEN_WIDTH)
+    
+    # Blend ball positions between the last two ticks, except for balls that
+    # were just served back to the center line
+    x, y = multiball.positions()
+    before_x, before_y = previous_positions
+    if len(before_x) == len(x):
+        jumped = abs(x - before_x) > SCREEN_WIDTH / 4
+        blend = jumped + ~jumped * timestep.alpha
+        x = before_x + (x - before_x) * blend
+        y = before_y + (y - before_y) * blend
+    offset = multiball.radius
+    sprites = left_paddle.sprites() + right_paddle.sprites()
+    sprites += [(ball_sprite, position) for position in
+                zip((x - offset).astype(int).tolist(), (y - offset).astype(int).tolist())]
+    screen.blits(sprites, doreturn=False)
+    
+    # Frame-time overlay (F3)
+    if game_profiler.enabled:
+        game_profiler.update_overlay()
+        game_profiler.draw_overlay(screen)
+    game_profiler.mark("draw")
+    
+    display.flip()
+    game_profiler.mark("present")
+
+def save_replay():
+    """Write the current match's recording to REPLAY_DIR, if enabled"""
+    if not RECORD_REPLAYS or globals().get("recorder") is None or match.tick == 0:
+        return
+    os.makedirs(REPLAY_DIR, exist_ok=True)
+    name = time.strftime("%Y%m%d-%H%M%S") + "-%d.pongrec" % match.seed
+    recorder.finish().save(os.path.join(REPLAY_DIR, name))
+
+def parse_window_size(text):
+    """Parse WIDTHxHEIGHT, e.g. 1920x1080"""
+    import argparse
+    width, _, height = text.lower().partition("x")
+    try:
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected WIDTHxHEIGHT, got %r" % text)
+
+def parse_args(argv):
+    """
+    Parse --host PORT or --join HOST:PORT into main()'s network tuple, and
+    the display, telemetry and replay options into configure()'s keyword arguments
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Pong Game")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--host", type=int, nargs="?", const=NET_PORT, metavar="PORT",
+                       help="host a networked match as the left paddle")
+    group.add_argument("--join", metavar="HOST[:PORT]",
+                       help="join a networked match as the right paddle")
+    parser.add_argument("--window", type=parse_window_size, metavar="WIDTHxHEIGHT",
+                        help="window size; the playfield is scaled to fit")
+    parser.add_argument("--fullscreen", action="store_true", default=None,
+                        help="fullscreen, at the desktop resolution unless --window is given")
+    parser.add_argument("--smooth", action="store_true", default=None,
+                        help="smooth scaling instead of nearest-neighbour")
+    parser.add_argument("--render-scale", type=float, metavar="SCALE",
+                        help="offscreen frame size as a fraction of the window, e.g. 0.5")
+    parser.add_argument("--fps", type=int, help="target frame rate (default %d)" % FPS)
+    parser.add_argument("--telemetry", action="store_true", default=None,
+                        help="stream gameplay events to %s" % TELEMETRY_DIR)
+    parser.add_argument("--record-replays", action="store_true", default=None,
+                        help="save each match's inputs to %s" % REPLAY_DIR)
+    args = parser.parse_args(argv)
+    if args.render_scale is not None and not 0 < args.render_scale <= 1:
+        parser.error("--render-scale must be above 0 and at most 1")
+    settings = {"window_size": args.window, "fps": args.fps, "fullscreen": args.fullscreen,
+                "smooth": args.smooth, "render_scale": args.render_scale,
+                "telemetry": args.telemetry,
+                "record_replays": args.record_replays}
+    
+    network = None
+    if args.host is not None:
+        # The host learns the other player's address from their first packet
+        network = True, args.host, None
+    elif args.join:
+        host, _, port = args.join.partition(":")
+        network = False, 0, (host, int(port) if port else NET_PORT)
+    return network, settings
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    network, settings = parse_args(sys.argv[1:])
+    configure(**settings)
+    main(network) 
\ No newline at end of file
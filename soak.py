@@ -0,0 +1,365 @@
+"""
+Soak test for the Pong game.
+Runs the real game loop headlessly (the SDL dummy video driver is used
+unless another is set) on simulated time, for hours of play, cycling
+through the start screen, every game mode, the pause screen, game over,
+rematches and back to the menu. Frames run back to back without waiting,
+and each one counts as 1/FPS of game time.
+
+tracemalloc snapshots are taken periodically and frame times are sampled
+per screen. The report flags steady memory growth after the warm-up
+period, the allocation sites behind it, and frame-time drift between the
+start and the end of the run. The exit status is 1 when anything is
+flagged.
+
+Usage:
+    python soak.py                           # Two simulated hours
+    python soak.py --hours 8 --output soak_report.json
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pygame
+
+import main as game
+from game.profiler import percentile
+from game.screens import GameOverScreen, PauseScreen, StartScreen
+from game.telemetry import TelemetryBus
+
+REPORT_VERSION = 1
+MODES = ("VS_MACHINE", "VS_FRIEND", "MULTIBALL")
+
+
+class SoakPacer:
+    """
+    Stands in for game.pacing.FramePacer. Each wait() returns exactly one
+    frame of simulated time without sleeping, hands the time the previous
+    frame took to the soak run and lets it script the next frame's input.
+    Frames that applied a scene transition are not timed.
+    """
+    def __init__(self, fps, soak):
+        self.period = 1.0 / fps
+        self.soak = soak
+        self.last = None
+
+    def reset(self):
+        self.last = None
+
+    def wait(self):
+        now = time.perf_counter()
+        if self.last is not None:
+            self.soak.record_frame(now - self.last)
+        self.soak.next_frame()
+        self.last = time.perf_counter()
+        return self.period
+
+
+class Soak:
+    """
+    Scripts the player through the game and collects the measurements.
+    Every match pauses and resumes once, presses the power-up and hold keys
+    now and then, and ends at the winning score or after match_seconds;
+    game over alternates between a rematch and the main menu.
+    """
+    def __init__(self, manager, hours, snapshot_minutes=10, warmup_minutes=10,
+                 sample_seconds=60, match_seconds=90):
+        self.manager = manager
+        fps = manager.fps
+        self.fps = fps
+        self.total_frames = int(hours * 3600 * fps)
+        self.snapshot_frames = int(snapshot_minutes * 60 * fps)
+        self.warmup_frames = int(warmup_minutes * 60 * fps)
+        self.sample_frames = int(sample_seconds * fps)
+        self.match_frames_limit = int(match_seconds * fps)
+
+        self.frame = 0
+        self.scene = None
+        self.scene_frames = 0  # Frames since the current scene came on top
+        self.match_frames = 0  # Frames played in the current match
+        self.paused_once = False
+        self.matches = 0
+        self.mode_index = 0
+        self.rematch = False
+
+        # Frame times of the current sample window, by screen
+        self.window = {}
+        self.samples = []     # One entry per screen per window
+        # Memory
+        self.snapshots = []   # (simulated hours, traced bytes)
+        self.warm_frame = None  # Frame the warm-up ended on
+        self.baseline = None  # First snapshot after the warm-up
+        self.latest = None
+
+    def hours(self):
+        return self.frame / self.fps / 3600
+
+    def screen_name(self):
+        scene = self.manager.current
+        if isinstance(scene, game.MatchScene):
+            return scene.game_state
+        return type(scene).__name__
+
+    def record_frame(self, seconds):
+        self.window.setdefault(self.screen_name(), []).append(seconds)
+
+    def next_frame(self):
+        """Take measurements when due and script this frame's input"""
+        self.frame += 1
+        frame = self.frame
+        if frame % self.sample_frames == 0:
+            self.close_window()
+        if (self.warm_frame is None and frame >= self.warmup_frames
+                and self.mode_index > len(MODES)):
+            # Every mode has been played and left once, so one-time
+            # allocations (sprites, arrays, cached text) predate the baseline
+            self.warm_frame = frame
+        if self.warm_frame is not None and (frame - self.warm_frame) % self.snapshot_frames == 0:
+            self.take_snapshot()
+        if frame >= self.total_frames:
+            self.manager.quit()
+            return
+
+        scene = self.manager.current
+        if scene is not self.scene:
+            self.scene = scene
+            self.scene_frames = 0
+        self.scene_frames += 1
+        if isinstance(scene, StartScreen):
+            if self.scene_frames == self.fps:
+                self.start_match(MODES[self.mode_index % len(MODES)])
+                self.mode_index += 1
+        elif isinstance(scene, game.MatchScene):
+            self.play()
+        elif isinstance(scene, PauseScreen):
+            if self.scene_frames == self.fps // 2:
+                # Resume the first pause; a match over its time limit goes to the menu
+                over = self.match_frames >= self.match_frames_limit
+                self.press(pygame.K_m if over else pygame.K_ESCAPE)
+        elif isinstance(scene, GameOverScreen):
+            if self.scene_frames == self.fps:
+                self.rematch = not self.rematch
+                self.press(pygame.K_r if self.rematch else pygame.K_m)
+                if self.rematch:
+                    self.match_started()
+
+    def start_match(self, mode):
+        self.scene.choose(mode)
+        self.match_started()
+
+    def match_started(self):
+        self.matches += 1
+        self.match_frames = 0
+        self.paused_once = False
+
+    def play(self):
+        self.match_frames += 1
+        frames = self.match_frames
+        if frames >= self.match_frames_limit or (frames == 20 * self.fps and not self.paused_once):
+            self.paused_once = True
+            self.press(pygame.K_ESCAPE)
+        elif frames % (3 * self.fps) == 0:
+            self.press(pygame.K_LSHIFT)
+            self.press(pygame.K_RSHIFT)
+        elif frames % (3 * self.fps) == self.fps:
+            self.press(pygame.K_SPACE)
+        elif frames % (3 * self.fps) == self.fps + self.fps // 2:
+            pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_SPACE))
+
+    @staticmethod
+    def press(key):
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key))
+
+    def close_window(self):
+        """Summarize the frame times of the sample window that just ended"""
+        minutes = self.frame / self.fps / 60
+        for name, times in sorted(self.window.items()):
+            times.sort()
+            self.samples.append({
+                "minutes": round(minutes, 2),
+                "screen": name,
+                "frames": len(times),
+                "mean_ms": statistics.fmean(times) * 1000,
+                "p50_ms": percentile(times, 0.5) * 1000,
+                "p95_ms": percentile(times, 0.95) * 1000,
+                "max_ms": times[-1] * 1000,
+            })
+        self.window = {}
+
+    def take_snapshot(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        size = sum(stat.size for stat in snapshot.statistics("filename"))
+        self.snapshots.append((self.hours(), size))
+        if self.baseline is None:
+            self.baseline = snapshot
+        else:
+            self.latest = snapshot
+
+
+def memory_report(soak, max_growth, top):
+    """Growth rate of traced memory after the warm-up and the sites that grew most"""
+    points = soak.snapshots
+    report = {
+        "snapshots": [{"hours": round(hours, 3), "traced_bytes": size} for hours, size in points],
+        "growth_bytes_per_hour": 0.0,
+        "growing_intervals": 0.0,
+        "sites": [],
+        "flagged": False,
+    }
+    if len(points) < 3:
+        return report
+    hours, sizes = zip(*points)
+    slope = statistics.linear_regression(hours, sizes).slope
+    increases = sum(after > before for before, after in zip(sizes, sizes[1:]))
+    growing = increases / (len(sizes) - 1)
+    report["growth_bytes_per_hour"] = slope
+    report["growing_intervals"] = growing
+    # Steady growth: a clear upward trend that most intervals agree with
+    report["flagged"] = slope > max_growth and growing >= 0.7
+    for stat in soak.latest.compare_to(soak.baseline, "lineno")[:top]:
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        report["sites"].append({"site": "%s:%d" % (frame.filename, frame.lineno),
+                                "size_diff": stat.size_diff, "count_diff": stat.count_diff,
+                                "size": stat.size})
+    return report
+
+
+def drift_report(soak, max_drift):
+    """Compare each screen's frame times in the first and last tenth of the run"""
+    report = {}
+    by_screen = {}
+    for sample in soak.samples:
+        by_screen.setdefault(sample["screen"], []).append(sample)
+    for name, samples in sorted(by_screen.items()):
+        if len(samples) < 2:
+            continue
+        count = max(1, len(samples) // 10)
+        start = statistics.median(sample["p50_ms"] for sample in samples[:count])
+        end = statistics.median(sample["p50_ms"] for sample in samples[-count:])
+        start_p95 = statistics.median(sample["p95_ms"] for sample in samples[:count])
+        end_p95 = statistics.median(sample["p95_ms"] for sample in samples[-count:])
+        drift = end / start - 1
+        report[name] = {"start_p50_ms": start, "end_p50_ms": end,
+                        "start_p95_ms": start_p95, "end_p95_ms": end_p95,
+                        "drift": drift, "flagged": drift > max_drift}
+    return report
+
+
+def print_report(report):
+    run = report["run"]
+    print("Soak: %.2f simulated hours (%d frames, %d matches, %d transitions) in %.0f s" % (
+        run["simulated_hours"], run["frames"], run["matches"], run["transitions"],
+        run["real_seconds"]))
+
+    memory = report["memory"]
+    print()
+    print("Traced memory after warm-up:")
+    for snapshot in memory["snapshots"]:
+        print("  %6.2f h  %10.1f KB" % (snapshot["hours"], snapshot["traced_bytes"] / 1024))
+    print("Growth: %+.1f KB per hour, rising in %d%% of intervals%s" % (
+        memory["growth_bytes_per_hour"] / 1024, memory["growing_intervals"] * 100,
+        "  STEADY GROWTH" if memory["flagged"] else ""))
+    if memory["sites"]:
+        print("Largest growth since the first snapshot:")
+        for site in memory["sites"]:
+            print("  %+10.1f KB %+7d blocks  %s" % (site["size_diff"] / 1024, site["count_diff"],
+                                                    site["site"]))
+
+    print()
+    print("%-20s %12s %12s %12s %12s %8s" % ("frame times", "start p50", "end p50",
+                                             "start p95", "end p95", "drift"))
+    for name, drift in report["frame_drift"].items():
+        print("%-20s %9.3f ms %9.3f ms %9.3f ms %9.3f ms %+7.1f%%%s" % (
+            name, drift["start_p50_ms"], drift["end_p50_ms"], drift["start_p95_ms"],
+            drift["end_p95_ms"], drift["drift"] * 100, "  DRIFT" if drift["flagged"] else ""))
+
+
+def run_soak(hours, snapshot_minutes=10, warmup_minutes=10, sample_seconds=60,
+             trace_frames=1, max_growth=64 * 1024, max_drift=0.2, top=10):
+    """Run the soak and return the report"""
+    # Replays and telemetry are on, so their writers are soaked too, and go
+    # to a scratch directory
+    game.configure(telemetry=True, record_replays=True)
+    scratch = tempfile.mkdtemp(prefix="pong-soak-")
+    game.REPLAY_DIR = os.path.join(scratch, "replays")
+    os.makedirs(game.REPLAY_DIR)
+    game.telemetry = TelemetryBus(os.path.join(scratch, "telemetry"), game.TELEMETRY_FORMAT,
+                                  game.TELEMETRY_QUEUE, max_file_bytes=game.TELEMETRY_FILE_BYTES,
+                                  max_files=game.TELEMETRY_FILES)
+
+    manager = game.create_scene_manager()
+    soak = Soak(manager, hours, snapshot_minutes, warmup_minutes, sample_seconds)
+    manager.pacer = SoakPacer(game.FPS, soak)
+    tracemalloc.start(trace_frames)
+    started = time.perf_counter()
+    try:
+        manager.run(game.MENU)
+    finally:
+        tracemalloc.stop()
+        if game.telemetry:
+            game.telemetry.close()
+            game.telemetry = None
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    memory = memory_report(soak, max_growth, top)
+    drift = drift_report(soak, max_drift)
+    return {
+        "version": REPORT_VERSION,
+        "run": {"simulated_hours": soak.hours(), "frames": soak.frame, "matches": soak.matches,
+                "transitions": manager.transitions,
+                "real_seconds": time.perf_counter() - started},
+        "memory": memory,
+        "frame_drift": drift,
+        "frame_samples": soak.samples,
+        "flagged": memory["flagged"] or any(entry["flagged"] for entry in drift.values()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pong game soak test")
+    parser.add_argument("--hours", type=float, default=2.0, help="simulated hours to play")
+    parser.add_argument("--snapshot-minutes", type=float, default=10,
+                        help="simulated minutes between tracemalloc snapshots")
+    parser.add_argument("--warmup-minutes", type=float, default=10,
+                        help="simulated minutes before the first snapshot (caches filling up)")
+    parser.add_argument("--sample-seconds", type=float, default=60,
+                        help="simulated seconds per frame-time sample window")
+    parser.add_argument("--trace-frames", type=int, default=1,
+                        help="stack frames tracemalloc keeps per allocation")
+    parser.add_argument("--max-growth", type=float, default=64,
+                        help="KB per simulated hour of steady growth to flag")
+    parser.add_argument("--max-drift", type=float, default=0.2,
+                        help="allowed rise of median frame time (0.2 = 20%%)")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = run_soak(args.hours, args.snapshot_minutes, args.warmup_minutes,
+                      args.sample_seconds, args.trace_frames, args.max_growth * 1024,
+                      args.max_drift)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["flagged"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
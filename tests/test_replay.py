@@ -0,0 +1,89 @@
+"""Tests for match recordings and the replay engine"""
+
+import pytest
+
+from game.ai import AIController
+from game.replay import InputRecorder, Recording, ReplayEngine
+from game.simulation import MatchState, Rules, step
+
+
+def record_match(ticks, continuous, seed=7, rules=None):
+    """Play an AI-vs-AI match for ticks ticks and return its recording and final state"""
+    state = MatchState(rules=rules, seed=seed, continuous=continuous)
+    recorder = InputRecorder(state)
+    left = AIController(True, "hard", seed=1)
+    right = AIController(False, "easy", seed=2)
+    for _ in range(ticks):
+        inputs = (left.get_input(state), right.get_input(state))
+        recorder.record(inputs)
+        step(state, inputs)
+    return recorder.finish(), state
+
+
+def test_round_trip():
+    recording, _ = record_match(2000, True, rules=Rules(max_load=60, wall_jitter=0.25))
+    loaded = Recording.from_bytes(recording.to_bytes())
+    assert loaded.seed == recording.seed
+    assert (loaded.width, loaded.height) == (recording.width, recording.height)
+    assert loaded.continuous == recording.continuous
+    assert vars(loaded.rules) == vars(recording.rules)
+    assert loaded.runs == recording.runs
+    assert tuple(loaded.final_scores) == tuple(recording.final_scores)
+    assert tuple(loaded.final_ball) == tuple(recording.final_ball)
+
+
+def test_unknown_rule_is_rejected():
+    data = record_match(10, True)[0].to_bytes()
+    with pytest.raises(ValueError):
+        Recording.from_bytes(data.replace(b"max_load", b"min_load"))
+
+
+@pytest.mark.parametrize("continuous", [False, True])
+def test_verify(continuous):
+    recording, state = record_match(5000, continuous)
+    assert state.player1_score + state.player2_score > 0
+    loaded = Recording.from_bytes(recording.to_bytes())
+    assert ReplayEngine(loaded).verify()
+
+    # A different final score must fail verification
+    loaded.final_scores = (state.player1_score + 1, state.player2_score)
+    assert not ReplayEngine(loaded).verify()
+
+
+def test_seek_empty_recording():
+    recording, state = record_match(0, True)
+    engine = ReplayEngine(recording)
+    assert engine.verify()
+    for tick in (0, 5, -3):
+        assert engine.seek(tick).snapshot() == state.snapshot()
+
+
+def test_seek_short_recording():
+    recording, state = record_match(25, True)
+    engine = ReplayEngine(recording, keyframe_interval=600)
+    assert engine.seek(25).snapshot() == state.snapshot()
+    assert engine.seek(1000).snapshot() == state.snapshot()
+    assert engine.seek(0).snapshot() == recording.new_state().snapshot()
+
+
+@pytest.mark.parametrize("continuous", [False, True])
+def test_seek_keyframe_boundaries(continuous):
+    interval = 100
+    recording, _ = record_match(450, continuous)
+    engine = ReplayEngine(recording, keyframe_interval=interval)
+    for tick in (0, 1, 99, 100, 101, 199, 200, 400, 449, 450):
+        expected = recording.new_state()
+        ReplayEngine(recording)._simulate(expected, 0, tick, False)
+        assert engine.seek(tick).snapshot() == expected.snapshot(), tick
+
+
+def test_verify_directory(tmp_path):
+    from game.replay import verify_directory
+    for seed in range(3):
+        record_match(300, True, seed=seed)[0].save(str(tmp_path / ("%d.pongrec" % seed)))
+    broken = record_match(300, True, seed=9)[0]
+    broken.final_scores = (99, 99)
+    broken.save(str(tmp_path / "broken.pongrec"))
+    passed, failures = verify_directory(str(tmp_path))
+    assert passed == 3
+    assert [name for name, reason in failures] == ["broken.pongrec"]
@@ -0,0 +1,64 @@
+"""Loopback tests for spectator streaming"""
+
+import asyncio
+
+from game.ai import AIController
+from game.simulation import MatchState, step
+from game.spectator import SpectatorClient, SpectatorServer, quantize
+
+CLIENTS = 3
+TICKS = 600
+
+
+async def _watch(client):
+    """Receive until the server closes; returns every (tick, values) seen"""
+    seen = []
+    while True:
+        tick = await client.receive()
+        if tick is None:
+            return seen
+        seen.append((tick, quantize(client.state)))
+
+
+async def _broadcast(server, port):
+    clients = [SpectatorClient() for _ in range(CLIENTS)]
+    for client in clients:
+        await client.connect("127.0.0.1", port)
+    watchers = [asyncio.create_task(_watch(client)) for client in clients]
+
+    state = MatchState(seed=5)
+    players = (AIController(True, "hard", seed=1), AIController(False, "easy", seed=2))
+    published = {}
+    for _ in range(TICKS):
+        step(state, tuple(player.get_input(state) for player in players))
+        server.publish(state)
+        published[state.tick] = quantize(state)
+        await asyncio.sleep(0.001)
+
+    await asyncio.get_running_loop().run_in_executor(None, server.close)
+    results = await asyncio.gather(*watchers)
+    for client in clients:
+        await client.close()
+    return clients, results, published
+
+
+def test_clients_decode_published_ticks():
+    server = SpectatorServer(keyframe_interval=60)
+    port = server.start()
+    try:
+        clients, results, published = asyncio.run(_broadcast(server, port))
+    finally:
+        server.close()
+
+    assert server.skipped == 0
+    assert server.published == TICKS
+    for client, seen in zip(clients, results):
+        assert client.keyframes >= 1
+        ticks = [tick for tick, values in seen]
+        assert ticks == sorted(set(ticks))
+        # Every decoded tick matches what the game published for it
+        for tick, values in seen:
+            assert values == published[tick]
+        if server.dropped == 0:
+            assert ticks[-1] == TICKS
+            assert len(ticks) > TICKS // 2